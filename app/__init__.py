@@ -1,11 +1,2 @@
-from fastapi import FastAPI
-from .config import settings
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    docs_url="/api/docs" if settings.ENVIRONMENT == "development" else None,
-    redoc_url="/api/redoc" if settings.ENVIRONMENT == "development" else None,
-)
-
-__all__ = ["app"]
\ No newline at end of file
+# A aplicação é criada por app.main.create_app(); este pacote não deve
+# construir nada no import.
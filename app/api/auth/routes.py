@@ -1,17 +1,101 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+import logging
+import uuid
 
-from app.database import get_db
-from app.core import security
+from app.database import get_db, revocation
+from app.core import ratelimit, security
+from app.core.metrics import LOGIN_ATTEMPTS
+from app import dependencies, queries
 from app.dependencies import get_current_active_user
-from app.models import User
-from app.auth import UserLogin, TokenResponse, TokenRefreshResponse
+from app.models import RefreshToken, User
+from app.auth import UserLogin, TokenResponse, TokenRefreshRequest, TokenRefreshResponse
 from app.config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def issue_tokens(db: Session, user: User, family_id: Optional[uuid.UUID] = None) -> Tuple[str, str]:
+    """
+    Token de acesso e refresh token da família `family_id` (nova no login).
+    O refresh token é gravado em `db`; o chamador faz o commit.
+    """
+    family_id = family_id or uuid.uuid4()
+    refresh_token = security.create_refresh_token()
+    db.add(RefreshToken(
+        token_hash=security.hash_token(refresh_token),
+        family_id=family_id,
+        user_id=user.id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    access_token = security.create_access_token(
+        data={
+            "sub": str(user.id),
+            "law_firm_id": str(user.law_firm_id),
+            "email": user.email,
+            "name": user.name,
+            "role": user.role,
+            "fam": str(family_id),
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return access_token, refresh_token
+
+
+def _login_rate_keys(request: Request, email: str):
+    return (
+        (ratelimit.login_ip_limiter, ratelimit.client_ip(request)),
+        (ratelimit.login_email_limiter, email.strip().lower()),
+    )
+
+
+def check_login_rate(request: Request, email: str) -> None:
+    """
+    Limite de falhas de login por IP e por email (429), aplicado antes de
+    consultar o banco ou calcular bcrypt.
+    """
+    for limiter, key in _login_rate_keys(request, email):
+        retry_after = limiter.check(key)
+        if retry_after is not None:
+            LOGIN_ATTEMPTS.inc(("rate_limited",))
+            logger.warning("login_rate_limited", extra={
+                "limiter": limiter.name, "client_ip": ratelimit.client_ip(request),
+            })
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Muitas tentativas de login. Tente novamente em {retry_after} segundos.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+def login_failed(request: Request, email: str, reason: str) -> None:
+    """Conta a falha nos limites de login e na métrica."""
+    for limiter, key in _login_rate_keys(request, email):
+        limiter.hit(key)
+    LOGIN_ATTEMPTS.inc((reason,))
+
+
+def login_succeeded(email: str) -> None:
+    """Zera as falhas do email; as do IP continuam valendo."""
+    ratelimit.login_email_limiter.reset(email.strip().lower())
+    LOGIN_ATTEMPTS.inc(("success",))
+
+
+def revoke_family(db: Session, family_id: uuid.UUID) -> None:
+    """Revoga os refresh tokens da família e os tokens de acesso emitidos por ela."""
+    now = datetime.now(timezone.utc)
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    # Tokens de acesso da família expiram no máximo em ACCESS_TOKEN_EXPIRE_MINUTES
+    revocation.revoke(db, {str(family_id): now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)})
 
 @router.post(
     "/login",
@@ -42,10 +126,15 @@ def login(
     - **role**: Papel do usuário (admin/lawyer/assistant)
     - **is_active**: Status do usuário
     """
+    check_login_rate(request, user_data.email)
+
     # Buscar usuário pelo email
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = queries.get_user_by_email(db, user_data.email)
     
     if not user:
+        # Mesmo custo de uma senha errada: o tempo não revela se o email existe
+        security.verify_dummy_password(user_data.password)
+        login_failed(request, user_data.email, "invalid")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -54,6 +143,7 @@ def login(
     
     # Verificar senha
     if not security.verify_password(user_data.password, user.password_hash):
+        login_failed(request, user_data.email, "invalid")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -62,31 +152,31 @@ def login(
     
     # Verificar se usuário está ativo
     if not user.is_active:
+        login_failed(request, user_data.email, "inactive")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário inativo. Contate o administrador.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Criar token de acesso
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={
-            "sub": str(user.id),
+    # Criar token de acesso e refresh token
+    access_token, refresh_token = issue_tokens(db, user)
+    db.commit()
+    login_succeeded(user_data.email)
+    
+    logger.info(
+        "login",
+        extra={
+            "user_id": str(user.id),
             "law_firm_id": str(user.law_firm_id),
-            "email": user.email,
-            "name": user.name,
-            "role": user.role
+            "client_ip": ratelimit.client_ip(request),
         },
-        expires_delta=access_token_expires
     )
     
-    # Log de acesso (opcional)
-    print(f"Login realizado - Usuário: {user.email}, IP: {request.client.host}")
-    
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
+        refresh_token=refresh_token,
         user_id=user.id,
         law_firm_id=user.law_firm_id,
         email=user.email,
@@ -103,6 +193,7 @@ def login(
     description="Endpoint de login compatível com OAuth2 Password Flow (para Swagger UI)"
 )
 def login_with_form(
+    request: Request,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -111,10 +202,14 @@ def login_with_form(
     Útil para documentação Swagger e clientes OAuth2.
     O campo 'username' deve ser o email do usuário.
     """
+    check_login_rate(request, form_data.username)
+
     # Buscar usuário pelo email (OAuth2 usa 'username' como email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = queries.get_user_by_email(db, form_data.username)
     
     if not user:
+        security.verify_dummy_password(form_data.password)
+        login_failed(request, form_data.username, "invalid")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -123,6 +218,7 @@ def login_with_form(
     
     # Verificar senha
     if not security.verify_password(form_data.password, user.password_hash):
+        login_failed(request, form_data.username, "invalid")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -130,27 +226,21 @@ def login_with_form(
         )
     
     if not user.is_active:
+        login_failed(request, form_data.username, "inactive")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário inativo",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={
-            "sub": str(user.id),
-            "law_firm_id": str(user.law_firm_id),
-            "email": user.email,
-            "name": user.name,
-            "role": user.role
-        },
-        expires_delta=access_token_expires
-    )
+    access_token, refresh_token = issue_tokens(db, user)
+    db.commit()
+    login_succeeded(form_data.username)
     
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
+        refresh_token=refresh_token,
         user_id=user.id,
         law_firm_id=user.law_firm_id,
         email=user.email,
@@ -163,47 +253,78 @@ def login_with_form(
     "/refresh",
     response_model=TokenRefreshResponse,
     summary="Renovar token",
-    description="Gera um novo token de acesso usando o token atual válido"
+    description="Troca o refresh token por um novo par de tokens (rotação)"
 )
 def refresh_token(
-    current_user: User = Depends(get_current_active_user)
+    data: TokenRefreshRequest,
+    db: Session = Depends(get_db)
 ) -> Any:
     """
-    Gera um novo token de acesso usando o token atual válido.
-    Requer autenticação com token válido.
+    Troca o refresh token por um novo token de acesso e um novo refresh
+    token. Cada refresh token vale uma única vez: reapresentar um token já
+    trocado indica que ele vazou, e toda a sessão (família) é revogada.
     """
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={
-            "sub": str(current_user.id),
-            "law_firm_id": str(current_user.law_firm_id),
-            "email": current_user.email,
-            "name": current_user.name,
-            "role": current_user.role
-        },
-        expires_delta=access_token_expires
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido ou expirado",
+        headers={"WWW-Authenticate": "Bearer"},
     )
+    token = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == security.hash_token(data.refresh_token),
+        RefreshToken.expires_at > func.now()
+    ).with_for_update().first()
+    if token is None or token.revoked_at is not None:
+        raise invalid
+
+    if token.used_at is not None:
+        revoke_family(db, token.family_id)
+        db.commit()
+        logger.warning(
+            "refresh_token_reuse",
+            extra={"user_id": str(token.user_id), "family_id": str(token.family_id)},
+        )
+        raise invalid
+
+    user = queries.get_active_user(db, token.user_id)
+    if user is None:
+        raise invalid
+
+    token.used_at = func.now()
+    access_token, new_refresh_token = issue_tokens(db, user, token.family_id)
+    db.commit()
     
     return TokenRefreshResponse(
         access_token=access_token,
-        token_type="bearer"
+        token_type="bearer",
+        refresh_token=new_refresh_token
     )
 
 @router.post(
     "/logout",
     status_code=status.HTTP_200_OK,
     summary="Logout",
-    description="Endpoint para logout (cliente deve descartar o token)"
+    description="Revoga o token de acesso atual e os refresh tokens da sessão"
 )
-def logout() -> dict:
+def logout(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(dependencies.security),
+    current_user: User = Depends(get_current_active_user)
+) -> dict:
     """
-    Endpoint para logout.
-    Como usamos JWT, o logout é feito no lado do cliente.
-    O cliente deve descartar o token e não usá-lo mais.
+    Encerra a sessão: o token de acesso atual e todos os tokens emitidos a
+    partir do mesmo login deixam de ser aceitos, em todos os workers.
     """
+    payload = security.decode_access_token(credentials.credentials) or {}
+    revoked = {}
+    if payload.get("jti") and payload.get("exp"):
+        revoked[payload["jti"]] = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    if payload.get("fam"):
+        revoke_family(db, uuid.UUID(payload["fam"]))
+    revocation.revoke(db, revoked)
+    db.commit()
     return {
         "message": "Logout realizado com sucesso",
-        "detail": "Token descartado. Para garantir, remova o token do lado do cliente."
+        "detail": "Token e sessão revogados."
     }
 
 @router.get(
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ...database import get_db
-from ... import schemas, models
-from ...dependencies import get_current_active_user
+from ... import schemas, models, queries
+from ...dependencies import get_current_active_user, list_etag
+from ...core.instrumentation import query_budget
 
 router = APIRouter()
 
@@ -15,10 +16,7 @@ def create_case(
 ):
     """Criar novo processo."""
     # Verificar se cliente pertence ao escritório
-    client = db.query(models.Client).filter(
-        models.Client.id == case.client_id,
-        models.Client.law_firm_id == current_user.law_firm_id
-    ).first()
+    client = queries.get_client_in_firm(db, case.client_id, current_user.law_firm_id)
     
     if not client:
         raise HTTPException(status_code=400, detail="Cliente não encontrado")
@@ -32,7 +30,8 @@ def create_case(
     db.refresh(db_case)
     return db_case
 
-@router.get("/", response_model=List[schemas.CaseInDB])
+@router.get("/", response_model=List[schemas.CaseInDB], dependencies=[Depends(list_etag("cases"))])
+@query_budget(3)
 def read_cases(
     skip: int = 0,
     limit: int = 100,
@@ -40,7 +39,5 @@ def read_cases(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Listar processos do escritório."""
-    cases = db.query(models.Case).filter(
-        models.Case.law_firm_id == current_user.law_firm_id
-    ).offset(skip).limit(limit).all()
+    cases = queries.list_cases(db, current_user.law_firm_id, skip, limit)
     return cases
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Feed de alterações do escritório, para sincronização incremental.
+
+O cliente guarda o `next` da resposta e o envia como ?since= na próxima
+chamada. Registros mais novos que AUDIT_FEED_LAG_SECONDS ainda não são
+entregues: ids são atribuídos no insert, mas transações concorrentes podem
+confirmar fora de ordem, e o atraso evita que o cursor passe por um id que
+ainda vai aparecer.
+
+A leitura é sempre no primário: uma réplica atrasada mais que
+AUDIT_FEED_LAG_SECONDS ainda não teria um registro que o cursor já passou.
+"""
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...database import get_db
+from ... import schemas, models
+from ...dependencies import get_current_active_user
+
+router = APIRouter()
+
+# Alterações de usuários e do escritório só aparecem para administradores
+ADMIN_ENTITIES = ("users", "law_firms")
+
+
+@router.get("/", response_model=schemas.ChangeFeed)
+def read_changes(
+    since: str = Query("0", description="Cursor retornado em `next` pela chamada anterior"),
+    limit: int = Query(100, ge=1, le=1000),
+    entity: Optional[str] = Query(None, description="Filtrar por entidade, ex. clients"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Alterações do escritório após o cursor, em ordem."""
+    try:
+        cursor = int(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    # Mesmo em GET, nunca em réplica (ver docstring do módulo)
+    db.info["read_only"] = False
+
+    query = db.query(models.AuditLog).filter(
+        models.AuditLog.law_firm_id == current_user.law_firm_id,
+        models.AuditLog.id > cursor,
+        models.AuditLog.created_at < func.now() - timedelta(seconds=settings.AUDIT_FEED_LAG_SECONDS),
+    )
+    if entity:
+        query = query.filter(models.AuditLog.entity == entity)
+    if current_user.role != "admin":
+        query = query.filter(models.AuditLog.entity.notin_(ADMIN_ENTITIES))
+
+    rows = query.order_by(models.AuditLog.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "changes": rows,
+        "next": str(rows[-1].id) if rows else str(cursor),
+        "has_more": has_more,
+    }
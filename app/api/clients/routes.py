@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status, Query
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from ...database import get_db
-from ... import schemas, models
-from ...dependencies import get_current_active_user
+from ...database import get_db, versions
+from ... import schemas, models, queries
+from ...dependencies import get_current_active_user, list_etag
+from ...core.cache import response_cache, serialize_list
+from ...core.etag import check_not_modified, make_etag
+from ...core.instrumentation import query_budget
 import uuid
 
 router = APIRouter(prefix="/clients", tags=["clients"])  # Adicione prefix e tags
@@ -43,8 +46,10 @@ def create_client(
     
     return db_client
 
-@router.get("/", response_model=List[schemas.ClientInDB])
+@router.get("/", response_model=List[schemas.ClientInDB], dependencies=[Depends(list_etag("clients"))])
+@query_budget(3)
 def read_clients(
+    request: Request,
     skip: int = Query(0, ge=0, description="Registros para pular"),
     limit: int = Query(100, ge=1, le=500, description="Limite de registros"),
     search: Optional[str] = Query(None, description="Buscar por nome ou documento"),
@@ -52,55 +57,70 @@ def read_clients(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Listar clientes do escritório."""
-    query = db.query(models.Client).filter(
-        models.Client.law_firm_id == current_user.law_firm_id
-    )
-    
-    # Adicionar busca se fornecida
-    if search:
-        query = query.filter(
-            models.Client.name.ilike(f"%{search}%") |
-            models.Client.document.ilike(f"%{search}%") |
-            models.Client.email.ilike(f"%{search}%")
-        )
-    
-    clients = query.order_by(models.Client.name).offset(skip).limit(limit).all()
-    return clients
+    def compute():
+        clients = queries.list_clients(db, current_user.law_firm_id, skip, limit, search)
+        return serialize_list(schemas.ClientInDB, clients)
+
+    return response_cache.response(request, current_user.law_firm_id, ["clients"], compute, db)
 
-@router.get("/with-active-cases", response_model=List[schemas.ClientWithCases])
+@router.get("/with-active-cases", response_model=List[schemas.ClientWithCases],
+            dependencies=[Depends(list_etag("clients", "cases"))])
+@query_budget(4)
 def get_clients_with_active_cases(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Clientes que têm processos em andamento (não arquivados/encerrados)"""
-    clients = db.query(models.Client).\
-        join(models.Case, models.Case.client_id == models.Client.id).\
-        filter(
-            models.Client.law_firm_id == current_user.law_firm_id,
-            ~models.Case.status.in_(['arquivado', 'encerrado', 'finalizado'])
-        ).\
-        distinct().\
-        offset(skip).\
-        limit(limit).\
-        all()
-    
-    # Se quiser incluir os casos ativos de cada cliente
-    for client in clients:
-        client.cases = [case for case in client.cases 
-                       if case.status not in ['arquivado', 'encerrado', 'finalizado']]
-    
-    return clients
+    def compute():
+        clients = db.query(models.Client).\
+            options(selectinload(models.Client.cases)).\
+            join(models.Case, models.Case.client_id == models.Client.id).\
+            filter(
+                models.Client.law_firm_id == current_user.law_firm_id,
+                ~models.Case.status.in_(['arquivado', 'encerrado', 'finalizado'])
+            ).\
+            distinct().\
+            offset(skip).\
+            limit(limit).\
+            all()
+
+        # Inclui apenas os casos ativos de cada cliente (sem alterar a
+        # coleção do ORM, que seria gravada num flush posterior)
+        result = []
+        for client in clients:
+            item = schemas.ClientWithCases.model_validate(client)
+            item.cases = [case for case in item.cases
+                          if case.status not in ['arquivado', 'encerrado', 'finalizado']]
+            result.append(item)
+        return serialize_list(schemas.ClientWithCases, result)
+
+    return response_cache.response(request, current_user.law_firm_id, ["clients", "cases"], compute, db)
 
 @router.get("/{client_id}", response_model=schemas.ClientWithCases)
 def read_client(
+    request: Request,
+    response: Response,
     client_id: uuid.UUID = Path(..., description="ID do cliente"),
     include_cases: bool = Query(False, description="Incluir processos do cliente"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Obter cliente específico."""
+    # ETag pelo updated_at do cliente (e pela versão dos processos, se incluídos)
+    updated_at = db.query(models.Client.updated_at).filter(
+        models.Client.id == client_id,
+        models.Client.law_firm_id == current_user.law_firm_id
+    ).scalar()
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    etag_parts = ["client", client_id, updated_at.isoformat()]
+    if include_cases:
+        etag_parts.append(versions.get_versions(db, current_user.law_firm_id, ["cases"])["cases"])
+    check_not_modified(request, response, make_etag(*etag_parts))
+
     query = db.query(models.Client).filter(
         models.Client.id == client_id,
         models.Client.law_firm_id == current_user.law_firm_id
@@ -126,10 +146,7 @@ def update_client(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Atualizar dados do cliente."""
-    client = db.query(models.Client).filter(
-        models.Client.id == client_id,
-        models.Client.law_firm_id == current_user.law_firm_id
-    ).first()
+    client = queries.get_client_in_firm(db, client_id, current_user.law_firm_id)
     
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
@@ -151,10 +168,7 @@ def delete_client(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Remover cliente (soft delete)."""
-    client = db.query(models.Client).filter(
-        models.Client.id == client_id,
-        models.Client.law_firm_id == current_user.law_firm_id
-    ).first()
+    client = queries.get_client_in_firm(db, client_id, current_user.law_firm_id)
     
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
@@ -0,0 +1,143 @@
+"""
+Endpoints de diagnóstico de rede, registrados apenas em desenvolvimento.
+Medições de desempenho ficam em benchmarks/ (bench_queries, loadtest).
+"""
+from fastapi import APIRouter, Request
+import os
+
+router = APIRouter()
+
+@router.get("/debug-routes")
+def debug_routes(request: Request):
+    routes = []
+    for route in request.app.routes:
+        routes.append({"path": route.path, "methods": list(route.methods)})
+    return routes
+@router.get("/network-diagnosis")
+def network_diagnosis():
+    """Diagnóstico completo de rede"""
+    import time
+    import socket
+    import subprocess
+    import platform
+    from urllib.parse import urlparse
+    
+    # Pega URL do banco do .env
+    db_url = os.getenv("DATABASE_URL")
+    parsed = urlparse(db_url)
+    db_host = parsed.hostname
+    
+    results = {}
+    
+    # 1. DNS Resolution
+    start = time.time()
+    try:
+        ip = socket.gethostbyname(db_host)
+        results["dns_resolution_ms"] = (time.time() - start) * 1000
+        results["resolved_ip"] = ip
+    except Exception as e:
+        results["dns_error"] = str(e)
+        ip = db_host
+    
+    # 2. TCP Connection (socket raw)
+    start = time.time()
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect((ip, 5432))
+        results["tcp_connect_ms"] = (time.time() - start) * 1000
+        sock.close()
+    except Exception as e:
+        results["tcp_error"] = str(e)
+    
+    # 3. Traceroute (se permitido)
+    if platform.system() != "Windows":
+        try:
+            trace = subprocess.run(
+                ["traceroute", "-n", "-m", "10", "-q", "1", ip],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            results["traceroute"] = trace.stdout[:500]  # Primeiros 500 chars
+        except:
+            results["traceroute"] = "Not available"
+    
+    # 4. MTR (Melhor - mostra perda de pacotes)
+    if platform.system() != "Windows":
+        try:
+            mtr = subprocess.run(
+                ["mtr", "-n", "-r", "-c", "10", ip],
+                capture_output=True,
+                text=True,
+                timeout=15
+            )
+            results["mtr_report"] = mtr.stdout
+        except:
+            results["mtr_report"] = "Install mtr: sudo apt install mtr"
+    
+    # 5. Teste de banda
+    start = time.time()
+    try:
+        # Baixa pequeno arquivo de teste
+        import urllib.request
+        test_url = "http://ipv4.download.thinkbroadband.com/5MB.zip"
+        urllib.request.urlretrieve(test_url, "/tmp/test.zip")
+        results["download_5mb_ms"] = (time.time() - start) * 1000
+    except:
+        results["download_test"] = "Failed"
+    
+    # Análise
+    if "tcp_connect_ms" in results:
+        latency = results["tcp_connect_ms"]
+        if latency < 20:
+            diagnosis = "✅ EXCELENTE (SP-SP ideal)"
+        elif latency < 50:
+            diagnosis = "✅ BOM (SP-SP normal)"
+        elif latency < 100:
+            diagnosis = "⚠️  ACEITÁVEL (possível rota ruim)"
+        elif latency < 200:
+            diagnosis = "❌ RUIM (problema de rota)"
+        else:
+            diagnosis = "🔥 HORRÍVEL (ISP ou firewall)"
+        
+        results["diagnosis"] = diagnosis
+        results["your_latency"] = f"{latency:.1f}ms"
+        results["expected_sp_sp"] = "10-30ms"
+    
+    return results
+@router.get("/network-test")
+def network_test():
+    """Teste de latência para o banco remoto"""
+    import time
+    import socket
+    
+    host = "dpg-d64h2ff5r7bs73afur9g-a.oregon-postgres.render.com"
+    
+    # Teste DNS + TCP
+    start = time.time()
+    try:
+        ip = socket.gethostbyname(host)
+        dns_time = (time.time() - start) * 1000
+        
+        # Teste TCP
+        start = time.time()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect((ip, 5432))
+        tcp_time = (time.time() - start) * 1000
+        sock.close()
+        
+        return {
+            "host": host,
+            "ip": ip,
+            "dns_ms": dns_time,
+            "tcp_connect_ms": tcp_time,
+            "estimated_rtt_ms": (dns_time + tcp_time) * 2,  # Ida e volta
+            "location": "Oregon, USA (Render.com)",
+            "expected_latency": "100-300ms (Brasil → USA)",
+            "diagnosis": "NORMAL" if tcp_time < 300 else "HIGH_LATENCY"
+        }
+        
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,203 @@
+"""
+Documentos dos processos.
+
+O upload é lido em streaming (app.core.streaming) e gravado no BlobStore
+configurado, com o SHA-256 calculado durante a gravação; o download
+aceita Range (206) para retomada e visualização parcial.
+
+O conteúdo é endereçado pelo hash e compartilhado entre documentos
+(app.database.blobs). Antes de enviar um arquivo, o cliente pode calcular
+o SHA-256 e tentar POST /documents/link: se o escritório já tem esse
+conteúdo, o documento é criado sem transferir os bytes; um 404 indica que
+o arquivo precisa ser enviado.
+
+O texto dos documentos é extraído fora da requisição (app.extraction).
+"""
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from ...config import settings
+from ...core.storage import get_store
+from ...core.streaming import RangeFileResponse, stream_upload
+from ...database import get_db
+from ... import schemas, models, jobs
+from ...dependencies import get_current_active_user, get_operator_user
+
+router = APIRouter()
+
+
+def _get_case(db: Session, case_id: uuid.UUID, law_firm_id: uuid.UUID) -> models.Case:
+    case = db.query(models.Case).filter(
+        models.Case.id == case_id,
+        models.Case.law_firm_id == law_firm_id
+    ).first()
+    if not case:
+        raise HTTPException(status_code=404, detail="Processo não encontrado")
+    return case
+
+
+def _get_document(db: Session, document_id: uuid.UUID, law_firm_id: uuid.UUID) -> models.Document:
+    document = db.query(models.Document).join(models.Case).filter(
+        models.Document.id == document_id,
+        models.Case.law_firm_id == law_firm_id
+    ).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+    return document
+
+
+@router.post("/", response_model=schemas.DocumentInDB, status_code=status.HTTP_201_CREATED)
+async def upload_document(
+    request: Request,
+    case_id: uuid.UUID = Query(..., description="Processo ao qual o documento pertence"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Enviar documento (multipart/form-data, campo `file`)."""
+    # O processo é verificado antes de ler o corpo
+    await run_in_threadpool(_get_case, db, case_id, current_user.law_firm_id)
+
+    form = await stream_upload(
+        request,
+        get_store().writer,
+        chunk_size=settings.STORAGE_CHUNK_SIZE,
+        max_size=settings.DOCUMENT_MAX_SIZE_MB * 1024 * 1024,
+    )
+
+    file = form.file
+    document_id = uuid.uuid4()
+    db_document = models.Document(
+        id=document_id,
+        case_id=case_id,
+        uploaded_by=current_user.id,
+        file_name=file.filename[:255],
+        file_url=f"{settings.API_V1_STR}/documents/{document_id}/content",
+        content_hash=file.key,
+        size=file.size,
+        content_type=file.content_type[:255],
+    )
+
+    def save():
+        db.add(db_document)
+        # Extração de texto em segundo plano (python -m app.extraction)
+        db.add(models.DocumentExtraction(document_id=document_id))
+        # O flush incrementa ref_count e trava a linha do blob; só então o
+        # arquivo é publicado, para não correr com collect_garbage
+        db.flush()
+        file.writer.commit()
+        db.commit()
+        db.refresh(db_document)
+        return db_document
+
+    try:
+        return await run_in_threadpool(save)
+    except BaseException:
+        await run_in_threadpool(file.writer.abort)
+        raise
+
+
+@router.post("/link", response_model=schemas.DocumentInDB, status_code=status.HTTP_201_CREATED)
+def link_document(
+    link: schemas.DocumentLink,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Criar documento a partir de um conteúdo já enviado pelo escritório."""
+    _get_case(db, link.case_id, current_user.law_firm_id)
+
+    # Só conteúdo que o próprio escritório já enviou: o hash não pode
+    # servir para obter arquivos de outros escritórios
+    source = db.query(models.Document).join(models.Case).filter(
+        models.Document.content_hash == link.content_hash,
+        models.Case.law_firm_id == current_user.law_firm_id
+    ).first()
+    if not source:
+        raise HTTPException(status_code=404, detail="Conteúdo não encontrado; envie o arquivo")
+
+    document_id = uuid.uuid4()
+    db_document = models.Document(
+        id=document_id,
+        case_id=link.case_id,
+        uploaded_by=current_user.id,
+        file_name=link.file_name,
+        file_url=f"{settings.API_V1_STR}/documents/{document_id}/content",
+        content_hash=source.content_hash,
+        size=source.size,
+        content_type=source.content_type,
+    )
+    db.add(db_document)
+    if source.extracted_text is not None:
+        db_document.extracted_text = source.extracted_text
+    else:
+        db.add(models.DocumentExtraction(document_id=document_id))
+    db.flush()
+    if not get_store().exists(source.content_hash):
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Conteúdo não encontrado; envie o arquivo")
+    db.commit()
+    db.refresh(db_document)
+    return db_document
+
+
+@router.post("/blobs/gc", response_model=schemas.JobInDB, status_code=status.HTTP_202_ACCEPTED)
+def collect_blobs(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Apagar blobs sem referências (somente operadores). Executado pela fila de jobs."""
+    # Job do sistema, fora do escritório: acompanhado em /jobs/system
+    job = jobs.enqueue(db, "documents.collect_blobs", law_firm_id=None, created_by=current_user.id)
+    db.commit()
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/system/{job.id}"
+    return job
+
+
+@router.get("/{document_id}", response_model=schemas.DocumentInDB)
+def read_document(
+    document_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Metadados do documento."""
+    return _get_document(db, document_id, current_user.law_firm_id)
+
+
+@router.get("/{document_id}/content")
+def download_document(
+    document_id: uuid.UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Conteúdo do documento; aceita o header Range."""
+    document = _get_document(db, document_id, current_user.law_firm_id)
+    if not document.content_hash:
+        # Documentos antigos só têm file_url externo
+        raise HTTPException(status_code=404, detail="Documento sem conteúdo armazenado")
+
+    store = get_store()
+    media_type = document.content_type or "application/octet-stream"
+    # O conteúdo nunca muda para o mesmo hash: ETag forte
+    headers = {"ETag": f'"{document.content_hash}"'}
+    path = store.local_path(document.content_hash)
+    if path is None:
+        file = store.open(document.content_hash)
+        chunks = iter(lambda: file.read(settings.STORAGE_CHUNK_SIZE), b"")
+        # Fechado ao fim do envio, inclusive se o cliente desconectar
+        return StreamingResponse(chunks, media_type=media_type, headers=headers,
+                                 background=BackgroundTask(file.close))
+
+    return RangeFileResponse(
+        path,
+        store.size(document.content_hash),
+        request.headers.get("range"),
+        media_type=media_type,
+        filename=document.file_name,
+        headers=headers,
+    )
@@ -0,0 +1,123 @@
+"""
+Eventos de alteração do escritório em tempo real (Server-Sent Events).
+
+Substitui o polling das listagens: o cliente mantém GET /events aberto e,
+a cada evento `change` ({"entity", "id", "op"}), busca o registro ou
+recarrega a lista afetada. Eventos `resync` e `evicted` (conexão lenta
+demais, encerrada pelo servidor) pedem uma recarga completa; no segundo
+caso o cliente reconecta em seguida.
+
+Requer o header Authorization, então o cliente usa fetch com leitura do
+corpo em streaming (ou um polyfill de EventSource com headers).
+
+O token é revalidado a cada heartbeat: quando expira, o servidor envia
+`expired` e encerra (o cliente renova o token e reconecta); quando é
+revogado (logout, reuso de refresh token) ou o usuário é desativado, envia
+`revoked` e encerra.
+"""
+import asyncio
+import json
+import time
+from typing import Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...core.denylist import denylist
+from ...core.events import EVICTED, broker
+from ...core.keys import keys
+from ...database import get_db
+from ... import models, queries
+from ...dependencies import get_current_active_user, security
+
+router = APIRouter()
+
+ENTITIES = ("clients", "cases", "tasks")
+
+
+def _format(event: dict) -> str:
+    name = "resync" if event.get("op") == "resync" else "change"
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+
+def _token_state(payload: dict) -> Optional[str]:
+    """Evento de encerramento se o token deixou de valer, ou None."""
+    if denylist.is_revoked(payload.get("jti"), payload.get("fam")):
+        return "revoked"
+    if payload.get("exp") is not None and payload["exp"] <= time.time():
+        return "expired"
+    return None
+
+
+@router.get("/")
+async def stream_events(
+    entities: Optional[str] = Query(None, description="Entidades separadas por vírgula (padrão: todas)"),
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Fluxo text/event-stream com as alterações de clientes, processos e tarefas do escritório."""
+    selected = None
+    if entities:
+        selected = [name.strip() for name in entities.split(",") if name.strip()]
+        unknown = set(selected) - set(ENTITIES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Entidades inválidas: {', '.join(sorted(unknown))}")
+
+    # Já validado por get_current_active_user; exp, jti e fam são revistos no fluxo
+    payload = keys.decode(credentials.credentials)
+
+    # A conexão do banco não fica presa durante o streaming
+    await anyio.to_thread.run_sync(db.close)
+
+    def user_active() -> bool:
+        # A sessão reabre uma conexão só para esta consulta
+        try:
+            return queries.get_active_user(db, current_user.id) is not None
+        finally:
+            db.close()
+
+    subscription = broker.subscribe(current_user.law_firm_id, selected)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Limite de conexões de eventos atingido",
+                            headers={"Retry-After": "30"})
+
+    async def stream():
+        user_checked = time.monotonic()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    event = None
+                closing = _token_state(payload)
+                if closing is None and time.monotonic() - user_checked >= settings.EVENTS_USER_CHECK_SECONDS:
+                    user_checked = time.monotonic()
+                    if not await anyio.to_thread.run_sync(user_active):
+                        closing = "revoked"
+                if closing is not None:
+                    yield f"event: {closing}\ndata: {{}}\n\n"
+                    return
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                # Junta o que já está na fila em uma única escrita
+                events = [event]
+                while not subscription.queue.empty() and events[-1] is not EVICTED:
+                    events.append(subscription.queue.get_nowait())
+                if events[-1] is EVICTED:
+                    yield "".join(_format(e) for e in events[:-1]) + "event: evicted\ndata: {}\n\n"
+                    return
+                yield "".join(_format(e) for e in events)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: não acumular o fluxo
+    })
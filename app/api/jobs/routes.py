@@ -0,0 +1,76 @@
+"""
+Status dos jobs enfileirados pelas rotas (app.jobs).
+
+Jobs do sistema (reindexação da busca, GC de blobs) não pertencem a um
+escritório (law_firm_id nulo) e ficam em /jobs/system, só para operadores.
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ... import schemas, models
+from ...dependencies import get_current_active_user, get_operator_user
+
+router = APIRouter()
+
+
+def _get_job(db: Session, job_id: int, law_firm_id) -> models.Job:
+    job = db.query(models.Job).filter(
+        models.Job.id == job_id,
+        models.Job.law_firm_id == law_firm_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+
+@router.get("/{job_id}", response_model=schemas.JobInDB)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Status, progresso e resultado do job."""
+    return _get_job(db, job_id, current_user.law_firm_id)
+
+
+def _cancel(db: Session, job: models.Job) -> models.Job:
+    if job.status not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job já finalizado ({job.status})")
+    job.status = "cancelled"
+    job.locked_until = None
+    job.finished_at = func.now()
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobInDB)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Cancelar job na fila ou em execução (a tarefa para na próxima atualização de progresso)."""
+    return _cancel(db, _get_job(db, job_id, current_user.law_firm_id))
+
+
+@router.get("/system/{job_id}", response_model=schemas.JobInDB)
+def read_system_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Status de um job do sistema (somente operadores)."""
+    return _get_job(db, job_id, None)
+
+
+@router.post("/system/{job_id}/cancel", response_model=schemas.JobInDB)
+def cancel_system_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Cancelar um job do sistema (somente operadores)."""
+    return _cancel(db, _get_job(db, job_id, None))
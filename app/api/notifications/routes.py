@@ -0,0 +1,49 @@
+"""Caixa de entrada de notificações do usuário (lembretes de app.reminders)."""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ...database import get_db
+from ... import schemas, models
+from ...dependencies import get_current_active_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.NotificationInDB])
+def read_notifications(
+    unread: bool = False,
+    before_id: Optional[int] = Query(None, description="Paginação: notificações com id menor que este"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Notificações do usuário atual, das mais recentes para as mais antigas."""
+    query = db.query(models.Notification).filter(models.Notification.user_id == current_user.id)
+    if unread:
+        query = query.filter(models.Notification.read_at.is_(None))
+    if before_id is not None:
+        query = query.filter(models.Notification.id < before_id)
+    return query.order_by(models.Notification.id.desc()).limit(limit).all()
+
+
+@router.post("/{notification_id}/read", response_model=schemas.NotificationInDB)
+def mark_notification_read(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Marcar notificação como lida."""
+    notification = db.query(models.Notification).filter(
+        models.Notification.id == notification_id,
+        models.Notification.user_id == current_user.id
+    ).first()
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notificação não encontrada")
+    if notification.read_at is None:
+        notification.read_at = func.now()
+        db.commit()
+        db.refresh(notification)
+    return notification
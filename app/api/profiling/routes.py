@@ -0,0 +1,70 @@
+"""
+Controle do profiler por amostragem (apenas operadores, com OPERATOR_TOKEN).
+
+Os dados são de cada worker: com vários workers, cada requisição a estas
+rotas fala com o worker que a atendeu.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+
+from ... import schemas, models
+from ...core.profiler import profiler
+from ...dependencies import get_operator_user
+
+router = APIRouter()
+
+
+@router.get("/")
+def profiling_status(current_user: models.User = Depends(get_operator_user)):
+    """Estado do profiler e número de amostras por rota."""
+    return profiler.status()
+
+
+@router.post("/start")
+def start_profiling(
+    options: schemas.ProfilingStart,
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Inicia a amostragem de uma fração das requisições, opcionalmente de uma única rota."""
+    profiler.start(options.sample_rate, options.route, options.duration_seconds)
+    return profiler.status()
+
+
+@router.post("/stop")
+def stop_profiling(current_user: models.User = Depends(get_operator_user)):
+    profiler.stop()
+    return profiler.status()
+
+
+@router.delete("/")
+def reset_profiling(current_user: models.User = Depends(get_operator_user)):
+    """Descarta as amostras coletadas."""
+    profiler.reset()
+    return profiler.status()
+
+
+@router.get("/collapsed")
+def download_collapsed(
+    route: Optional[str] = None,
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Pilhas no formato collapsed (flamegraph.pl / inferno)."""
+    return Response(
+        profiler.collapsed(route),
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'},
+    )
+
+
+@router.get("/speedscope")
+def download_speedscope(
+    route: Optional[str] = None,
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Perfil para abrir em https://www.speedscope.app."""
+    return Response(
+        profiler.speedscope_json(route),
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+    )
@@ -5,6 +5,13 @@ from .clients.routes import router as clients_router
 from .cases.routes import router as cases_router
 from .tasks.routes import router as tasks_router
 from .auth.routes import router as auth_router  # <-- ADICIONE ESTA LINHA
+from .changes.routes import router as changes_router
+from .sync.routes import router as sync_router
+from .documents.routes import router as documents_router
+from .search.routes import router as search_router
+from .jobs.routes import router as jobs_router
+from .notifications.routes import router as notifications_router
+from .events.routes import router as events_router
 
 api_router = APIRouter()
 
@@ -13,6 +20,13 @@ api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(clients_router, prefix="/clients", tags=["clients"])
 api_router.include_router(cases_router, prefix="/cases", tags=["cases"])
 api_router.include_router(tasks_router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(changes_router, prefix="/changes", tags=["changes"])
+api_router.include_router(sync_router, prefix="/sync", tags=["sync"])
+api_router.include_router(documents_router, prefix="/documents", tags=["documents"])
+api_router.include_router(search_router, prefix="/search", tags=["search"])
+api_router.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(notifications_router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(events_router, prefix="/events", tags=["events"])
 
 # CORREÇÃO: incluir auth_router com prefixo "/auth"
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
\ No newline at end of file
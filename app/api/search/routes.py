@@ -0,0 +1,82 @@
+"""
+Busca textual nos processos, anotações, andamentos e documentos do escritório.
+
+Uma única consulta em search_documents (app.database.search): o índice GIN
+(law_firm_id, search_vector) seleciona as linhas do escritório que contêm
+os termos, que são ordenadas por relevância. Os trechos (ts_headline, a
+parte cara) são gerados só para a página retornada.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...database import get_db
+from ... import schemas, models, jobs
+from ...dependencies import get_current_active_user, get_operator_user
+
+router = APIRouter()
+
+ENTITIES = ("cases", "notes", "case_movements", "documents")
+ENTITY_PATTERN = "^(" + "|".join(ENTITIES) + ")$"
+
+SEARCH = text("""
+    WITH q AS (SELECT websearch_to_tsquery(CAST(:config AS regconfig), :q) AS query),
+    hits AS (
+        SELECT d.entity, d.entity_id, d.case_id, d.content,
+               ts_rank_cd(d.search_vector, q.query, 32) AS rank
+        FROM search_documents d, q
+        WHERE d.law_firm_id = :law_firm_id
+          AND d.search_vector @@ q.query
+          AND d.entity = ANY(:entities)
+        ORDER BY rank DESC, d.entity_id
+        LIMIT :limit OFFSET :skip
+    )
+    SELECT hits.entity, hits.entity_id, hits.case_id, hits.rank,
+           ts_headline(CAST(:config AS regconfig), hits.content, q.query,
+                       'MaxFragments=2, MinWords=5, MaxWords=20, FragmentDelimiter=" ... "') AS snippet
+    FROM hits, q
+    ORDER BY hits.rank DESC, hits.entity_id
+""").bindparams(
+    bindparam("law_firm_id", type_=UUID(as_uuid=True)),
+    bindparam("entities", type_=ARRAY(String)),
+)
+
+
+@router.get("/", response_model=List[schemas.SearchHit])
+def search(
+    q: str = Query(..., min_length=2, max_length=200, description='Termos; aceita "frase exata", OR e -exclusão'),
+    entity: Optional[str] = Query(None, pattern=ENTITY_PATTERN, description="Restringir a uma entidade"),
+    skip: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Resultados do escritório ordenados por relevância, com trechos."""
+    entities = [entity] if entity else list(ENTITIES)
+    rows = db.execute(SEARCH, {
+        "config": settings.SEARCH_TS_CONFIG,
+        "q": q,
+        "law_firm_id": current_user.law_firm_id,
+        "entities": entities,
+        "skip": skip,
+        "limit": limit,
+    }).mappings().all()
+    return rows
+
+
+@router.post("/reindex", response_model=schemas.JobInDB, status_code=status.HTTP_202_ACCEPTED)
+def reindex(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_operator_user)
+):
+    """Indexar agora os registros pendentes (somente operadores). Executado pela fila de jobs."""
+    # Job do sistema, fora do escritório: acompanhado em /jobs/system
+    job = jobs.enqueue(db, "search.reindex", law_firm_id=None, created_by=current_user.id)
+    db.commit()
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/system/{job.id}"
+    return job
@@ -0,0 +1,126 @@
+"""
+Sincronização incremental para clientes offline (app mobile).
+
+GET /sync?since=<watermark> devolve clients, cases e tasks alterados e os
+tombstones das remoções desde o watermark. O watermark é opaco; a primeira
+sincronização (sem since) devolve tudo.
+
+Cada chamada fixa um limite superior `upper` = now() - SYNC_LAG_SECONDS: o
+updated_at é o início da transação, então uma transação longa pode
+confirmar depois que outra mais nova já foi lida; o atraso evita que o
+watermark passe por ela. Com réplicas, o atraso deve ser maior que
+REPLICA_MAX_LAG_SECONDS.
+
+A paginação percorre as entidades em sequência com keyset
+(updated_at, id) - muitas linhas com o mesmo updated_at (uma importação em
+uma transação) não são perdidas entre páginas.
+"""
+import base64
+from datetime import datetime, timedelta, timezone
+import json
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from ...config import settings
+from ...database import get_db
+from ... import schemas, models
+from ...dependencies import get_current_active_user
+
+router = APIRouter()
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (chave na resposta, modelo, coluna de tempo)
+PHASES = [
+    ("clients", models.Client, models.Client.updated_at),
+    ("cases", models.Case, models.Case.updated_at),
+    ("tasks", models.Task, models.Task.updated_at),
+    ("deleted", models.SyncTombstone, models.SyncTombstone.deleted_at),
+]
+
+
+def _id_value(model, value: str):
+    # Tombstones têm id inteiro; as entidades, UUID
+    return int(value) if model is models.SyncTombstone else uuid.UUID(value)
+
+
+def encode_watermark(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_watermark(token: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        state["since"] = datetime.fromisoformat(state["since"])
+        if "upper" in state:
+            state["upper"] = datetime.fromisoformat(state["upper"])
+        return state
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Watermark inválido")
+
+
+@router.get("/", response_model=schemas.SyncResponse)
+def sync(
+    since: Optional[str] = Query(None, description="Watermark retornado em `next` pela chamada anterior"),
+    limit: int = Query(500, ge=1, le=2000, description="Máximo de registros por página"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Alterações e remoções do escritório desde o watermark."""
+    state = decode_watermark(since) if since else {"since": EPOCH}
+    if "upper" not in state:
+        # Nova rodada: fixa o limite superior até terminar a paginação
+        upper = db.execute(
+            select(func.now() - timedelta(seconds=settings.SYNC_LAG_SECONDS))
+        ).scalar()
+        state = {"since": state["since"], "upper": upper, "phase": 0, "after": None}
+
+    result = {"clients": [], "cases": [], "tasks": [], "deleted": []}
+    remaining = limit
+    phase = state["phase"]
+    after = state["after"]
+
+    while phase < len(PHASES) and remaining > 0:
+        key, model, column = PHASES[phase]
+        query = db.query(model).filter(
+            model.law_firm_id == current_user.law_firm_id,
+            column > state["since"],
+            column <= state["upper"],
+        )
+        if after is not None:
+            query = query.filter(
+                tuple_(column, model.id) > (datetime.fromisoformat(after[0]), _id_value(model, after[1]))
+            )
+        rows = query.order_by(column, model.id).limit(remaining + 1).all()
+
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            last = rows[-1]
+            after = [getattr(last, column.key).isoformat(), str(last.id)]
+            result[key] = rows
+            remaining = 0
+            break
+
+        result[key] = rows
+        remaining -= len(rows)
+        phase += 1
+        after = None
+
+    if phase >= len(PHASES):
+        # Rodada completa: a próxima começa de onde esta terminou
+        next_state = {"since": state["upper"].isoformat()}
+        has_more = False
+    else:
+        next_state = {
+            "since": state["since"].isoformat(),
+            "upper": state["upper"].isoformat(),
+            "phase": phase,
+            "after": after,
+        }
+        has_more = True
+
+    return {**result, "next": encode_watermark(next_state), "has_more": has_more}
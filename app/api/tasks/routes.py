@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ...database import get_db
-from ... import schemas, models
-from ...dependencies import get_current_active_user
+from ... import schemas, models, queries
+from ...dependencies import get_current_active_user, list_etag
+from ...core.instrumentation import query_budget
 
 router = APIRouter()
 
@@ -23,7 +24,8 @@ def create_task(
     db.refresh(db_task)
     return db_task
 
-@router.get("/", response_model=List[schemas.TaskInDB])
+@router.get("/", response_model=List[schemas.TaskInDB], dependencies=[Depends(list_etag("tasks"))])
+@query_budget(3)
 def read_tasks(
     skip: int = 0,
     limit: int = 100,
@@ -31,7 +33,5 @@ def read_tasks(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Listar tarefas do escritório."""
-    tasks = db.query(models.Task).filter(
-        models.Task.law_firm_id == current_user.law_firm_id
-    ).offset(skip).limit(limit).all()
+    tasks = queries.list_tasks(db, current_user.law_firm_id, skip, limit)
     return tasks
\ No newline at end of file
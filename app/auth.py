@@ -18,6 +18,7 @@ class UserLogin(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str
     user_id: uuid.UUID
     law_firm_id: uuid.UUID
     email: EmailStr
@@ -31,6 +32,7 @@ class TokenResponse(BaseModel):
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "token_type": "bearer",
+                "refresh_token": "q3X0mVf3s9Yk2bQ1...",
                 "user_id": "123e4567-e89b-12d3-a456-426614174000",
                 "law_firm_id": "123e4567-e89b-12d3-a456-426614174001",
                 "email": "admin@escritorio.com",
@@ -40,6 +42,10 @@ class TokenResponse(BaseModel):
             }
         }
 
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenRefreshResponse(BaseModel):
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    token_type: str = "bearer"
+    refresh_token: str
\ No newline at end of file
@@ -1,5 +1,6 @@
+from ipaddress import IPv4Network, IPv6Network, ip_network
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from urllib.parse import quote_plus
 from pydantic_settings import BaseSettings
 
@@ -13,8 +14,22 @@ class Settings(BaseSettings):
     
     # Segurança
     SECRET_KEY: str = "change-this-in-production"
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = "HS256"  # HS256 (SECRET_KEY), ES256 ou RS256 (JWT_PRIVATE_KEY_PATH)
+    JWT_PRIVATE_KEY_PATH: Optional[str] = None  # PEM da chave de assinatura (ES256/RS256)
+    JWT_KEY_ID: Optional[str] = None  # kid publicado; padrão: thumbprint da chave (RFC 7638)
+    JWT_PUBLIC_KEY_PATHS: str = ""  # PEMs públicos de chaves anteriores, aceitos durante a rotação
+    JWT_ACCEPT_HS256: bool = False  # aceita tokens HS256 antigos ao migrar para ES256/RS256
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # rotacionado a cada /auth/refresh
+    REVOCATION_SYNC_SECONDS: float = 2.0  # prazo para um logout valer nos demais workers
+
+    # Limite de falhas de login (janela deslizante), verificado antes do banco e do bcrypt
+    LOGIN_IP_LIMIT: int = 30  # falhas por IP na janela (0 desliga)
+    LOGIN_EMAIL_LIMIT: int = 10  # falhas por email na janela (0 desliga); um login correto zera
+    LOGIN_RATE_WINDOW_SECONDS: float = 300
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (por worker) ou redis (compartilhado)
+    RATE_LIMIT_REDIS_URL: Optional[str] = None  # padrão: CACHE_REDIS_URL
+    TRUSTED_PROXIES: str = ""  # IPs/redes dos proxies reversos; deles o IP do cliente vem do X-Forwarded-For
     
     # CORS - como string simples
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000"
@@ -26,6 +41,115 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = "postgres"
     DATABASE_NAME: str = "law_firm_db"
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_WARMUP: int = 5  # conexões abertas em paralelo no startup
+    DB_POOL_LIVENESS_INTERVAL: int = 30  # segundos entre verificações de conexões ociosas
+
+    # Réplicas de leitura - URLs separadas por vírgula
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 2.0  # réplicas mais atrasadas são ignoradas
+    REPLICA_CHECK_INTERVAL: int = 5
+    REPLICA_STICKY_SECONDS: int = 5  # leituras no primário após uma escrita do cliente (cookie last_write)
+
+    # Instrumentação de SQL por requisição
+    SQL_QUERY_BUDGET: int = 20  # orçamento padrão de queries por requisição
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # repetições do mesmo comando que indicam N+1
+    SQL_STRICT_MODE: bool = False  # responde 500 quando o orçamento é excedido (testes)
+
+    # Métricas - se definido, /metrics exige "Authorization: Bearer <token>"
+    METRICS_TOKEN: Optional[str] = None
+
+    # Rotas de operação (profiler, reindexação, GC de blobs): além do login,
+    # exigem o header "X-Operator-Token: <token>". Sem token, ficam desabilitadas.
+    OPERATOR_TOKEN: Optional[str] = None
+
+    # Cache de respostas - invalidado pelas versões de entity_versions
+    CACHE_BACKEND: str = "memory"  # memory (por worker), redis (compartilhado) ou none
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000  # apenas no backend memory
+    CACHE_LOCK_SECONDS: float = 5.0  # espera máxima pelo cálculo de outra requisição
+
+    # Auditoria / feed de alterações
+    AUDIT_MODE: str = "async"  # async (gravação em lote após o commit), transactional ou off
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FEED_LAG_SECONDS: float = 2.0  # /changes só entrega registros mais antigos que isso
+
+    # Eventos de alteração em tempo real (/events, SSE) via LISTEN/NOTIFY
+    EVENTS_ENABLED: bool = True
+    EVENTS_CHANNEL: str = "juris_changes"
+    EVENTS_QUEUE_SIZE: int = 256  # eventos pendentes por conexão antes de desconectá-la
+    EVENTS_MAX_CONNECTIONS: int = 1000  # por worker
+    EVENTS_HEARTBEAT_SECONDS: float = 15  # comentário periódico mantém proxies com a conexão aberta
+    EVENTS_USER_CHECK_SECONDS: float = 60  # revalida no banco se o usuário da conexão continua ativo
+
+    # Sincronização incremental (/sync)
+    SYNC_LAG_SECONDS: float = 5.0  # alterações mais novas ficam para a próxima sincronização
+
+    # Armazenamento de documentos
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_PATH: str = "./storage"
+    STORAGE_CHUNK_SIZE: int = 1024 * 1024  # bloco de gravação do upload
+    DOCUMENT_MAX_SIZE_MB: int = 500
+    BLOB_GC_GRACE_SECONDS: float = 3600  # blobs sem referências são apagados após este prazo
+
+    # Busca textual
+    SEARCH_TS_CONFIG: str = "portuguese"  # configuração de text search do Postgres
+    SEARCH_REINDEX_INTERVAL_SECONDS: float = 60  # 0 desliga o reindexador em segundo plano
+    SEARCH_REINDEX_BATCH_SIZE: int = 500
+
+    # Fila de jobs (python -m app.jobs.worker)
+    JOBS_THREADS: int = 4
+    JOBS_PROCESSES: int = 0  # pool de processos para jobs de CPU (0 = um por núcleo)
+    JOBS_VISIBILITY_TIMEOUT_SECONDS: float = 300  # renovado enquanto o job roda
+    JOBS_POLL_SECONDS: float = 1
+    JOBS_BACKOFF_SECONDS: float = 10  # dobra a cada tentativa
+    JOBS_BACKOFF_MAX_SECONDS: float = 3600
+    JOBS_METRICS_PORT: int = 0  # 0 desliga o /metrics do worker
+
+    # Extração de texto dos documentos (python -m app.extraction)
+    EXTRACTION_PROCESSES: int = 0  # 0 = um processo por núcleo
+    EXTRACTION_MEMORY_MB: int = 1024  # limite de memória de cada processo extrator
+    EXTRACTION_MAX_CHARS: int = 2_000_000  # texto extraído além disso é descartado
+    EXTRACTION_MAX_ATTEMPTS: int = 5
+    EXTRACTION_BACKOFF_SECONDS: float = 30  # dobra a cada tentativa
+    EXTRACTION_BACKOFF_MAX_SECONDS: float = 3600
+    EXTRACTION_LEASE_SECONDS: float = 900  # job "running" há mais que isso volta para a fila
+    EXTRACTION_POLL_SECONDS: float = 2
+    EXTRACTION_METRICS_PORT: int = 0  # 0 desliga o /metrics do worker
+
+    # Lembretes de audiências e prazos (python -m app.reminders)
+    REMINDER_HEARING_LEADS_HOURS: str = "24,2"  # antecedências, separadas por vírgula
+    REMINDER_TASK_LEAD_DAYS: str = "1,0"  # dias antes do vencimento
+    REMINDER_TASK_HOUR: int = 8  # hora local de envio dos lembretes de tarefas
+    REMINDER_TIMEZONE: str = "America/Sao_Paulo"
+    REMINDER_CHANNELS: str = "inbox"  # inbox, smtp e/ou webhook, separados por vírgula
+    REMINDER_SMTP_HOST: str = "localhost"
+    REMINDER_SMTP_PORT: int = 1025
+    REMINDER_SMTP_FROM: str = "lembretes@juris.local"
+    REMINDER_WEBHOOK_URL: Optional[str] = None
+    REMINDER_WEBHOOK_SECRET: Optional[str] = None  # assina o corpo (X-Signature: sha256=...)
+    REMINDER_INTERVAL_SECONDS: float = 60
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_MAX_ATTEMPTS: int = 5
+    REMINDER_METRICS_PORT: int = 0  # 0 desliga o /metrics do processo
+
+    # Logging estruturado - gravado em lotes por uma thread de fundo
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json ou text
+    LOG_QUEUE_SIZE: int = 10000  # com a fila cheia os registros são descartados
+    LOG_BATCH_SIZE: int = 500
+    LOG_SAMPLE_ROUTES: str = ""  # "rota=fração" separados por vírgula, ex. "/health=0,/api/v1/tasks/=0.1"
+    LOG_SLOW_REQUEST_MS: int = 1000  # requisições mais lentas são sempre registradas
+
+    # Profiler por amostragem - rotas /profiling para administradores
+    PROFILING_ENABLED: bool = False  # instala os wrappers e as rotas de controle
+    PROFILING_SAMPLE_RATE: float = 0.0  # fração de requisições amostradas desde o startup
+    PROFILING_INTERVAL_MS: int = 5
+    PROFILING_MAX_STACKS: int = 20000  # pilhas distintas mantidas em memória
     
     @property
     def DATABASE_URL(self) -> str:
@@ -36,6 +160,46 @@ class Settings(BaseSettings):
             f"@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         )
     
+    @property
+    def REPLICA_URLS(self) -> List[str]:
+        """Retorna lista de URLs das réplicas de leitura."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
+    @property
+    def LOG_SAMPLE_RATES(self) -> Dict[str, float]:
+        """Retorna a fração de requisições registradas por template de rota."""
+        rates = {}
+        for item in self.LOG_SAMPLE_ROUTES.split(","):
+            route, _, rate = item.strip().rpartition("=")
+            if route:
+                rates[route] = float(rate)
+        return rates
+    
+    @property
+    def JWT_PUBLIC_KEY_PATH_LIST(self) -> List[str]:
+        """Retorna lista de chaves públicas anteriores aceitas na verificação."""
+        return [path.strip() for path in self.JWT_PUBLIC_KEY_PATHS.split(",") if path.strip()]
+    
+    @property
+    def TRUSTED_PROXY_NETWORKS(self) -> List[Union[IPv4Network, IPv6Network]]:
+        """Retorna lista de redes dos proxies reversos confiáveis."""
+        return [ip_network(net.strip(), strict=False) for net in self.TRUSTED_PROXIES.split(",") if net.strip()]
+    
+    @property
+    def REMINDER_HEARING_LEADS(self) -> List[float]:
+        """Antecedências dos lembretes de audiência, em segundos, da maior para a menor."""
+        return sorted((float(h) * 3600 for h in self.REMINDER_HEARING_LEADS_HOURS.split(",") if h.strip()), reverse=True)
+    
+    @property
+    def REMINDER_TASK_LEADS(self) -> List[int]:
+        """Antecedências dos lembretes de tarefas, em dias, da maior para a menor."""
+        return sorted((int(d) for d in self.REMINDER_TASK_LEAD_DAYS.split(",") if d.strip()), reverse=True)
+    
+    @property
+    def REMINDER_CHANNEL_NAMES(self) -> List[str]:
+        """Retorna lista de canais de envio dos lembretes."""
+        return [name.strip() for name in self.REMINDER_CHANNELS.split(",") if name.strip()]
+    
     @property
     def ALLOWED_ORIGINS(self) -> List[str]:
         """Retorna lista de origens CORS permitidas."""
@@ -0,0 +1,252 @@
+"""
+Cache compartilhado de respostas, com backend plugável.
+
+- "memory": LRU com TTL no processo (padrão; cada worker tem o seu).
+- "redis": compartilhado entre workers e máquinas (requer o pacote redis).
+- "none": desliga o cache.
+
+As chaves incluem o escritório e as versões de entity_versions das
+entidades envolvidas. Como toda escrita em clients/cases/tasks incrementa a
+versão na própria transação, uma escrita invalida as entradas do
+escritório sem apagar nada: as chaves antigas deixam de ser lidas e saem
+por LRU/TTL. A versão é lida antes dos dados, então uma entrada pode ser
+mais nova que a versão da sua chave, nunca mais antiga: uma escrita
+concorrente à leitura já incrementou a versão, e a entrada deixa de ser
+lida na requisição seguinte.
+
+Em um miss, apenas uma requisição calcula o valor (single-flight): as
+demais do mesmo worker esperam o resultado; entre workers, um lock no
+backend (SET NX) faz os outros aguardarem o valor aparecer.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from ..config import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.registry.counter(
+    "response_cache_requests_total", "Consultas ao cache de respostas por resultado", ("result",)
+)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def serialize_list(schema, objects: Iterable[Any]) -> bytes:
+    """Serializa objetos ORM como o response_model List[schema] faria."""
+    adapter = _list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(list(objects), from_attributes=True))
+
+
+class MemoryBackend:
+    """LRU com TTL, protegido por lock."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Grava apenas se a chave não existe (lock)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] >= time.monotonic():
+                return False
+            self._data[key] = (time.monotonic() + ttl, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Backend em Redis (ou qualquer servidor compatível com o protocolo)."""
+
+    def __init__(self, url: str = None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requer o pacote redis (pip install redis)") from e
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, value, px=int(ttl * 1000))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self.client.set(key, value, px=int(ttl * 1000), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+class _Flight:
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float = 60, lock_timeout: float = 5.0, prefix: str = "resp"):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _backend_get(self, key: str) -> Optional[bytes]:
+        # Falha no backend (Redis fora do ar) vira miss, não erro da requisição
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Falha ao ler do cache: {e}")
+            return None
+
+    def get_or_compute(self, key: str, compute: Callable[[], bytes], ttl: float = None) -> bytes:
+        value = self._backend_get(key)
+        if value is not None:
+            CACHE_REQUESTS.inc(("hit",))
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            # Outra thread deste worker já está calculando o mesmo valor
+            if flight.done.wait(self.lock_timeout) and flight.value is not None:
+                CACHE_REQUESTS.inc(("coalesced",))
+                return flight.value
+            CACHE_REQUESTS.inc(("miss",))
+            return compute()
+
+        try:
+            flight.value = self._compute_shared(key, compute, ttl or self.ttl)
+            return flight.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _compute_shared(self, key: str, compute: Callable[[], bytes], ttl: float) -> bytes:
+        lock_key = f"{key}:lock"
+        try:
+            locked = self.backend.add(lock_key, b"1", self.lock_timeout)
+        except Exception:
+            locked = True  # sem backend, calcula localmente
+
+        if not locked:
+            # Outro worker está calculando: aguarda o valor aparecer no backend
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                value = self._backend_get(key)
+                if value is not None:
+                    CACHE_REQUESTS.inc(("coalesced",))
+                    return value
+
+        CACHE_REQUESTS.inc(("miss",))
+        try:
+            value = compute()
+            try:
+                self.backend.set(key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Falha ao gravar no cache: {e}")
+            return value
+        finally:
+            if locked:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception:
+                    pass
+
+    def response(self, request: Request, law_firm_id, entities: Iterable[str],
+                 compute: Callable[[], bytes], db=None, ttl: float = None) -> Response:
+        """
+        Resposta JSON cacheada por escritório, rota, query string e versões
+        das entidades. Reaproveita as versões lidas por list_etag, se houver.
+        """
+        entities = list(entities)
+        current = getattr(request.state, "entity_versions", None)
+        if current is None or not all(name in current for name in entities):
+            from ..database import versions
+            current = versions.get_versions(db, law_firm_id, entities)
+        version = ",".join(f"{name}:{current[name]}" for name in sorted(entities))
+        key = f"{self.prefix}:{law_firm_id}:{request.url.path}?{request.url.query}:{version}"
+        body = self.get_or_compute(key, compute, ttl)
+        return _json_response(request, body)
+
+
+class NullCache(ResponseCache):
+    """Cache desligado: sempre calcula."""
+
+    def __init__(self):
+        super().__init__(backend=None)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        return compute()
+
+    def response(self, request, law_firm_id, entities, compute, db=None, ttl=None) -> Response:
+        return _json_response(request, compute())
+
+
+def _json_response(request: Request, body: bytes) -> Response:
+    # Um Response retornado pelo endpoint não recebe os headers definidos
+    # pelas dependências: o ETag de list_etag é copiado aqui.
+    return Response(content=body, media_type="application/json",
+                    headers=getattr(request.state, "etag_headers", None))
+
+
+def create_cache() -> ResponseCache:
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisBackend(settings.CACHE_REDIS_URL)
+    else:
+        backend = MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, ttl=settings.CACHE_TTL_SECONDS, lock_timeout=settings.CACHE_LOCK_SECONDS)
+
+
+response_cache = create_cache()
@@ -0,0 +1,65 @@
+"""
+Denylist de tokens revogados, na memória de cada worker.
+
+Guarda jti de tokens de acesso (logout) e ids de família de refresh tokens
+(logout e reuso detectado), cada um até a expiração dos tokens de acesso
+que ele invalida - depois disso o próprio `exp` já os recusa. Com tokens
+de 30 minutos o conjunto fica pequeno, e a verificação em cada requisição
+é uma consulta a dicionário, sem lock nem banco.
+
+A tabela revoked_tokens é a fonte compartilhada entre os workers:
+app.database.revocation grava nela e mantém esta denylist sincronizada.
+"""
+import heapq
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from . import metrics
+
+TOKENS_REJECTED = metrics.registry.counter("tokens_revoked_rejected_total", "Requisições recusadas por token revogado")
+
+
+class TokenDenylist:
+    def __init__(self):
+        self._entries = {}  # id -> expiração (epoch)
+        self._expirations: List[Tuple[float, str]] = []  # heap para a limpeza
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entries: Iterable[Tuple[str, float]]) -> None:
+        """Adiciona (id, expiração em epoch); entradas já expiradas são ignoradas."""
+        now = time.time()
+        with self._lock:
+            for key, expires_at in entries:
+                if expires_at <= now or self._entries.get(key, 0) >= expires_at:
+                    continue
+                self._entries[key] = expires_at
+                heapq.heappush(self._expirations, (expires_at, key))
+            self._purge(now)
+
+    def is_revoked(self, *keys: Optional[str]) -> bool:
+        """True se algum dos ids (jti, família) está revogado."""
+        for key in keys:
+            expires_at = self._entries.get(key) if key is not None else None
+            if expires_at is not None and expires_at > time.time():
+                TOKENS_REJECTED.inc()
+                return True
+        return False
+
+    def purge(self) -> None:
+        with self._lock:
+            self._purge(time.time())
+
+    def _purge(self, now: float) -> None:
+        while self._expirations and self._expirations[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expirations)
+            # A entrada pode ter sido estendida por uma revogação posterior
+            if self._entries.get(key) == expires_at:
+                del self._entries[key]
+
+
+denylist = TokenDenylist()
+metrics.registry.gauge_func("token_denylist_size", "Tokens e famílias revogados na denylist local", lambda: len(denylist))
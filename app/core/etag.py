@@ -0,0 +1,42 @@
+"""
+ETags fracos e GET condicional.
+
+O ETag é derivado de versões (entity_versions ou updated_at), não do corpo
+da resposta: com If-None-Match igual, a rota responde 304 sem executar a
+consulta principal nem serializar nada.
+"""
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+
+from ..config import settings
+
+
+def make_etag(*parts) -> str:
+    """ETag fraco a partir das partes; a versão da API invalida ETags antigos."""
+    digest = hashlib.blake2b(
+        "|".join(str(part) for part in (settings.VERSION, *parts)).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca (RFC 9110): ignora o prefixo W/."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> None:
+    """
+    Define ETag/Cache-Control na resposta e interrompe com 304 se o cliente
+    já tem essa versão.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    request.state.etag_headers = headers
@@ -0,0 +1,131 @@
+"""
+Distribuição de eventos de alteração para as conexões SSE deste worker.
+
+O ChangeListener (app.database.notify) recebe os NOTIFY do Postgres numa
+thread e entrega cada lote ao broker com publish(); o broker repassa ao
+event loop com uma única chamada thread-safe por lote, e lá o lote é
+copiado para a fila de cada assinante do escritório.
+
+Cada conexão tem uma fila limitada (EVENTS_QUEUE_SIZE). Um cliente que não
+consome no ritmo dos eventos é desconectado em vez de acumular memória no
+servidor: ao reconectar, ele recarrega as listas (com ETag, normalmente 304)
+e volta a receber eventos.
+"""
+import asyncio
+from collections import defaultdict
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..config import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = metrics.registry.gauge("events_subscribers", "Conexões de eventos abertas neste worker")
+EVENTS_DELIVERED = metrics.registry.counter("events_delivered_total", "Eventos entregues às filas das conexões")
+EVENTS_EVICTED = metrics.registry.counter(
+    "events_evicted_total", "Conexões desconectadas por não consumirem os eventos a tempo"
+)
+
+# Marcador posto na fila de uma conexão removida
+EVICTED = object()
+
+
+class Subscription:
+    def __init__(self, law_firm_id: str, entities: Optional[Set[str]], maxsize: int):
+        self.law_firm_id = law_firm_id
+        self.entities = entities
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.evicted = False
+
+    def _put(self, event: dict) -> bool:
+        """Enfileira o evento; False se a fila está cheia."""
+        # Eventos sem entidade (resync) valem para qualquer filtro
+        if self.entities is not None and event.get("entity") not in (None, *self.entities):
+            return True
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        EVENTS_DELIVERED.inc()
+        return True
+
+    def _evict(self) -> None:
+        self.evicted = True
+        # Descarta o que ficou pendente: o cliente vai recarregar tudo
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(EVICTED)
+
+
+class Broker:
+    def __init__(self, queue_size: int = 256, max_subscribers: int = 1000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Event loop do worker (chamado no lifespan)."""
+        self._loop = loop
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def subscribe(self, law_firm_id, entities: Optional[Iterable[str]] = None) -> Optional[Subscription]:
+        """Nova assinatura (no event loop); None se o limite de conexões foi atingido."""
+        if self._count >= self.max_subscribers:
+            return None
+        subscription = Subscription(str(law_firm_id), set(entities) if entities else None, self.queue_size)
+        self._subscribers[subscription.law_firm_id].add(subscription)
+        self._count += 1
+        SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.law_firm_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.law_firm_id]
+        self._count -= 1
+        SUBSCRIBERS.dec()
+
+    def publish(self, law_firm_id, events: List[dict]) -> None:
+        """Entrega um lote de eventos do escritório. Pode ser chamado de qualquer thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, str(law_firm_id), events)
+        except RuntimeError:  # loop encerrado entre a verificação e a chamada
+            pass
+
+    def resync(self) -> None:
+        """Avisa todas as conexões de que eventos podem ter sido perdidos."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out_all, [{"op": "resync"}])
+        except RuntimeError:
+            pass
+
+    def _fan_out(self, law_firm_id: str, events: List[dict]) -> None:
+        for subscription in list(self._subscribers.get(law_firm_id, ())):
+            for event in events:
+                if not subscription._put(event):
+                    logger.warning(f"Conexão de eventos do escritório {law_firm_id} removida: fila cheia")
+                    EVENTS_EVICTED.inc()
+                    self.unsubscribe(subscription)
+                    subscription._evict()
+                    break
+
+    def _fan_out_all(self, events: List[dict]) -> None:
+        for law_firm_id in list(self._subscribers):
+            self._fan_out(law_firm_id, events)
+
+broker = Broker(settings.EVENTS_QUEUE_SIZE, settings.EVENTS_MAX_CONNECTIONS)
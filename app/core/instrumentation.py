@@ -0,0 +1,176 @@
+"""
+Instrumentação de SQL por requisição.
+
+Eventos do SQLAlchemy contam os comandos executados, o tempo total de
+banco, o comando mais lento e as repetições de um mesmo comando
+(fingerprint) - que é como um N+1 aparece. O middleware publica os números
+no header Server-Timing e em uma linha de log por requisição.
+
+Em modo estrito (SQL_STRICT_MODE), a requisição que ultrapassa o orçamento
+de queries da rota responde 500, para que os testes falhem.
+"""
+from contextvars import ContextVar
+import json
+import logging
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+logger = logging.getLogger("app.sql")
+
+_IN_LIST = re.compile(r"\((?:\s*%\(\w+\)s\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestSQLStats:
+    """Estatísticas de SQL de uma requisição."""
+
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        fingerprint = fingerprint_statement(statement)
+        self.fingerprints[fingerprint] += 1
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = fingerprint
+
+    def repeated(self, threshold: int) -> list:
+        """Fingerprints executados `threshold` vezes ou mais (suspeita de N+1)."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def current_stats() -> Optional[RequestSQLStats]:
+    return _current.get()
+
+
+def fingerprint_statement(statement: str) -> str:
+    """Normaliza espaços e listas IN expandidas para agrupar comandos iguais."""
+    statement = _IN_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get("query_start"):
+        stats.record(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+
+def install() -> None:
+    """Registra os eventos em todos os engines (primário e réplicas)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(limit: int):
+    """Define o número máximo de queries de uma rota (modo estrito)."""
+    def decorator(func):
+        func.query_budget = limit
+        return func
+    return decorator
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class SQLInstrumentationMiddleware:
+    """Middleware ASGI que coleta as estatísticas de SQL de cada requisição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        state = {"blocked": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = scope.get("route")
+                route_path = getattr(route, "path", scope["path"])
+                budget = getattr(scope.get("endpoint"), "query_budget", settings.SQL_QUERY_BUDGET)
+                self._log(scope["method"], route_path, message["status"], stats, elapsed, budget)
+
+                if settings.SQL_STRICT_MODE and stats.count > budget:
+                    state["blocked"] = True
+                    body = json.dumps({
+                        "detail": f"Orçamento de queries excedido em {route_path}: {stats.count} > {budget}",
+                        "statements": dict(stats.fingerprints.most_common(5)),
+                    }).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json"),
+                                    (b"content-length", str(len(body)).encode())],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    (f'db;dur={stats.total * 1000:.1f};desc="{stats.count} queries", '
+                     f'app;dur={elapsed * 1000:.1f}').encode(),
+                ))
+                message = {**message, "headers": headers}
+            elif state["blocked"]:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def _log(method, route_path, status, stats, elapsed, budget):
+        if stats.count == 0:
+            return
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        fields = {
+            "method": method,
+            "route": route_path,
+            "status": status,
+            "queries": stats.count,
+            "db_ms": round(stats.total * 1000, 1),
+            "slowest_ms": round(stats.slowest * 1000, 1),
+            "total_ms": round(elapsed * 1000, 1),
+        }
+        if repeated:
+            fields["n_plus_one"] = [{"count": n, "statement": fp[:120]} for fp, n in repeated]
+            logger.warning("sql", extra=fields)
+        elif stats.count > budget:
+            fields["budget"] = budget
+            logger.warning("sql", extra=fields)
+        else:
+            logger.info("sql", extra=fields)
@@ -0,0 +1,123 @@
+"""
+Chaves de assinatura dos tokens JWT.
+
+O python-jose reconstrói o objeto de chave (parse do PEM ou do segredo) a
+cada encode/decode quando recebe a chave como texto; aqui as chaves são
+construídas uma vez, na importação, e passadas já prontas.
+
+- ALGORITHM=HS256 (padrão): assinatura com SECRET_KEY, como antes.
+- ALGORITHM=ES256 ou RS256: assinatura com a chave privada de
+  JWT_PRIVATE_KEY_PATH. A chave pública vai para /.well-known/jwks.json,
+  e outros serviços validam os tokens sem compartilhar segredo.
+
+Cada token leva no header o `kid` da chave que o assinou. Para trocar de
+chave sem derrubar sessões, a pública anterior continua em
+JWT_PUBLIC_KEY_PATHS (só verificação) até os tokens dela expirarem.
+"""
+import base64
+from dataclasses import dataclass
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from ..config import settings
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "ES384", "ES512", "RS256", "RS384", "RS512")
+
+
+@dataclass
+class VerificationKey:
+    kid: Optional[str]
+    algorithm: str
+    key: Key  # pública, nas assimétricas
+    public_jwk: Optional[dict] = None  # None para chaves simétricas (não publicadas)
+
+
+def thumbprint(public_jwk: dict) -> str:
+    """kid derivado da chave pública (RFC 7638): estável entre workers e reinícios."""
+    required = {"EC": ("crv", "kty", "x", "y"), "RSA": ("e", "kty", "n")}[public_jwk["kty"]]
+    canonical = json.dumps({name: public_jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _public_key(key: Key, algorithm: str, kid: Optional[str] = None) -> VerificationKey:
+    public_key = key if key.is_public() else key.public_key()
+    public_jwk = public_key.to_dict()
+    kid = kid or thumbprint(public_jwk)
+    public_jwk.update({"kid": kid, "use": "sig", "alg": algorithm})
+    return VerificationKey(kid, algorithm, public_key, public_jwk)
+
+
+def _public_key_algorithm(pem: str) -> str:
+    """Algoritmo de uma chave pública anterior (pode diferir do atual, ex. RS256 -> ES256)."""
+    public_key = serialization.load_pem_public_key(pem.encode())
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return {256: "ES256", 384: "ES384", 521: "ES512"}[public_key.curve.key_size]
+    raise ValueError(f"Tipo de chave pública não suportado: {type(public_key).__name__}")
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+class KeySet:
+    """Chave de assinatura atual e chaves aceitas na verificação, por kid."""
+
+    def __init__(self, signing_key: Key, signing: VerificationKey, verification: List[VerificationKey]):
+        self.signing_key = signing_key
+        self.signing = signing
+        self.by_kid: Dict[Optional[str], VerificationKey] = {signing.kid: signing}
+        for key in verification:
+            if key.kid in self.by_kid:
+                # Uma chave de verificação com o mesmo kid tomaria o lugar da outra
+                raise ValueError(f"kid duplicado nas chaves JWT: {key.kid!r}")
+            self.by_kid[key.kid] = key
+
+    def encode(self, claims: dict) -> str:
+        headers = {"kid": self.signing.kid} if self.signing.kid else None
+        return jwt.encode(claims, self.signing_key, algorithm=self.signing.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict:
+        """Valida assinatura e exp; levanta JWTError se o token não é aceito."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.by_kid.get(kid) if kid is None or isinstance(kid, str) else None
+        if key is None:
+            raise JWTError(f"Chave de assinatura desconhecida: {kid!r}")
+        # O algoritmo vem da chave, nunca do header do token
+        return jwt.decode(token, key.key, algorithms=[key.algorithm])
+
+    def jwks(self) -> dict:
+        return {"keys": [key.public_jwk for key in self.by_kid.values() if key.public_jwk is not None]}
+
+
+def load_keys() -> KeySet:
+    algorithm = settings.ALGORITHM.upper()
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        # Tokens sem kid, como sempre foram emitidos
+        key = jwk.construct(settings.SECRET_KEY, algorithm)
+        return KeySet(key, VerificationKey(None, algorithm, key), [])
+
+    if not settings.JWT_PRIVATE_KEY_PATH:
+        raise RuntimeError(f"ALGORITHM={algorithm} requer JWT_PRIVATE_KEY_PATH")
+    private_key = jwk.construct(_read(settings.JWT_PRIVATE_KEY_PATH), algorithm)
+    verification = []
+    for path in settings.JWT_PUBLIC_KEY_PATH_LIST:
+        pem = _read(path)
+        algorithm_before = _public_key_algorithm(pem)
+        verification.append(_public_key(jwk.construct(pem, algorithm_before), algorithm_before))
+    if settings.JWT_ACCEPT_HS256:
+        # Migração do HS256: tokens antigos (sem kid) valem até expirarem
+        verification.append(VerificationKey(None, "HS256", jwk.construct(settings.SECRET_KEY, "HS256")))
+    return KeySet(private_key, _public_key(private_key, algorithm, settings.JWT_KEY_ID), verification)
+
+
+keys = load_keys()
@@ -0,0 +1,245 @@
+"""
+Logging estruturado (JSON) sem bloquear as requisições.
+
+Os handlers da aplicação apenas enfileiram o registro em uma fila limitada;
+uma thread de fundo formata e grava em lotes, com um único write por lote.
+Com a fila cheia o registro é descartado e contado (log_records_dropped_total)
+em vez de bloquear a thread da requisição.
+
+O request id (header X-Request-ID ou gerado) fica em uma ContextVar, que o
+AnyIO copia para o threadpool - assim os logs da instrumentação de SQL e dos
+endpoints síncronos saem correlacionados com o log de acesso.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Optional
+
+from ..config import settings
+from . import metrics
+
+access_logger = logging.getLogger("app.access")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Atributos padrão de um LogRecord, que não vão para o JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+LOG_DROPPED = metrics.registry.counter(
+    "log_records_dropped_total", "Registros de log descartados com a fila cheia"
+)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class JSONFormatter(logging.Formatter):
+    """Uma linha JSON por registro; campos passados em `extra` viram chaves."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível para desenvolvimento, com request id e campos extras."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(f"{k}={v}" for k, v in record.__dict__.items() if k not in _RESERVED)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            line = f"{line} request_id={request_id}"
+        return f"{line} {extras}" if extras else line
+
+
+class AsyncQueueHandler(logging.Handler):
+    """
+    Handler que enfileira registros para uma thread escritora. O que depende
+    do contexto da requisição (mensagem, request id, traceback) é resolvido
+    no emit; a serialização fica para a thread de fundo.
+    """
+
+    def __init__(self, stream=None, maxsize: int = 10000, batch_size: int = 500):
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize)
+        self._thread = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record.request_id = _request_id.get()
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+        except Exception:
+            self.handleError(record)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Grava o que estiver na fila e encerra a thread escritora."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            # Drena o que já chegou, sem esperar o lote encher
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            self._write([record for record in batch if record is not None])
+            if stopping:
+                return
+
+    def _write(self, records: list) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            pass
+
+
+_handler: Optional[AsyncQueueHandler] = None
+
+metrics.registry.gauge_func(
+    "log_queue_depth", "Registros de log aguardando a thread escritora",
+    lambda: _handler.queue.qsize() if _handler else 0,
+)
+
+
+def configure() -> AsyncQueueHandler:
+    """Instala o handler assíncrono na raiz e redireciona os loggers do uvicorn."""
+    global _handler
+    if _handler is not None:
+        return _handler
+
+    _handler = AsyncQueueHandler(maxsize=settings.LOG_QUEUE_SIZE, batch_size=settings.LOG_BATCH_SIZE)
+    _handler.setFormatter(JSONFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    _handler.start()
+    atexit.register(_handler.stop)
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # O log de acesso da aplicação substitui o do uvicorn
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    return _handler
+
+
+class AccessLogMiddleware:
+    """
+    Middleware ASGI que define o request id e grava uma linha de acesso por
+    requisição. Rotas de alto volume podem ser amostradas (LOG_SAMPLE_ROUTES);
+    erros e requisições lentas são sempre registrados.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rates = settings.LOG_SAMPLE_RATES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._log(scope, status["code"], elapsed_ms)
+            _request_id.reset(token)
+
+    def _log(self, scope, status_code: int, elapsed_ms: float) -> None:
+        route = getattr(scope.get("route"), "path", None)
+        rate = self.sample_rates.get(route, 1.0)
+        if (rate < 1.0 and status_code < 500 and elapsed_ms < settings.LOG_SLOW_REQUEST_MS
+                and random.random() >= rate):
+            return
+        client = scope.get("client")
+        access_logger.info(
+            "request",
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": round(elapsed_ms, 1),
+                "client_ip": client[0] if client else None,
+                "sample_rate": rate,
+            },
+        )
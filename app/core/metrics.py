@@ -0,0 +1,298 @@
+"""
+Métricas no formato de exposição do Prometheus.
+
+No caminho quente cada thread escreve apenas na sua própria shard (sem
+lock); as shards são somadas somente quando /metrics é lido. Shards de
+threads encerradas são incorporadas a um acumulado na leitura.
+"""
+from bisect import bisect_left
+import threading
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shards:
+    """Um dicionário de valores por thread."""
+
+    def __init__(self, new_shard: Callable, merge: Callable):
+        self._new_shard = new_shard
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []  # (thread, shard)
+        self._retired = new_shard()
+
+    def get(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def collect(self) -> list:
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = alive
+            return [self._retired] + [shard for _, shard in alive]
+
+
+def _merge_values(target: dict, source: dict) -> None:
+    for labels, value in list(source.items()):
+        target[labels] = target.get(labels, 0.0) + value
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._shards = _Shards(dict, _merge_values)
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        shard = self._shards.get()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        total = {}
+        for shard in self._shards.collect():
+            _merge_values(total, shard)
+        return total
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Gauge somado entre as shards: inc/dec podem ocorrer em threads diferentes."""
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class GaugeFunc:
+    """Gauge calculado na leitura: `func` retorna {labels: valor} ou um número."""
+
+    def __init__(self, name: str, help: str, func: Callable, labelnames: Iterable[str] = (), type: str = "gauge"):
+        self.name, self.help, self.func, self.labelnames, self.type = name, help, func, tuple(labelnames), type
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        try:
+            values = self.func()
+        except Exception:
+            return lines
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+def _merge_histograms(target: dict, source: dict) -> None:
+    for labels, counts in list(source.items()):
+        current = target.setdefault(labels, [0] * len(counts))
+        for i, n in enumerate(counts):
+            current[i] += n
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._shards = _Shards(dict, _merge_histograms)
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        shard = self._shards.get()
+        counts = shard.get(labels)
+        if counts is None:
+            # um contador por bucket, +Inf, soma e total
+            counts = shard[labels] = [0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def values(self) -> Dict[Tuple, list]:
+        total = {}
+        for shard in self._shards.collect():
+            _merge_histograms(total, shard)
+        return total
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts in sorted(self.values().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def gauge_func(self, *args, **kwargs) -> GaugeFunc:
+        return self.register(GaugeFunc(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Requisições HTTP por rota, método e status", ("route", "method", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota e método", ("route", "method")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "Requisições HTTP em andamento")
+BCRYPT_IN_PROGRESS = registry.gauge(
+    "bcrypt_operations_in_progress", "Hashes/verificações bcrypt em execução ou aguardando CPU"
+)
+LOGIN_ATTEMPTS = registry.counter(
+    "login_attempts_total", "Tentativas de login por resultado", ("result",)
+)
+SQL_COMPILED_CACHE = registry.counter(
+    "sqlalchemy_compiled_cache_total", "Uso do cache de SQL compilado do SQLAlchemy", ("result",)
+)
+
+
+def _threadpool_stats() -> dict:
+    import anyio.to_thread
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {("borrowed",): limiter.borrowed_tokens, ("total",): limiter.total_tokens}
+
+
+def _db_pool_stats(key: str) -> Callable:
+    def read():
+        from ..database import pool_manager
+        return pool_manager.stats()[key]
+    return read
+
+
+registry.gauge_func("threadpool_tokens", "Threads do threadpool do AnyIO em uso e total", _threadpool_stats, ("state",))
+registry.gauge_func("db_pool_in_use", "Conexões do pool em uso", _db_pool_stats("in_use"))
+registry.gauge_func("db_pool_idle", "Conexões ociosas no pool", _db_pool_stats("idle"))
+registry.gauge_func("db_pool_overflow", "Conexões de overflow abertas", _db_pool_stats("overflow"))
+registry.gauge_func("db_pool_checkouts_total", "Checkouts do pool", _db_pool_stats("checkouts"), type="counter")
+registry.gauge_func("db_pool_timeouts_total", "Timeouts esperando conexão do pool", _db_pool_stats("timeouts"), type="counter")
+registry.gauge_func(
+    "db_pool_checkout_wait_seconds_total", "Tempo total esperando conexão do pool",
+    _db_pool_stats("checkout_wait_total_s"), type="counter",
+)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        SQL_COMPILED_CACHE.inc((context.cache_hit.name.lower(),))
+
+
+def install() -> None:
+    """Registra a contagem de uso do cache de SQL compilado em todos os engines."""
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def start_http_server(port: int, host: str = "0.0.0.0"):
+    """
+    Serve /metrics em uma thread, para processos fora do uvicorn (workers
+    de fila). Retorna o servidor; server.shutdown() encerra.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência e status por template de rota."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_LATENCY.observe((route, method), time.perf_counter() - start)
+            HTTP_REQUESTS.inc((route, method, str(status["code"])))
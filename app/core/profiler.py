@@ -0,0 +1,284 @@
+"""
+Profiler por amostragem para endpoints em produção (opt-in, PROFILING_ENABLED).
+
+Os endpoints são envolvidos por um wrapper que, quando a requisição é
+amostrada, registra a thread que a executa. Uma thread de fundo lê
+sys._current_frames() a cada PROFILING_INTERVAL_MS e agrega as pilhas por
+rota, a partir do frame do endpoint. Com o profiler parado o custo por
+requisição é uma verificação de atributo.
+
+Endpoints síncronos (threadpool) mostram tempo de parede, incluindo espera
+por I/O. Em endpoints async só aparece o tempo em que a corrotina está de
+fato executando - a espera em await não é amostrada.
+
+Os dados ficam na memória de cada worker.
+"""
+from collections import Counter
+import functools
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from ..config import settings
+
+TRUNCATED = "[pilhas descartadas]"
+_ROOT = os.getcwd() + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Amostra as threads registradas e agrega pilhas por rota."""
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 20000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.active = False
+        self.sample_rate = 0.0
+        self.route: Optional[str] = None
+        self.until: Optional[float] = None
+        self._lock = threading.Lock()
+        self._targets = {}  # ident da thread -> nº de requisições amostradas
+        self._has_targets = threading.Event()
+        self._stacks = Counter()  # (rota, pilha) -> amostras
+        self._requests = Counter()  # rota -> requisições amostradas
+        self._thread = None
+        self._wrapper_codes = set()
+
+    # Controle
+
+    def start(self, sample_rate: float = 1.0, route: Optional[str] = None,
+              duration: Optional[float] = None) -> None:
+        """
+        Amostra `sample_rate` das requisições - de todas as rotas ou apenas
+        de `route` (template, ex. /api/v1/clients/{client_id}) - por até
+        `duration` segundos.
+        """
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.route = route
+            self.until = time.monotonic() + duration if duration else None
+            self.active = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self.active = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+    def should_sample(self, route: str) -> bool:
+        if not self.active:
+            return False
+        if self.until is not None and time.monotonic() > self.until:
+            self.active = False
+            return False
+        if self.route is not None and route != self.route:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    # Registro das threads
+
+    def _enter(self, route: str) -> int:
+        ident = threading.get_ident()
+        with self._lock:
+            self._targets[ident] = self._targets.get(ident, 0) + 1
+            self._requests[route] += 1
+            self._has_targets.set()
+        return ident
+
+    def _exit(self, ident: int) -> None:
+        with self._lock:
+            remaining = self._targets.get(ident, 1) - 1
+            if remaining:
+                self._targets[ident] = remaining
+            else:
+                self._targets.pop(ident, None)
+            if not self._targets:
+                self._has_targets.clear()
+
+    def wrap(self, route_path: str, call):
+        """Envolve o callable de um endpoint, preservando se é async ou não."""
+        profiler = self
+
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def profiled(*args, **kwargs):
+                sampled = profiler.should_sample(route_path)
+                if not sampled:
+                    return await call(*args, **kwargs)
+                ident = profiler._enter(route_path)
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    profiler._exit(ident)
+        else:
+            @functools.wraps(call)
+            def profiled(*args, **kwargs):
+                sampled = profiler.should_sample(route_path)
+                if not sampled:
+                    return call(*args, **kwargs)
+                ident = profiler._enter(route_path)
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    profiler._exit(ident)
+
+        self._wrapper_codes.add(profiled.__code__)
+        return profiled
+
+    def instrument(self, app, exclude: str = "") -> int:
+        """Envolve os endpoints de todas as rotas da aplicação, exceto as sob `exclude`."""
+        count = 0
+        for route in app.routes:
+            if exclude and route.path.startswith(exclude):
+                continue
+            if isinstance(route, APIRoute) and route.dependant.call is not None:
+                # FastAPI decide entre await e threadpool na criação da rota;
+                # o wrapper mantém o mesmo tipo do endpoint original.
+                route.dependant.call = self.wrap(route.path, route.dependant.call)
+                count += 1
+        return count
+
+    # Amostragem
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            if not self.active:
+                with self._lock:
+                    if not self.active:
+                        self._thread = None
+                        return
+            if not self._has_targets.wait(0.5):
+                continue
+            time.sleep(self.interval)
+            with self._lock:
+                idents = list(self._targets)
+            frames = sys._current_frames()
+            samples = []
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None and ident != own:
+                    sample = self._collapse(frame)
+                    if sample is not None:
+                        samples.append(sample)
+            del frames
+            if samples:
+                with self._lock:
+                    for key in samples:
+                        if key in self._stacks or len(self._stacks) < self.max_stacks:
+                            self._stacks[key] += 1
+                        else:
+                            self._stacks[(key[0], TRUNCATED)] += 1
+
+    def _collapse(self, frame):
+        """
+        Pilha da raiz (o endpoint) até o frame atual, ou None se o frame do
+        wrapper não está na pilha (corrotina suspensa ou requisição não
+        amostrada na mesma thread).
+        """
+        labels = []
+        while frame is not None:
+            if frame.f_code in self._wrapper_codes:
+                if not frame.f_locals.get("sampled"):
+                    return None
+                route = frame.f_locals.get("route_path")
+                labels.reverse()
+                return route, ";".join(labels)
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        return None
+
+    # Exportação
+
+    def status(self) -> dict:
+        with self._lock:
+            samples = sum(self._stacks.values())
+            requests = dict(self._requests)
+            stacks = len(self._stacks)
+        return {
+            "active": self.active,
+            "sample_rate": self.sample_rate,
+            "route": self.route,
+            "remaining_seconds": max(self.until - time.monotonic(), 0) if self.until and self.active else None,
+            "interval_ms": self.interval * 1000,
+            "samples": samples,
+            "distinct_stacks": stacks,
+            "requests": requests,
+        }
+
+    def _snapshot(self, route: Optional[str]) -> list:
+        with self._lock:
+            items = list(self._stacks.items())
+        return [(key, n) for key, n in items if route is None or key[0] == route]
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Formato "collapsed stacks" (flamegraph.pl, inferno, speedscope)."""
+        lines = []
+        for (route_path, stack), n in sorted(self._snapshot(route)):
+            root = f"{route_path};{stack}" if stack else route_path
+            lines.append(f"{root} {n}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, route: Optional[str] = None) -> dict:
+        """Arquivo no formato do speedscope, com um perfil por rota."""
+        frames, index = [], {}
+        profiles = {}
+        for (route_path, stack), n in sorted(self._snapshot(route)):
+            indexes = []
+            for label in stack.split(";") if stack else []:
+                if label not in index:
+                    index[label] = len(frames)
+                    name, _, location = label.rpartition(" (")
+                    file, _, line = location.rstrip(")").rpartition(":")
+                    frames.append({"name": name or label, "file": file, "line": int(line) if line.isdigit() else None})
+                indexes.append(index[label])
+            profile = profiles.setdefault(route_path, {"samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(n * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "law-firm-api",
+            "exporter": "app.core.profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": route_path,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(profile["weights"]),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for route_path, profile in profiles.items()
+            ],
+        }
+
+    def speedscope_json(self, route: Optional[str] = None) -> str:
+        return json.dumps(self.speedscope(route))
+
+
+profiler = SamplingProfiler(
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+    max_stacks=settings.PROFILING_MAX_STACKS,
+)
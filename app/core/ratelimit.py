@@ -0,0 +1,217 @@
+"""
+Limite de tentativas por janela deslizante (login).
+
+O login consulta o limite com check() antes do banco e do bcrypt e só
+registra com hit() as tentativas que falharam; um login correto zera a
+contagem do email com reset().
+
+Contador de janela deslizante aproximado: guarda só a contagem da janela
+fixa atual e da anterior, e estima as tentativas nos últimos `window`
+segundos como anterior * (fração da janela anterior ainda coberta) +
+atual. Memória constante por chave, sem a rajada dupla na virada de uma
+janela fixa.
+
+- "memory": contadores no processo (cada worker conta separadamente).
+- "redis": contadores compartilhados entre workers e máquinas (INCR com
+  expiração); se o Redis falha, o worker passa a contar localmente em vez
+  de liberar as tentativas.
+
+As chaves (IP, email) são gravadas como hash. Atrás de proxy reverso, o IP
+do cliente vem do X-Forwarded-For, aceito só de TRUSTED_PROXIES.
+"""
+from collections import OrderedDict
+import hashlib
+import ipaddress
+import logging
+import math
+import threading
+import time
+from typing import Optional, Tuple
+
+from starlette.requests import Request
+
+from ..config import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = metrics.registry.counter(
+    "rate_limit_rejections_total", "Tentativas recusadas pelo limite de taxa", ("limiter",)
+)
+
+
+class MemoryWindowStore:
+    """Contagens (janela, anterior, atual) por chave, em LRU limitado."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._data = OrderedDict()  # chave -> (janela, anterior, atual)
+        self._lock = threading.Lock()
+
+    def _counts(self, key: str, index: int) -> Tuple[int, int]:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < index - 1:
+            return 0, 0
+        if entry[0] == index - 1:
+            return entry[2], 0
+        return entry[1], entry[2]
+
+    def peek(self, key: str, window: float, now: float) -> Tuple[int, int]:
+        with self._lock:
+            return self._counts(key, int(now // window))
+
+    def hit(self, key: str, window: float, now: float) -> Tuple[int, int]:
+        index = int(now // window)
+        with self._lock:
+            previous, current = self._counts(key, index)
+            current += 1
+            self._data[key] = (index, previous, current)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+        return previous, current
+
+    def reset(self, key: str, window: float, now: float) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisWindowStore:
+    """Um contador por chave e janela fixa, com expiração de duas janelas."""
+
+    def __init__(self, url: str = None, client=None, prefix: str = "rl"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requer o pacote redis (pip install redis)") from e
+            client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.client = client
+        self.prefix = prefix
+
+    def _keys(self, key: str, window: float, now: float) -> Tuple[str, str]:
+        index = int(now // window)
+        return f"{self.prefix}:{key}:{index - 1}", f"{self.prefix}:{key}:{index}"
+
+    def peek(self, key: str, window: float, now: float) -> Tuple[int, int]:
+        previous, current = self.client.mget(self._keys(key, window, now))
+        return int(previous or 0), int(current or 0)
+
+    def hit(self, key: str, window: float, now: float) -> Tuple[int, int]:
+        previous_key, current_key = self._keys(key, window, now)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.pexpire(current_key, int(window * 2000))
+        pipe.get(previous_key)
+        current, _, previous = pipe.execute()
+        return int(previous or 0), int(current)
+
+    def reset(self, key: str, window: float, now: float) -> None:
+        self.client.delete(*self._keys(key, window, now))
+
+
+class SlidingWindowLimiter:
+    def __init__(self, name: str, limit: int, window: float, store, fallback: Optional[MemoryWindowStore] = None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.store = store
+        self.fallback = fallback
+
+    def check(self, key: str) -> Optional[int]:
+        """
+        None se `key` ainda tem tentativas na janela, ou os segundos até a
+        próxima ser aceita. Não conta a tentativa: quem conta é hit().
+        """
+        if self.limit <= 0:
+            return None
+        now = time.time()
+        previous, current = self._call("peek", key, now)
+        elapsed = (now % self.window) / self.window
+        # Cabe mais uma tentativa se as anteriores não passam de limit - 1
+        allowed = self.limit - 1
+        if previous * (1 - elapsed) + current <= allowed:
+            return None
+        RATE_LIMITED.inc((self.name,))
+        return self._retry_after(previous, current, elapsed, allowed)
+
+    def hit(self, key: str) -> None:
+        """Registra uma tentativa (falha) de `key`."""
+        if self.limit > 0:
+            self._call("hit", key, time.time())
+
+    def reset(self, key: str) -> None:
+        """Zera as tentativas de `key` (ex.: depois de um login correto)."""
+        if self.limit > 0:
+            self._call("reset", key, time.time())
+
+    def _call(self, method: str, key: str, now: float):
+        key = f"{self.name}:{hashlib.sha256(key.encode()).hexdigest()[:32]}"
+        try:
+            return getattr(self.store, method)(key, self.window, now)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Falha no backend do limite de taxa, contando localmente: {e}")
+            return getattr(self.fallback, method)(key, self.window, now)
+
+    def _retry_after(self, previous: int, current: int, elapsed: float, allowed: int) -> int:
+        remaining = self.window * (1 - elapsed)
+        if current > allowed or previous == 0:
+            # Só a janela atual já excede: libera quando ela virar a anterior
+            # e o peso dela cair até o permitido
+            return math.ceil(remaining + self.window * max(0.0, 1 - allowed / current))
+        # Espera o peso da janela anterior cair: previous * (1 - t) + current <= allowed
+        return max(1, math.ceil(self.window * (1 - (allowed - current) / previous) - self.window * elapsed))
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP do cliente. Se a conexão vem de um proxy de TRUSTED_PROXIES, segue o
+    X-Forwarded-For da direita para a esquerda até o primeiro endereço que
+    não é de proxy confiável; os anteriores podem ter sido forjados.
+    """
+    peer = request.client.host if request.client else "unknown"
+    networks = settings.TRUSTED_PROXY_NETWORKS
+    if not networks:
+        return peer
+
+    def trusted(address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in networks)
+
+    if not trusted(peer):
+        return peer
+    forwarded = [
+        address.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for address in header.split(",")
+        if address.strip()
+    ]
+    for address in reversed(forwarded):
+        if not trusted(address):
+            return address
+    return forwarded[0] if forwarded else peer
+
+
+def create_store():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisWindowStore(settings.RATE_LIMIT_REDIS_URL or settings.CACHE_REDIS_URL)
+    return MemoryWindowStore()
+
+
+_store = create_store()
+_fallback = _store if isinstance(_store, MemoryWindowStore) else MemoryWindowStore()
+
+login_ip_limiter = SlidingWindowLimiter(
+    "login_ip", settings.LOGIN_IP_LIMIT, settings.LOGIN_RATE_WINDOW_SECONDS, _store, _fallback
+)
+login_email_limiter = SlidingWindowLimiter(
+    "login_email", settings.LOGIN_EMAIL_LIMIT, settings.LOGIN_RATE_WINDOW_SECONDS, _store, _fallback
+)
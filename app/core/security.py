@@ -1,19 +1,46 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+import secrets
 from typing import Optional
-from jose import JWTError, jwt
+import uuid
+from jose import JWTError
 from passlib.context import CryptContext
 from ..config import settings
+from .keys import keys
+from .metrics import BCRYPT_IN_PROGRESS
 
 # Configuração de hashing de senhas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha plain corresponde ao hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    BCRYPT_IN_PROGRESS.inc()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        BCRYPT_IN_PROGRESS.dec()
+
+@lru_cache(maxsize=None)
+def _dummy_hash() -> str:
+    return get_password_hash(secrets.token_urlsafe(16))
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """
+    Verificação bcrypt contra um hash descartável, para email inexistente:
+    a resposta leva o mesmo tempo de uma senha errada e não revela se o
+    email está cadastrado. Sempre False.
+    """
+    verify_password(plain_password, _dummy_hash())
+    return False
 
 def get_password_hash(password: str) -> str:
     """Gera hash da senha."""
-    return pwd_context.hash(password)
+    BCRYPT_IN_PROGRESS.inc()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        BCRYPT_IN_PROGRESS.dec()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria token JWT."""
@@ -24,22 +51,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    # jti identifica o token na denylist (logout)
+    to_encode.update({"exp": expire, "jti": to_encode.get("jti") or uuid.uuid4().hex})
+    return keys.encode(to_encode)
+
+def create_refresh_token() -> str:
+    """Refresh token opaco; o banco guarda apenas hash_token() dele."""
+    return secrets.token_urlsafe(32)
+
+def hash_token(token: str) -> str:
+    """Hash de armazenamento de um refresh token (já aleatório: sha256 basta)."""
+    return hashlib.sha256(token.encode()).hexdigest()
 
 def decode_access_token(token: str):
     """Decodifica token JWT."""
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        return payload
+        return keys.decode(token)
     except JWTError:
         return None
\ No newline at end of file
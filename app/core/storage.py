@@ -0,0 +1,150 @@
+"""
+Armazenamento de arquivos (blobs) endereçado por conteúdo.
+
+A chave de um blob é o SHA-256 do conteúdo, calculado enquanto o upload é
+gravado: arquivos idênticos ocupam o disco uma única vez. O backend é
+escolhido por STORAGE_BACKEND; "local" grava no sistema de arquivos, em
+STORAGE_LOCAL_PATH/ab/cd/<sha256>.
+"""
+from abc import ABC, abstractmethod
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+from ..config import settings
+
+
+class BlobWriter(ABC):
+    """Recebe o conteúdo em pedaços e calcula o hash e o tamanho."""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self.sha256.update(data)
+        self.size += len(data)
+
+    @property
+    def key(self) -> str:
+        """Chave do conteúdo recebido até aqui (sha256 hex)."""
+        return self.sha256.hexdigest()
+
+    @abstractmethod
+    def commit(self) -> str:
+        """Finaliza o blob e retorna sua chave (sha256 hex)."""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Descarta o conteúdo recebido."""
+
+
+class BlobStore(ABC):
+    """Interface dos backends de armazenamento."""
+
+    @abstractmethod
+    def writer(self) -> BlobWriter:
+        """Novo blob, gravado em pedaços."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True se o blob está armazenado."""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Tamanho do blob em bytes."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Arquivo para leitura; o chamador fecha."""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Caminho no disco, quando o backend tem um (permite sendfile)."""
+        return None
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove o blob; não falha se ele já não existe."""
+
+
+class LocalBlobWriter(BlobWriter):
+    def __init__(self, store: "LocalBlobStore"):
+        super().__init__()
+        self.store = store
+        self._file = tempfile.NamedTemporaryFile(dir=store.tmp_dir, delete=False)
+
+    def write(self, data: bytes) -> None:
+        super().write(data)
+        self._file.write(data)
+
+    def commit(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        key = self.key
+        path = self.store.path(key)
+        if os.path.exists(path):
+            # Conteúdo já armazenado: descarta a cópia
+            os.unlink(self._file.name)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._file.name, path)
+        return key
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self._file.name)
+        except FileNotFoundError:
+            pass
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Chave de blob inválida: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def writer(self) -> LocalBlobWriter:
+        return LocalBlobWriter(self)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self.path(key)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+BACKENDS = {
+    "local": lambda: LocalBlobStore(settings.STORAGE_LOCAL_PATH),
+}
+
+_store: Optional[BlobStore] = None
+
+
+def get_store() -> BlobStore:
+    global _store
+    if _store is None:
+        try:
+            _store = BACKENDS[settings.STORAGE_BACKEND]()
+        except KeyError:
+            raise RuntimeError(f"STORAGE_BACKEND desconhecido: {settings.STORAGE_BACKEND}")
+    return _store
@@ -0,0 +1,238 @@
+"""
+Upload multipart em streaming e download com suporte a Range.
+
+O parser do Starlette (request.form()) copia cada arquivo para um
+SpooledTemporaryFile antes de entregar ao endpoint. Aqui o corpo é lido
+pedaço a pedaço pelo parser do python-multipart e o conteúdo do arquivo
+vai direto para o BlobWriter em blocos de STORAGE_CHUNK_SIZE - a memória
+usada não depende do tamanho do arquivo. A gravação e o hash rodam no
+threadpool para não bloquear o event loop.
+"""
+from dataclasses import dataclass, field
+import re
+from urllib.parse import quote
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+from .storage import BlobWriter
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class StreamedFile:
+    field_name: str
+    filename: str
+    content_type: str
+    key: str
+    size: int
+    writer: Optional[BlobWriter] = None
+
+
+@dataclass
+class StreamedForm:
+    fields: Dict[str, str] = field(default_factory=dict)
+    file: Optional[StreamedFile] = None
+
+
+async def stream_upload(request: Request, new_writer, file_field: str = "file",
+                        chunk_size: int = 1024 * 1024, max_size: Optional[int] = None) -> StreamedForm:
+    """
+    Lê um multipart/form-data com um arquivo em `file_field`, gravando-o com
+    o writer criado por `new_writer()`. Campos simples vão para `fields`.
+
+    O writer é devolvido em `file.writer` sem commit: o chamador decide
+    quando publicar o blob (writer.commit()) ou descartá-lo (writer.abort()).
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Envie o arquivo como multipart/form-data")
+
+    form = StreamedForm()
+    state = {"headers": {}, "header_name": b"", "header_value": b"", "name": None,
+             "filename": None, "part_type": None, "data": bytearray(), "size": 0}
+    writer: Optional[BlobWriter] = None
+    pending = bytearray()  # conteúdo do arquivo ainda não gravado
+
+    def on_part_begin():
+        state.update(headers={}, name=None, filename=None, part_type=None, data=bytearray())
+
+    def on_header_field(data, start, end):
+        state["header_name"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_name"].lower()] = state["header_value"]
+        state["header_name"] = state["header_value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        state["name"] = disposition.get(b"name", b"").decode("utf-8", "replace")
+        filename = disposition.get(b"filename")
+        state["filename"] = filename.decode("utf-8", "replace") if filename is not None else None
+        state["part_type"] = state["headers"].get(b"content-type", b"application/octet-stream").decode("latin-1")
+
+    def on_part_data(data, start, end):
+        if state["name"] == file_field and state["filename"] is not None:
+            state["size"] += end - start
+            if max_size is not None and state["size"] > max_size:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                    detail=f"Arquivo maior que {max_size // (1024 * 1024)} MB")
+            pending.extend(data[start:end])
+        else:
+            state["data"].extend(data[start:end])
+            if len(state["data"]) > 64 * 1024:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                    detail="Campo de formulário muito grande")
+
+    def on_part_end():
+        if state["name"] == file_field and state["filename"] is not None:
+            form.file = StreamedFile(state["name"], state["filename"], state["part_type"], "", 0)
+        else:
+            form.fields[state["name"]] = state["data"].decode("utf-8", "replace")
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    async def flush(force: bool = False):
+        nonlocal writer
+        if not pending or (len(pending) < chunk_size and not force):
+            return
+        if writer is None:
+            writer = await anyio.to_thread.run_sync(new_writer)
+        data = bytes(pending)
+        pending.clear()
+        await anyio.to_thread.run_sync(writer.write, data)
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await flush()
+        parser.finalize()
+        await flush(force=True)
+
+        if form.file is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Campo de arquivo '{file_field}' ausente")
+        if writer is None:
+            writer = await anyio.to_thread.run_sync(new_writer)
+        form.file.key = writer.key
+        form.file.size = writer.size
+        form.file.writer = writer
+        return form
+    except BaseException:
+        # Upload interrompido ou inválido: descarta o arquivo parcial
+        if writer is not None:
+            await anyio.to_thread.run_sync(writer.abort)
+        raise
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo (início, fim inclusivo) de um header Range com um único
+    intervalo; None para o arquivo inteiro. Intervalo impossível gera 416.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None  # múltiplos intervalos ou unidade desconhecida: arquivo inteiro
+    first, last = match.groups()
+    if first == "":
+        if last == "" or int(last) == 0:
+            raise _not_satisfiable(size)
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise _not_satisfiable(size)
+    return start, end
+
+
+def _not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                         detail="Intervalo inválido", headers={"Content-Range": f"bytes */{size}"})
+
+
+class RangeFileResponse(Response):
+    """
+    Resposta ASGI de um arquivo local, inteiro ou parcial (206). Usa a
+    extensão http.response.zerocopysend (sendfile) quando o servidor a
+    oferece; caso contrário lê o arquivo em blocos no threadpool.
+    """
+
+    def __init__(self, path: str, size: int, range_header: Optional[str] = None,
+                 media_type: str = "application/octet-stream", filename: Optional[str] = None,
+                 headers: Optional[dict] = None, chunk_size: int = 256 * 1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.background = None
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            self.status_code, self.start, self.count = 200, 0, size
+        else:
+            start, end = byte_range
+            self.status_code, self.start, self.count = 206, start, end - start + 1
+
+        headers = {
+            "content-type": media_type,
+            "content-length": str(self.count),
+            "accept-ranges": "bytes",
+            **(headers or {}),
+        }
+        if byte_range is not None:
+            headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+        if filename:
+            headers["content-disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        self.raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.count,
+                })
+                return
+
+            await anyio.to_thread.run_sync(file.seek, self.start)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(file.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await anyio.to_thread.run_sync(file.close)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,93 @@
+from sqlalchemy import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, Session
+from typing import Generator
+from fastapi import Request
+from ..config import settings
+from .pool import InstrumentedQueuePool, PoolManager
+from .routing import ReplicaSet, RoutingSession, last_write_from
+import logging
+
+# Desative logs verbose
+logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Opções comuns ao primário e às réplicas
+ENGINE_OPTIONS = dict(
+    # ⚡ CONFIGURAÇÕES PARA BANCO REMOTO:
+    echo=False,  # CRÍTICO: False sempre
+    echo_pool=False,
+    query_cache_size=1200,  # Cache de SQL compilado (padrão 500)
+    
+    # Pool para alta latência
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=False,   # Conexões ociosas são verificadas pelo PoolManager
+    pool_recycle=3600,     # Recicla a cada hora
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    
+    # ⏱️ Timeouts maiores para rede
+    connect_args={
+        "connect_timeout": 10,      # Aumentado para rede
+        "keepalives": 1,
+        "keepalives_idle": 60,
+        "keepalives_interval": 30,
+        "keepalives_count": 5,
+        "sslmode": "require",       # ← OBRIGATÓRIO para Render.com!
+        "sslrootcert": "",          # Usa certificados do sistema
+        "application_name": "juris_api",
+    }
+)
+
+# Engine OTIMIZADO para banco REMOTO
+engine = create_engine(settings.DATABASE_URL, **ENGINE_OPTIONS)
+
+# Réplicas de leitura (opcional)
+replicas = ReplicaSet(
+    settings.REPLICA_URLS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    interval=settings.REPLICA_CHECK_INTERVAL,
+    **ENGINE_OPTIONS
+)
+RoutingSession.replicas = replicas
+RoutingSession.sticky_seconds = settings.REPLICA_STICKY_SECONDS
+pool_manager = PoolManager(engine, interval=settings.DB_POOL_LIVENESS_INTERVAL, replicas=replicas.engines)
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    expire_on_commit=False  # Melhora performance
+)
+
+Base = declarative_base()
+
+def install(background: bool = True) -> None:
+    """
+    Registra os eventos de sessão (auditoria, versões, tombstones, blobs,
+    busca e NOTIFY) e, com `background`, cria as threads da API (iniciadas
+    no lifespan). Importar este pacote não registra nada: create_app()
+    chama install(), e os processos de fundo (lembretes, extração, worker
+    de jobs) chamam install(background=False) antes de gravar.
+    """
+    from . import audit, blobs, notify, revocation, search, tombstones, versions
+    for module in (audit, blobs, notify, search, tombstones, versions):
+        module.register()
+    if background:
+        audit.install(engine)
+        search.install(engine)
+        notify.install(engine)
+        revocation.install(engine)
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    db = SessionLocal()
+    # Requisições de leitura podem ser atendidas por uma réplica
+    db.info["read_only"] = request.method in ("GET", "HEAD")
+    # Read-your-writes entre workers (app.database.routing)
+    db.info["last_write"] = last_write_from(request)
+    db.info["request_state"] = request.scope.setdefault("state", {})
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,222 @@
+"""
+Log de auditoria e feed de alterações (audit_log).
+
+Modelos com `__audited__` têm criações, alterações (diff antes/depois) e
+remoções capturadas no after_flush da sessão. Conforme AUDIT_MODE:
+
+- "async" (padrão): os registros de uma transação são entregues, após o
+  commit, a uma thread que os grava em lotes - o commit da requisição não
+  espera o insert. Com a fila cheia os registros são descartados e contados
+  (audit_records_dropped_total). Um rollback descarta os registros.
+  Processos sem a thread em execução (lembretes, extração, worker de jobs)
+  gravam na própria transação, como no modo transactional.
+- "transactional": insert append-only na mesma transação da escrita.
+- "off": nada é registrado.
+
+Atualizações em massa (query.update/delete) não passam pelo flush e não
+são registradas.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import logging
+import queue
+import threading
+import uuid
+from typing import Optional
+
+from sqlalchemy import event, insert, inspect
+
+from ..config import settings
+from ..core import metrics
+from ..core.log import get_request_id
+from .routing import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DROPPED = metrics.registry.counter(
+    "audit_records_dropped_total", "Registros de auditoria descartados (fila cheia ou erro ao gravar)"
+)
+
+
+def _json_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _columns(obj):
+    excluded = getattr(obj, "__audit_exclude__", ())
+    return [attr for attr in inspect(obj).mapper.column_attrs if attr.key not in excluded]
+
+
+def _snapshot(obj) -> dict:
+    """Valores carregados das colunas (defaults do servidor ainda não lidos ficam de fora)."""
+    state = inspect(obj)
+    return {
+        attr.key: _json_value(state.dict[attr.key])
+        for attr in _columns(obj)
+        if attr.key in state.dict
+    }
+
+
+def _diff(obj) -> dict:
+    """{campo: [antes, depois]} das colunas alteradas neste flush."""
+    state = inspect(obj)
+    changes = {}
+    for attr in _columns(obj):
+        history = state.attrs[attr.key].history
+        if not history.has_changes():
+            continue
+        before = history.deleted[0] if history.deleted else None
+        after = history.added[0] if history.added else None
+        if before != after:
+            changes[attr.key] = [_json_value(before), _json_value(after)]
+    return changes
+
+
+def _law_firm_id(obj):
+    # O próprio escritório é o tenant das alterações em law_firms
+    return getattr(obj, "law_firm_id", None) or obj.id
+
+
+def capture(session) -> list:
+    """Registros de auditoria do flush atual."""
+    user_id = session.info.get("user_id")
+    request_id = get_request_id()
+    records = []
+
+    def add(obj, action, changes):
+        records.append({
+            "law_firm_id": _law_firm_id(obj),
+            "entity": obj.__tablename__,
+            "entity_id": obj.id,
+            "action": action,
+            "changes": changes,
+            "user_id": uuid.UUID(user_id) if user_id else None,
+            "request_id": request_id,
+        })
+
+    for obj in session.new:
+        if getattr(obj, "__audited__", False):
+            add(obj, "create", _snapshot(obj))
+    for obj in session.dirty:
+        if getattr(obj, "__audited__", False):
+            changes = _diff(obj)
+            if changes:
+                add(obj, "update", changes)
+    for obj in session.deleted:
+        if getattr(obj, "__audited__", False):
+            add(obj, "delete", _snapshot(obj))
+    return records
+
+
+class AuditWriter:
+    """Grava registros de auditoria em lotes a partir de uma fila limitada."""
+
+    def __init__(self, engine, maxsize: int = 10000, batch_size: int = 500):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize)
+        self._thread = None
+
+    def submit(self, records: list) -> None:
+        for record in records:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                AUDIT_DROPPED.inc()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Grava o que estiver na fila e encerra a thread."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            records = [record for record in batch if record is not None]
+            if records:
+                self.write(records)
+            if stopping:
+                return
+
+    def write(self, records: list) -> None:
+        from ..models import AuditLog
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(AuditLog.__table__), records)
+        except Exception as e:
+            logger.error(f"Falha ao gravar {len(records)} registros de auditoria: {e}")
+            AUDIT_DROPPED.inc(amount=len(records))
+
+
+writer: Optional[AuditWriter] = None
+
+
+def install(engine) -> None:
+    """Cria o writer do modo async (iniciado no lifespan)."""
+    global writer
+    if settings.AUDIT_MODE == "async" and writer is None:
+        writer = AuditWriter(engine, maxsize=settings.AUDIT_QUEUE_SIZE, batch_size=settings.AUDIT_BATCH_SIZE)
+        metrics.registry.gauge_func(
+            "audit_queue_depth", "Registros de auditoria aguardando gravação", writer.queue.qsize
+        )
+
+
+def _capture(session, flush_context):
+    if settings.AUDIT_MODE == "off":
+        return
+    records = capture(session)
+    if not records:
+        return
+    if settings.AUDIT_MODE == "transactional" or writer is None or not writer.running:
+        from ..models import AuditLog
+        session.connection().execute(insert(AuditLog.__table__), records)
+    else:
+        session.info.setdefault("audit_pending", []).extend(records)
+
+
+def _submit(session):
+    records = session.info.pop("audit_pending", None)
+    if not records or writer is None:
+        return
+    if writer.running:
+        writer.submit(records)
+    else:
+        # Thread encerrada entre o flush e o commit (shutdown)
+        writer.write(records)
+
+
+def _discard(session):
+    session.info.pop("audit_pending", None)
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _capture):
+        event.listen(RoutingSession, "after_flush", _capture)
+    if not event.contains(RoutingSession, "after_commit", _submit):
+        event.listen(RoutingSession, "after_commit", _submit)
+    if not event.contains(RoutingSession, "after_rollback", _discard):
+        event.listen(RoutingSession, "after_rollback", _discard)
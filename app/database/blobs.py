@@ -0,0 +1,74 @@
+"""
+Contagem de referências dos blobs (blobs.ref_count).
+
+Documentos com o mesmo content_hash compartilham um único blob no
+BlobStore. Todo flush que insere ou remove documentos ajusta ref_count na
+mesma transação; remoções em massa (query.delete, ON DELETE CASCADE no
+banco) não passam pelo flush e não decrementam a contagem.
+
+Blobs sem referências não são apagados na hora: um upload ou link do
+mesmo conteúdo pode chegar logo depois. collect_garbage() remove os que
+estão sem referências há mais de BLOB_GC_GRACE_SECONDS.
+"""
+from collections import Counter
+from typing import List
+
+from sqlalchemy import event, text
+
+from .routing import RoutingSession
+
+ACQUIRE = text(
+    "INSERT INTO blobs (hash, size, content_type, ref_count) VALUES (:hash, :size, :content_type, :count) "
+    "ON CONFLICT (hash) DO UPDATE SET ref_count = blobs.ref_count + EXCLUDED.ref_count, updated_at = now()"
+)
+RELEASE = text("UPDATE blobs SET ref_count = ref_count - :count, updated_at = now() WHERE hash = :hash")
+COLLECT = text(
+    "DELETE FROM blobs WHERE hash IN ("
+    "SELECT hash FROM blobs WHERE ref_count <= 0 AND updated_at < now() - make_interval(secs => :grace) "
+    "ORDER BY updated_at LIMIT :limit FOR UPDATE SKIP LOCKED"
+    ") RETURNING hash"
+)
+
+
+def _count_references(session, flush_context):
+    from ..models import Document
+    added, removed, info = Counter(), Counter(), {}
+    for obj in session.new:
+        if isinstance(obj, Document) and obj.content_hash:
+            added[obj.content_hash] += 1
+            info[obj.content_hash] = obj
+    for obj in session.deleted:
+        if isinstance(obj, Document) and obj.content_hash:
+            removed[obj.content_hash] += 1
+    if not added and not removed:
+        return
+    conn = session.connection()
+    # Ordem fixa para que transações concorrentes travem as linhas na mesma ordem
+    for key in sorted(added.keys() | removed.keys()):
+        count = added[key] - removed[key]
+        if count > 0:
+            obj = info[key]
+            conn.execute(ACQUIRE, {"hash": key, "size": obj.size or 0,
+                                   "content_type": obj.content_type, "count": count})
+        elif count < 0:
+            conn.execute(RELEASE, {"hash": key, "count": -count})
+
+
+def collect_garbage(db, store, grace_seconds: float, limit: int = 1000) -> List[str]:
+    """
+    Remove do banco e do BlobStore os blobs sem referências há mais de
+    `grace_seconds`. O arquivo é apagado com a linha ainda travada: um
+    upload concorrente do mesmo conteúdo espera o commit e recria a linha
+    antes de publicar o arquivo.
+    """
+    keys = db.execute(COLLECT, {"grace": grace_seconds, "limit": limit}).scalars().all()
+    for key in keys:
+        store.delete(key)
+    db.commit()
+    return keys
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _count_references):
+        event.listen(RoutingSession, "after_flush", _count_references)
@@ -0,0 +1,145 @@
+"""
+Eventos de alteração entre workers (LISTEN/NOTIFY).
+
+Todo flush que insere, altera ou remove um modelo com `__versioned__`
+(clients, cases, tasks) chama pg_notify na mesma transação: o Postgres só
+entrega a notificação no commit, e a descarta no rollback. Cada worker da
+API mantém uma conexão em LISTEN (ChangeListener) e repassa os eventos ao
+broker de app.core.events, que os distribui às conexões SSE do escritório.
+
+O payload só identifica o registro ({"entity", "id", "op"}); o cliente
+busca o que mudou pelas rotas normais. Uma reconexão do LISTEN pode perder
+eventos: os assinantes recebem {"op": "resync"} e recarregam as listas.
+"""
+import json
+import logging
+import select
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import event, text
+
+from ..config import settings
+from .routing import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+# O payload do NOTIFY é limitado a 8000 bytes
+EVENTS_PER_NOTIFY = 50
+
+
+def _notify_changes(session, flush_context):
+    if not settings.EVENTS_ENABLED:
+        return
+    changes = {}  # escritório -> eventos
+    for op, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            entity = getattr(obj, "__versioned__", None)
+            if entity is None:
+                continue
+            if op == "updated" and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.setdefault(str(obj.law_firm_id), []).append({"entity": entity, "id": str(obj.id), "op": op})
+    if not changes:
+        return
+
+    params = [
+        {
+            "channel": settings.EVENTS_CHANNEL,
+            "payload": json.dumps({"law_firm_id": law_firm_id, "events": events[i:i + EVENTS_PER_NOTIFY]}),
+        }
+        for law_firm_id, events in changes.items()
+        for i in range(0, len(events), EVENTS_PER_NOTIFY)
+    ]
+    session.connection().execute(NOTIFY, params)
+
+
+class ChangeListener:
+    """Conexão dedicada em LISTEN, lida por uma thread de fundo."""
+
+    def __init__(self, engine, channel: str, publish: Callable, resync: Callable, poll_interval: float = 5.0):
+        self.engine = engine
+        self.channel = channel
+        self.publish = publish
+        self.resync = resync
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.poll_interval * 2)
+            self._thread = None
+
+    def _connect(self):
+        conn = self.engine.raw_connection()
+        conn.detach()  # fora do pool: a conexão fica ocupada enquanto o worker vive
+        dbapi = conn.dbapi_connection
+        dbapi.autocommit = True
+        with dbapi.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.publish(message["law_firm_id"], message["events"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Notificação de alteração inválida: {e}")
+
+    def _listen(self, dbapi) -> None:
+        while not self._stop.is_set():
+            if not select.select([dbapi], [], [], self.poll_interval)[0]:
+                continue
+            dbapi.poll()
+            while dbapi.notifies:
+                self._dispatch(dbapi.notifies.pop(0).payload)
+
+    def _run(self) -> None:
+        delay, connected_before = 1.0, False
+        while not self._stop.is_set():
+            try:
+                conn = self._connect()
+            except Exception as e:
+                logger.error(f"Falha ao conectar o LISTEN de alterações: {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            if connected_before:
+                # Notificações enviadas enquanto estávamos desconectados se perderam
+                self.resync()
+            connected_before, delay = True, 1.0
+            try:
+                self._listen(conn.dbapi_connection)
+            except Exception as e:
+                logger.error(f"Conexão do LISTEN de alterações perdida: {e}")
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+listener: Optional[ChangeListener] = None
+
+
+def install(engine) -> None:
+    """Cria o listener de alterações (iniciado no lifespan)."""
+    global listener
+    if settings.EVENTS_ENABLED and listener is None:
+        from ..core.events import broker
+        listener = ChangeListener(engine, settings.EVENTS_CHANNEL, broker.publish, broker.resync)
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _notify_changes):
+        event.listen(RoutingSession, "after_flush", _notify_changes)
@@ -0,0 +1,215 @@
+"""
+Gerenciamento do pool de conexões: aquecimento no startup, verificação
+periódica de conexões ociosas (no lugar do pool_pre_ping em todo checkout)
+e estatísticas de uso para dimensionar o pool.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Checkouts feitos pelo próprio gerenciador não entram nas estatísticas
+_internal = threading.local()
+
+
+class PoolStats:
+    """Contadores de checkout do pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.liveness_checks = 0
+        self.invalidated = 0
+
+    def record_checkout(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_liveness(self, checks: int, invalidated: int) -> None:
+        with self._lock:
+            self.liveness_checks += checks
+            self.invalidated += invalidated
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": self.wait_max * 1000,
+                "checkout_wait_total_s": self.wait_total,
+                "timeouts": self.timeouts,
+                "liveness_checks": self.liveness_checks,
+                "invalidated": self.invalidated,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede o tempo de espera de cada checkout e conta timeouts.
+    O tempo inclui a abertura de novas conexões quando o pool cresce.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        if getattr(_internal, "active", False):
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class PoolManager:
+    """
+    Aquece o pool no startup e verifica, em uma thread de fundo, as conexões
+    ociosas há mais de `interval` segundos, invalidando as que caíram. As
+    engines das réplicas (`replicas`) passam pela mesma verificação.
+    """
+
+    def __init__(self, engine, interval: float = 30.0, replicas=()):
+        self.engine = engine
+        self.replicas = list(replicas)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        for target in (engine, *self.replicas):
+            event.listen(target, "checkin", self._on_checkin)
+
+    @staticmethod
+    def _on_checkin(dbapi_connection, connection_record):
+        # A devolução feita pela verificação não conta como uso
+        if not getattr(_internal, "active", False):
+            connection_record.info["last_used"] = time.monotonic()
+
+    def warm(self, size: int) -> int:
+        """
+        Abre `size` conexões em paralelo e as devolve ao pool, para que as
+        primeiras requisições não paguem o handshake TCP/TLS com o banco.
+        Retorna quantas conexões foram abertas.
+        """
+        if size <= 0:
+            return 0
+
+        def _connect():
+            _internal.active = True
+            try:
+                return self.engine.pool.connect()
+            finally:
+                _internal.active = False
+
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(_connect) for _ in range(size)]
+
+        opened = 0
+        for future in futures:
+            try:
+                conn = future.result()
+            except Exception as e:
+                logger.warning(f"Falha ao aquecer conexão do pool: {e}")
+                continue
+            conn.close()
+            opened += 1
+        return opened
+
+    def check_idle(self) -> int:
+        """
+        Executa SELECT 1 nas conexões ociosas há mais de `interval` segundos,
+        no primário e nas réplicas. Retorna quantas conexões foram invalidadas.
+        """
+        invalidated = 0
+        for target in (self.engine, *self.replicas):
+            invalidated += self._check_pool(target.pool)
+        return invalidated
+
+    def _check_pool(self, pool) -> int:
+        # Uma conexão por vez, devolvida logo em seguida: o pool (FIFO) entrega
+        # cada ociosa uma vez, e as requisições nunca ficam sem conexões livres
+        checks = invalidated = 0
+        _internal.active = True
+        try:
+            for _ in range(pool.checkedin()):
+                if pool.checkedin() == 0:
+                    break
+                conn = pool.connect()
+                try:
+                    if time.monotonic() - conn.info.get("last_used", 0) < self.interval:
+                        continue
+                    checks += 1
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("SELECT 1")
+                        cursor.close()
+                        conn.info["last_used"] = time.monotonic()
+                    except Exception:
+                        conn.invalidate()
+                        invalidated += 1
+                finally:
+                    conn.close()
+        finally:
+            _internal.active = False
+
+        stats = getattr(pool, "stats", None)
+        if stats is not None:
+            stats.record_liveness(checks, invalidated)
+        return invalidated
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                invalidated = self.check_idle()
+                if invalidated:
+                    logger.warning(f"{invalidated} conexões ociosas invalidadas")
+            except Exception as e:
+                logger.warning(f"Falha na verificação do pool: {e}")
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-pool-liveness", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Estado atual do pool e contadores acumulados."""
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "idle": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            **pool.stats.snapshot(),
+        }
@@ -0,0 +1,113 @@
+"""
+Revogação de tokens compartilhada entre os workers (revoked_tokens).
+
+revoke() grava na tabela e na denylist local (app.core.denylist); o
+DenylistSync de cada worker lê as revogações novas a cada
+REVOCATION_SYNC_SECONDS, então um logout vale em todos os workers nesse
+prazo sem uma consulta ao banco por requisição. Na inicialização a
+denylist é carregada inteira antes de o worker atender.
+"""
+from datetime import datetime, timedelta, timezone
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config import settings
+from ..core.denylist import denylist
+
+logger = logging.getLogger(__name__)
+
+# now() é o início da transação que revogou: uma revogação confirmada
+# depois da leitura anterior ainda cai nesta janela
+SYNC_OVERLAP_SECONDS = 60
+PURGE_INTERVAL_SECONDS = 3600
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+PURGE_REVOKED = text("DELETE FROM revoked_tokens WHERE expires_at < now() - interval '1 hour'")
+PURGE_REFRESH = text("DELETE FROM refresh_tokens WHERE expires_at < now() - interval '1 day'")
+
+
+def revoke(db, entries: Dict[str, datetime]) -> None:
+    """Revoga ids (jti ou família) até as expirações dadas; efetivo no commit de `db`."""
+    if not entries:
+        return
+    from ..models import RevokedToken
+    statement = insert(RevokedToken).values(
+        [{"jti": key, "expires_at": expires_at} for key, expires_at in entries.items()]
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["jti"],
+        set_={"expires_at": func.greatest(RevokedToken.expires_at, statement.excluded.expires_at)},
+    ))
+    # Neste worker vale já; uma revogação desfeita pelo rollback só recusa tokens a mais
+    denylist.add((key, expires_at.timestamp()) for key, expires_at in entries.items())
+
+
+class DenylistSync:
+    """Mantém a denylist local em dia com revoked_tokens, em uma thread de fundo."""
+
+    def __init__(self, engine, interval: float = 2.0):
+        self.engine = engine
+        self.interval = interval
+        self._since: Optional[datetime] = None
+        self._last_purge = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self) -> int:
+        """Lê as revogações desde a última leitura (todas na primeira). Retorna quantas."""
+        from ..models import RevokedToken
+        with self.engine.connect() as conn:
+            now = conn.execute(select(func.now())).scalar()
+            since = self._since - timedelta(seconds=SYNC_OVERLAP_SECONDS) if self._since else EPOCH
+            rows = conn.execute(
+                select(RevokedToken.jti, func.extract("epoch", RevokedToken.expires_at))
+                .where(RevokedToken.expires_at > func.now(), RevokedToken.created_at >= since)
+            ).all()
+            conn.commit()
+        self._since = now
+        denylist.add((jti, float(expires_at)) for jti, expires_at in rows)
+        return len(rows)
+
+    def purge(self) -> None:
+        """Remove da tabela revogações e refresh tokens expirados."""
+        with self.engine.begin() as conn:
+            conn.execute(PURGE_REVOKED)
+            conn.execute(PURGE_REFRESH)
+        denylist.purge()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="denylist-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.load()
+                if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                    self._last_purge = time.monotonic()
+                    self.purge()
+            except Exception as e:
+                logger.error(f"Falha ao sincronizar tokens revogados: {e}")
+
+
+syncer: Optional[DenylistSync] = None
+
+
+def install(engine) -> None:
+    """Cria o sincronizador da denylist (carregado e iniciado no lifespan)."""
+    global syncer
+    if syncer is None:
+        syncer = DenylistSync(engine, interval=settings.REVOCATION_SYNC_SECONDS)
@@ -0,0 +1,189 @@
+"""
+Roteamento de leituras para réplicas.
+
+Sessões marcadas como somente leitura (requisições GET/HEAD) executam as
+consultas em uma réplica saudável; flush e comandos de escrita vão sempre
+para o primário. Depois de uma escrita, as leituras do mesmo cliente ficam
+no primário por REPLICA_STICKY_SECONDS (read-your-writes).
+
+O momento da última escrita volta ao cliente no cookie `last_write` e no
+header X-Last-Write; qualquer worker que receba um dos dois (clientes sem
+cookies reenviam o header) lê do primário até o fim da janela. O valor é
+um epoch: os relógios das máquinas precisam estar sincronizados (NTP) com
+folga bem menor que a janela.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+LAG_QUERY = text(
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+
+
+class ReplicaSet:
+    """Engines das réplicas com verificação periódica de atraso (lag)."""
+
+    def __init__(self, urls: List[str], max_lag: float, interval: float, **engine_options):
+        self.engines: List[Engine] = [create_engine(url, **engine_options) for url in urls]
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Dict[int, Optional[float]] = {i: None for i in range(len(self.engines))}
+        self._healthy: List[Engine] = list(self.engines)
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> Optional[Engine]:
+        """Réplica saudável em round-robin, ou None para usar o primário."""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def check_lag(self) -> None:
+        """Atualiza o atraso de cada réplica e a lista de réplicas utilizáveis."""
+        healthy = []
+        for i, replica in enumerate(self.engines):
+            try:
+                with replica.connect() as conn:
+                    lag = float(conn.execute(LAG_QUERY).scalar())
+            except Exception as e:
+                logger.warning(f"Réplica {replica.url.host} indisponível: {e}")
+                lag = None
+            self.lag[i] = lag
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(replica)
+        self._healthy = healthy
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check_lag()
+
+    def start(self) -> None:
+        if self.engines and self._thread is None:
+            self.check_lag()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-replica-lag", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for replica in self.engines:
+            replica.dispose()
+
+    def stats(self) -> list:
+        return [
+            {
+                "host": replica.url.host,
+                "lag_seconds": self.lag[i],
+                "healthy": replica in self._healthy,
+            }
+            for i, replica in enumerate(self.engines)
+        ]
+
+
+def last_write_from(request: Request) -> Optional[float]:
+    """Momento da última escrita informado pelo cliente (header ou cookie)."""
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Devolve ao cliente o momento da escrita feita na requisição."""
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                last_write = scope.get("state", {}).get("last_write")
+                if last_write is not None:
+                    value = f"{last_write:.3f}"
+                    headers = list(message.get("headers", []))
+                    headers.append((LAST_WRITE_HEADER.encode(), value.encode()))
+                    headers.append((b"set-cookie", (
+                        f"{LAST_WRITE_COOKIE}={value}; Max-Age={int(self.window) + 1}; "
+                        f"Path=/; HttpOnly; SameSite=Lax"
+                    ).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia leituras de sessões somente leitura para uma réplica.
+    `replicas` e `sticky_seconds` são definidos em app.database.
+    """
+
+    replicas: Optional[ReplicaSet] = None
+    sticky_seconds: float = 0.0
+
+    def _wrote_recently(self) -> bool:
+        last_write = self.info.get("last_write")
+        # Valores muito no futuro (relógio do cliente adulterado) são ignorados
+        return last_write is not None and abs(time.time() - last_write) < self.sticky_seconds
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.replicas
+            and self.info.get("read_only")
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and not self._wrote_recently()
+        ):
+            # Fixa a réplica escolhida para a sessão inteira
+            if "replica" not in self.info:
+                self.info["replica"] = self.replicas.pick()
+            replica = self.info["replica"]
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _track_write(session):
+    if session.info.pop("wrote", False):
+        now = time.time()
+        session.info["last_write"] = now
+        # Estado da requisição (app.database.get_db), lido pelo middleware
+        state = session.info.get("request_state")
+        if state is not None:
+            state["last_write"] = now
@@ -0,0 +1,189 @@
+"""
+Índice da busca textual (search_documents).
+
+Modelos com `__searchable__` (colunas de texto) têm uma linha em
+search_documents com o texto concatenado e seu tsvector na configuração
+SEARCH_TS_CONFIG. A linha é mantida pelo flush, na mesma transação da
+escrita, a partir da linha já gravada na tabela de origem; o escritório vem
+do processo (cases.law_firm_id).
+
+Atualizações em massa (query.update, imports em SQL) e os dados anteriores
+a este índice não passam pelo flush: o SearchReindexer indexa, em lotes,
+as linhas sem entrada e - para tabelas com updated_at - as alteradas desde
+a indexação. Remover o processo remove as entradas dele (ON DELETE CASCADE).
+"""
+from functools import lru_cache
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..config import settings
+from .routing import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+# Chave do advisory lock: um único worker reindexa por vez
+REINDEX_LOCK = 7294113
+
+DELETE = text(
+    "DELETE FROM search_documents WHERE entity = :entity AND entity_id = :entity_id"
+).bindparams(bindparam("entity_id", type_=UUID(as_uuid=True)))
+
+
+def _searchable_models():
+    from .. import models
+    return [
+        mapper.class_ for mapper in models.Base.registry.mappers
+        if getattr(mapper.class_, "__searchable__", None)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _upsert(model, stale: bool):
+    """
+    INSERT ... SELECT que indexa linhas de `model`: as pendentes (stale) ou a
+    linha :entity_id. O texto é lido da própria tabela, então o índice
+    reflete o que a transação gravou.
+    """
+    table = model.__tablename__
+    case_column = "case_id" if hasattr(model, "case_id") else "id"
+    versioned = hasattr(model, "updated_at")
+    content = "concat_ws(E'\\n', " + ", ".join(f"s.{column}" for column in model.__searchable__) + ")"
+    if stale:
+        where = "d.entity_id IS NULL"
+        if versioned:
+            where += " OR s.updated_at IS DISTINCT FROM d.source_updated_at"
+        where += " ORDER BY s.id LIMIT :limit"
+    else:
+        where = "s.id = :entity_id"
+    statement = text(
+        "INSERT INTO search_documents "
+        "(entity, entity_id, law_firm_id, case_id, content, search_vector, source_updated_at, indexed_at) "
+        f"SELECT :entity, s.id, c.law_firm_id, c.id, {content}, "
+        f"to_tsvector(CAST(:config AS regconfig), {content}), "
+        f"{'s.updated_at' if versioned else 'NULL'}, now() "
+        f"FROM {table} s JOIN cases c ON c.id = s.{case_column} "
+        f"LEFT JOIN search_documents d ON d.entity = :entity AND d.entity_id = s.id "
+        f"WHERE {where} "
+        "ON CONFLICT (entity, entity_id) DO UPDATE SET "
+        "law_firm_id = EXCLUDED.law_firm_id, case_id = EXCLUDED.case_id, content = EXCLUDED.content, "
+        "search_vector = EXCLUDED.search_vector, source_updated_at = EXCLUDED.source_updated_at, "
+        "indexed_at = EXCLUDED.indexed_at"
+    )
+    if not stale:
+        statement = statement.bindparams(bindparam("entity_id", type_=UUID(as_uuid=True)))
+    return statement
+
+
+def _index(session, flush_context):
+    changed, deleted = [], []
+    for obj in session.new:
+        if getattr(obj, "__searchable__", None):
+            changed.append(obj)
+    for obj in session.dirty:
+        # Qualquer alteração reindexa: mantém source_updated_at em dia
+        if getattr(obj, "__searchable__", None) and session.is_modified(obj, include_collections=False):
+            changed.append(obj)
+    for obj in session.deleted:
+        if getattr(obj, "__searchable__", None):
+            deleted.append(obj)
+    if not changed and not deleted:
+        return
+
+    conn = session.connection()
+    for obj in changed:
+        conn.execute(_upsert(type(obj), False), {
+            "entity": obj.__tablename__, "entity_id": obj.id, "config": settings.SEARCH_TS_CONFIG,
+        })
+    if deleted:
+        conn.execute(DELETE, [{"entity": obj.__tablename__, "entity_id": obj.id} for obj in deleted])
+
+
+def reindex(engine, batch_size: int = 500, progress: Optional[Callable[[float], None]] = None) -> int:
+    """
+    Indexa as linhas pendentes de todas as tabelas com `__searchable__`, em
+    lotes de uma transação cada. Retorna quantas linhas foram indexadas (0
+    se outro processo já está reindexando). `progress(fração)` é chamado
+    ao fim de cada tabela.
+    """
+    total = 0
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": REINDEX_LOCK}).scalar():
+            conn.rollback()
+            return 0
+        conn.commit()
+        try:
+            models = _searchable_models()
+            for position, model in enumerate(models, 1):
+                while True:
+                    with conn.begin():
+                        count = conn.execute(_upsert(model, True), {
+                            "entity": model.__tablename__,
+                            "config": settings.SEARCH_TS_CONFIG,
+                            "limit": batch_size,
+                        }).rowcount
+                    total += count
+                    if count < batch_size:
+                        break
+                if progress is not None:
+                    progress(position / len(models))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REINDEX_LOCK})
+            conn.commit()
+    return total
+
+
+class SearchReindexer:
+    """Executa reindex() periodicamente em uma thread de fundo."""
+
+    def __init__(self, engine, interval: float = 60, batch_size: int = 500):
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="search-reindexer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                count = reindex(self.engine, self.batch_size)
+                if count:
+                    logger.info(f"Busca: {count} registros reindexados")
+            except Exception as e:
+                logger.error(f"Falha ao reindexar a busca: {e}")
+            self._stop.wait(self.interval)
+
+
+reindexer: Optional[SearchReindexer] = None
+
+
+def install(engine) -> None:
+    """Cria o reindexador em segundo plano (iniciado no lifespan)."""
+    global reindexer
+    if settings.SEARCH_REINDEX_INTERVAL_SECONDS > 0 and reindexer is None:
+        reindexer = SearchReindexer(
+            engine,
+            interval=settings.SEARCH_REINDEX_INTERVAL_SECONDS,
+            batch_size=settings.SEARCH_REINDEX_BATCH_SIZE,
+        )
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _index):
+        event.listen(RoutingSession, "after_flush", _index)
@@ -0,0 +1,27 @@
+"""
+Tombstones das remoções de entidades sincronizáveis (sync_tombstones).
+
+Remoções de modelos com `__versioned__` (clients, cases, tasks) gravam um
+tombstone na mesma transação, para que o /sync informe aos clientes
+offline o que deixou de existir.
+"""
+from sqlalchemy import event, insert
+
+from .routing import RoutingSession
+
+
+def _record_deletes(session, flush_context):
+    rows = [
+        {"law_firm_id": obj.law_firm_id, "entity": obj.__versioned__, "entity_id": obj.id}
+        for obj in session.deleted
+        if getattr(obj, "__versioned__", None) is not None
+    ]
+    if rows:
+        from ..models import SyncTombstone
+        session.connection().execute(insert(SyncTombstone.__table__), rows)
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _record_deletes):
+        event.listen(RoutingSession, "after_flush", _record_deletes)
@@ -0,0 +1,54 @@
+"""
+Versões por escritório e entidade (entity_versions).
+
+Todo flush que insere, altera ou remove um modelo com `__versioned__`
+incrementa a versão da entidade para o escritório, na mesma transação da
+escrita: o ETag muda exatamente quando o commit torna a alteração visível.
+Atualizações em massa (query.update/delete) não passam pelo flush e não
+incrementam a versão.
+"""
+from typing import Iterable
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from .routing import RoutingSession
+
+BUMP = text(
+    "INSERT INTO entity_versions (law_firm_id, entity, version) VALUES (:law_firm_id, :entity, 1) "
+    "ON CONFLICT (law_firm_id, entity) DO UPDATE SET version = entity_versions.version + 1"
+).bindparams(bindparam("law_firm_id", type_=UUID(as_uuid=True)))
+SELECT = text(
+    "SELECT entity, version FROM entity_versions WHERE law_firm_id = :law_firm_id AND entity = ANY(:entities)"
+).bindparams(bindparam("law_firm_id", type_=UUID(as_uuid=True)))
+
+
+def get_versions(db, law_firm_id, entities: Iterable[str]) -> dict:
+    """Versão atual de cada entidade (0 se o escritório nunca escreveu nela)."""
+    entities = list(entities)
+    rows = db.execute(SELECT, {"law_firm_id": law_firm_id, "entities": entities}).all()
+    versions = dict.fromkeys(entities, 0)
+    versions.update(rows)
+    return versions
+
+
+def _bump_versions(session, flush_context):
+    changed = set()
+    for obj in (*session.new, *session.deleted):
+        entity = getattr(obj, "__versioned__", None)
+        if entity is not None:
+            changed.add((obj.law_firm_id, entity))
+    for obj in session.dirty:
+        entity = getattr(obj, "__versioned__", None)
+        if entity is not None and session.is_modified(obj, include_collections=False):
+            changed.add((obj.law_firm_id, entity))
+    if changed:
+        # Ordem fixa para que transações concorrentes travem as linhas na mesma ordem
+        params = [{"law_firm_id": firm, "entity": entity} for firm, entity in sorted(changed, key=str)]
+        session.connection().execute(BUMP, params)
+
+
+def register() -> None:
+    """Registra os eventos de sessão (app.database.install)."""
+    if not event.contains(RoutingSession, "after_flush", _bump_versions):
+        event.listen(RoutingSession, "after_flush", _bump_versions)
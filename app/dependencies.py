@@ -1,12 +1,17 @@
+import hmac
+import uuid
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from jose import JWTError
 from pydantic import BaseModel
 from .config import settings
-from .database import get_db
-from . import models
+from .database import get_db, versions
+from .core.denylist import denylist
+from .core.keys import keys
+from .core.etag import check_not_modified, make_etag
+from . import models, queries
 
 security = HTTPBearer()
 
@@ -31,11 +36,7 @@ def get_current_user(
     
     try:
         token = credentials.credentials
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = keys.decode(token)
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
         law_firm_id: str = payload.get("law_firm_id")
@@ -43,6 +44,9 @@ def get_current_user(
         
         if user_id is None or email is None:
             raise credentials_exception
+        # Logout ou refresh token reutilizado: verificação só em memória
+        if denylist.is_revoked(payload.get("jti"), payload.get("fam")):
+            raise credentials_exception
             
         token_data = TokenData(
             user_id=user_id,
@@ -53,10 +57,14 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(
-        models.User.id == token_data.user_id,
-        models.User.is_active == True
-    ).first()
+    # Autor dos registros de auditoria
+    db.info["user_id"] = token_data.user_id
+    
+    try:
+        user_id = uuid.UUID(token_data.user_id)
+    except ValueError:
+        raise credentials_exception
+    user = queries.get_active_user(db, user_id)
     
     if user is None:
         raise credentials_exception
@@ -89,6 +97,26 @@ def get_current_admin_user(
         )
     return current_user
 
+def get_operator_user(
+    x_operator_token: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_active_user)
+) -> models.User:
+    """
+    Verifica o token de operador (rotas que afetam todo o sistema, não só
+    o escritório do usuário).
+    """
+    if not settings.OPERATOR_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Rotas de operação desabilitadas"
+        )
+    if x_operator_token is None or not hmac.compare_digest(x_operator_token.encode(), settings.OPERATOR_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token de operador inválido"
+        )
+    return current_user
+
 def get_current_lawyer_user(
     current_user: models.User = Depends(get_current_active_user)
 ) -> models.User:
@@ -108,4 +136,25 @@ def get_law_firm_filter(
     """
     Retorna filtro para consultas baseadas no escritório do usuário.
     """
-    return {"law_firm_id": current_user.law_firm_id}
\ No newline at end of file
+    return {"law_firm_id": current_user.law_firm_id}
+
+def list_etag(*entities: str):
+    """
+    Dependência de rotas de listagem: ETag a partir das versões das
+    entidades no escritório do usuário; responde 304 antes da consulta
+    principal quando o cliente já tem a versão atual.
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_active_user)
+    ) -> None:
+        # A versão é lida antes dos dados: uma escrita concorrente no meio
+        # produz, no máximo, dados mais novos que o ETag - nunca o contrário.
+        current = versions.get_versions(db, current_user.law_firm_id, entities)
+        request.state.entity_versions = current  # reaproveitado pelo cache de respostas
+        etag = make_etag(request.url.path, request.url.query, current_user.law_firm_id,
+                         *(f"{name}:{current[name]}" for name in entities))
+        check_not_modified(request, response, etag)
+    return dependency
@@ -0,0 +1,314 @@
+"""
+Pipeline de extração de texto dos documentos.
+
+O upload só grava o documento e uma linha pendente em
+document_extractions; este worker, em processo separado, retira jobs da
+fila com SELECT ... FOR UPDATE SKIP LOCKED (vários workers não disputam o
+mesmo job) e extrai o texto em um pool de processos. O texto vai para
+documents.extracted_text e, pelo flush, para a busca (app.database.search).
+
+Uso:
+    python -m app.extraction [--processes N]
+
+- Cada processo extrator tem memória limitada (EXTRACTION_MEMORY_MB) e é
+  recriado após alguns jobs.
+- Falhas voltam para a fila com backoff exponencial até
+  EXTRACTION_MAX_ATTEMPTS; depois o job fica "failed".
+- Um job "running" cujo worker morreu volta para a fila após
+  EXTRACTION_LEASE_SECONDS.
+- Conteúdo já extraído em outro documento com o mesmo hash é copiado, sem
+  nova extração.
+- Tipos sem extrator (imagens, por exemplo) ficam "skipped". PDFs requerem
+  o pacote pypdf.
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from .config import settings
+from .core import log, metrics
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_JOBS = metrics.registry.counter(
+    "extraction_jobs_total", "Jobs de extração concluídos por resultado", ("result",)
+)
+EXTRACTION_DURATION = metrics.registry.histogram(
+    "extraction_duration_seconds", "Duração da extração de texto por documento",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+EXTRACTION_BYTES = metrics.registry.counter("extraction_bytes_total", "Bytes de documentos processados")
+EXTRACTION_IN_FLIGHT = metrics.registry.gauge("extraction_jobs_in_flight", "Jobs de extração em execução")
+
+CLAIM = text("""
+    UPDATE document_extractions e
+    SET status = 'running', attempts = e.attempts + 1,
+        locked_until = now() + make_interval(secs => :lease), updated_at = now()
+    FROM documents d
+    WHERE e.document_id IN (
+        SELECT document_id FROM document_extractions
+        WHERE run_after <= now()
+          AND (status = 'pending' OR (status = 'running' AND locked_until < now()))
+        ORDER BY run_after
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) AND d.id = e.document_id
+    RETURNING e.document_id, e.attempts, d.content_hash, d.content_type, d.size
+""")
+FINISH = text("""
+    UPDATE document_extractions
+    SET status = :status, error = :error, locked_until = NULL, updated_at = now(),
+        run_after = now() + make_interval(secs => :delay)
+    WHERE document_id = :document_id AND attempts = :attempts AND status = 'running'
+""").bindparams(bindparam("document_id", type_=UUID(as_uuid=True)))
+EXTRACTED = text("""
+    SELECT extracted_text FROM documents
+    WHERE content_hash = :content_hash AND extracted_text IS NOT NULL
+    LIMIT 1
+""")
+QUEUE_DEPTH = text("SELECT count(*) FROM document_extractions WHERE status IN ('pending', 'running')")
+
+
+class UnsupportedContent(Exception):
+    """Tipo de arquivo sem extrator disponível."""
+
+
+# --- Extratores (executados nos processos do pool) ---
+
+def _extract_plain(path: str, max_chars: int) -> str:
+    with open(path, "rb") as f:
+        data = f.read(max_chars * 4)  # até 4 bytes por caractere em UTF-8
+    return data.decode("utf-8", "replace")
+
+
+def _extract_pdf(path: str, max_chars: int) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedContent("Extração de PDF requer o pacote pypdf (pip install pypdf)")
+    parts, total = [], 0
+    for page in PdfReader(path).pages:
+        content = page.extract_text() or ""
+        parts.append(content)
+        total += len(content)
+        if total >= max_chars:
+            break
+    return "\n".join(parts)
+
+
+def _extractor(content_type: Optional[str]):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type.startswith("text/") or content_type in ("application/json", "application/xml"):
+        return _extract_plain
+    if content_type == "application/pdf":
+        return _extract_pdf
+    return None
+
+
+def extract_text(path: str, content_type: Optional[str], max_chars: int) -> str:
+    extractor = _extractor(content_type)
+    if extractor is None:
+        raise UnsupportedContent(f"Sem extrator para {content_type!r}")
+    # O Postgres não aceita NUL em colunas text
+    return extractor(path, max_chars)[:max_chars].replace("\x00", "")
+
+
+def _limit_memory(megabytes: int) -> None:
+    """Inicializador dos processos do pool: limita o espaço de endereçamento."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = megabytes * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    # Ctrl+C é tratado pelo processo principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+# --- Worker ---
+
+@dataclass
+class Job:
+    document_id: object
+    attempts: int
+    content_hash: Optional[str]
+    content_type: Optional[str]
+    size: Optional[int]
+    started: float = 0.0
+
+
+def backoff(attempts: int) -> float:
+    """Atraso antes da próxima tentativa: exponencial, com jitter."""
+    delay = min(settings.EXTRACTION_BACKOFF_MAX_SECONDS, settings.EXTRACTION_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class ExtractionWorker:
+    def __init__(self, session_factory, store, processes: int = 0):
+        self.session_factory = session_factory
+        self.store = store
+        self.processes = processes or os.cpu_count() or 1
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_limit_memory,
+            initargs=(settings.EXTRACTION_MEMORY_MB,),
+            max_tasks_per_child=50,  # devolve ao sistema a memória de PDFs grandes
+        )
+
+    def claim(self, limit: int) -> List[Job]:
+        with self.session_factory() as db:
+            rows = db.execute(CLAIM, {"lease": settings.EXTRACTION_LEASE_SECONDS, "limit": limit}).all()
+            db.commit()
+        return [Job(*row) for row in rows]
+
+    def finish(self, job: Job, status: str, extracted: Optional[str] = None,
+               error: Optional[str] = None, delay: float = 0) -> None:
+        """Grava o resultado, se o job ainda é deste worker (mesma tentativa)."""
+        from .models import Document
+        with self.session_factory() as db:
+            updated = db.execute(FINISH, {
+                "document_id": job.document_id, "attempts": job.attempts,
+                "status": status, "error": error, "delay": delay,
+            }).rowcount
+            if updated and extracted is not None:
+                document = db.get(Document, job.document_id)
+                if document is not None:
+                    document.extracted_text = extracted
+            db.commit()
+        if updated:
+            EXTRACTION_JOBS.inc((status if status != "pending" else "retry",))
+
+    def fail(self, job: Job, error: str) -> None:
+        if job.attempts >= settings.EXTRACTION_MAX_ATTEMPTS:
+            logger.error(f"Extração do documento {job.document_id} falhou: {error}")
+            self.finish(job, "failed", error=error)
+        else:
+            self.finish(job, "pending", error=error, delay=backoff(job.attempts))
+
+    def _already_extracted(self, job: Job) -> Optional[str]:
+        with self.session_factory() as db:
+            return db.execute(EXTRACTED, {"content_hash": job.content_hash}).scalar()
+
+    def submit(self, pool: ProcessPoolExecutor, job: Job):
+        """Envia o job ao pool; retorna None se foi resolvido sem extração."""
+        if not job.content_hash:
+            self.finish(job, "skipped", error="Documento sem conteúdo armazenado")
+            return None
+        if _extractor(job.content_type) is None:
+            self.finish(job, "skipped", error=f"Sem extrator para {job.content_type!r}")
+            return None
+        extracted = self._already_extracted(job)
+        if extracted is not None:
+            self.finish(job, "done", extracted=extracted)
+            return None
+        path = self.store.local_path(job.content_hash)
+        if path is None:
+            self.fail(job, "Backend de armazenamento sem caminho local")
+            return None
+        job.started = time.perf_counter()
+        return pool.submit(extract_text, path, job.content_type, settings.EXTRACTION_MAX_CHARS)
+
+    def complete(self, job: Job, future) -> None:
+        EXTRACTION_DURATION.observe((), time.perf_counter() - job.started)
+        try:
+            extracted = future.result()
+        except UnsupportedContent as e:
+            self.finish(job, "skipped", error=str(e))
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            self.fail(job, f"{type(e).__name__}: {e}")
+        else:
+            EXTRACTION_BYTES.inc(amount=job.size or 0)
+            self.finish(job, "done", extracted=extracted)
+
+    def run(self) -> None:
+        pool = self._new_pool()
+        in_flight = {}  # future -> Job
+        try:
+            while not self._stop.is_set():
+                free = self.processes - len(in_flight)
+                if free > 0:
+                    for job in self.claim(free):
+                        future = self.submit(pool, job)
+                        if future is not None:
+                            in_flight[future] = job
+                            EXTRACTION_IN_FLIGHT.inc()
+
+                if not in_flight:
+                    self._stop.wait(settings.EXTRACTION_POLL_SECONDS)
+                    continue
+
+                done, _ = wait(in_flight, timeout=settings.EXTRACTION_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    EXTRACTION_IN_FLIGHT.dec()
+                    try:
+                        self.complete(job, future)
+                    except BrokenProcessPool:
+                        # Um extrator morreu (OOM, segfault): todos os jobs do
+                        # pool são perdidos e voltam para a fila
+                        logger.error("Pool de extração interrompido; recriando")
+                        for lost in [job, *in_flight.values()]:
+                            self.fail(lost, "Processo extrator interrompido")
+                        EXTRACTION_IN_FLIGHT.dec(amount=len(in_flight))
+                        in_flight.clear()
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._new_pool()
+                        break
+        finally:
+            # Jobs em andamento ficam "running" e voltam à fila pelo lease
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker de extração de texto dos documentos")
+    parser.add_argument("--processes", type=int, default=settings.EXTRACTION_PROCESSES,
+                        help="Processos extratores (padrão: um por núcleo)")
+    args = parser.parse_args()
+
+    log.configure()
+    from .core.storage import get_store
+    from .database import SessionLocal, install
+
+    install(background=False)
+
+    def queue_depth():
+        with SessionLocal() as db:
+            return db.execute(QUEUE_DEPTH).scalar()
+
+    metrics.registry.gauge_func("extraction_queue_depth", "Jobs de extração pendentes ou em execução", queue_depth)
+    if settings.EXTRACTION_METRICS_PORT:
+        metrics.start_http_server(settings.EXTRACTION_METRICS_PORT)
+
+    worker = ExtractionWorker(SessionLocal, get_store(), args.processes)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    logger.info(f"Worker de extração iniciado com {worker.processes} processos")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
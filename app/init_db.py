@@ -1,6 +1,7 @@
 import logging
 from sqlalchemy.orm import Session
-from .database import SessionLocal, engine
+from .database import SessionLocal, install
+from .migrate import upgrade
 from . import models
 from .core.security import get_password_hash
 
@@ -12,8 +13,9 @@ def init_db() -> None:
     Inicializa o banco de dados com dados padrão.
     """
     try:
-        # Criar todas as tabelas
-        models.Base.metadata.create_all(bind=engine)
+        # Aplicar migrações pendentes
+        upgrade()
+        install(background=False)
         
         db = SessionLocal()
         
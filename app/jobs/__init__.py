@@ -0,0 +1,13 @@
+"""
+Fila de jobs genérica, armazenada no Postgres (tabela jobs).
+
+Rotas enfileiram trabalho lento com enqueue(db, "nome", payload) - na
+mesma transação da requisição - e respondem 202 com o id; o worker
+(python -m app.jobs.worker) executa os jobs e GET /jobs/{id} informa
+status e progresso. Tarefas são registradas com @task em app.jobs.tasks.
+"""
+from .queue import JobCancelled, JobContext, enqueue
+from .registry import TASKS, task
+from . import tasks  # registra as tarefas
+
+__all__ = ["JobCancelled", "JobContext", "TASKS", "enqueue", "task"]
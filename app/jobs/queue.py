@@ -0,0 +1,166 @@
+"""
+Operações da fila: enfileirar, retirar (FOR UPDATE SKIP LOCKED), renovar a
+visibilidade, concluir e reagendar com backoff.
+
+Um job retirado fica "running" com locked_until = agora + visibilidade; o
+worker renova o prazo enquanto o executa. Se o worker morre, o prazo
+expira e outro worker retira o job de novo (nova tentativa). As
+atualizações de resultado exigem o mesmo worker e a mesma tentativa: um
+worker que perdeu o job não sobrescreve o resultado do outro.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+import random
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import BigInteger, String, bindparam, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from ..config import settings
+from .registry import TASKS
+
+
+class JobCancelled(Exception):
+    """O job foi cancelado ou deixou de pertencer a este worker."""
+
+
+CLAIM = text("""
+    UPDATE jobs
+    SET status = 'running', attempts = attempts + 1, locked_by = :worker_id,
+        locked_until = now() + make_interval(secs => :visibility),
+        started_at = coalesce(started_at, now())
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE queue = ANY(:queues) AND run_after <= now()
+          AND (status = 'queued' OR (status = 'running' AND locked_until < now()))
+        ORDER BY priority DESC, run_after
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, payload, attempts, max_attempts, law_firm_id, created_by
+""").bindparams(bindparam("queues", type_=ARRAY(String)))
+
+_OWNED = "id = :id AND locked_by = :worker_id AND attempts = :attempts AND status = 'running'"
+
+HEARTBEAT = text("""
+    UPDATE jobs SET locked_until = now() + make_interval(secs => :visibility)
+    WHERE id = ANY(:ids) AND locked_by = :worker_id AND status = 'running'
+""").bindparams(bindparam("ids", type_=ARRAY(BigInteger)))
+PROGRESS = text(f"""
+    UPDATE jobs SET progress = :progress, message = coalesce(:message, message),
+        locked_until = now() + make_interval(secs => :visibility)
+    WHERE {_OWNED}
+""")
+SUCCEED = text(f"""
+    UPDATE jobs SET status = 'succeeded', progress = 1, result = :result, error = NULL,
+        locked_until = NULL, finished_at = now()
+    WHERE {_OWNED}
+""").bindparams(bindparam("result", type_=JSONB))
+RETRY = text(f"""
+    UPDATE jobs SET status = 'queued', error = :error, locked_until = NULL,
+        run_after = now() + make_interval(secs => :delay)
+    WHERE {_OWNED}
+""")
+FAIL = text(f"""
+    UPDATE jobs SET status = 'failed', error = :error, locked_until = NULL, finished_at = now()
+    WHERE {_OWNED}
+""")
+
+
+@dataclass
+class JobContext:
+    """Job em execução, entregue à tarefa. Serializável (vai para o pool de processos)."""
+    id: int
+    name: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+    law_firm_id: Optional[uuid.UUID]
+    created_by: Optional[uuid.UUID]
+    worker_id: str
+
+    def params(self, **values) -> dict:
+        return {"id": self.id, "worker_id": self.worker_id, "attempts": self.attempts, **values}
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """
+        Registra o progresso (0 a 1) e renova a visibilidade. Levanta
+        JobCancelled se o job foi cancelado ou assumido por outro worker.
+        """
+        from ..database import SessionLocal
+        with SessionLocal() as db:
+            updated = db.execute(PROGRESS, self.params(
+                progress=max(0.0, min(1.0, fraction)), message=message,
+                visibility=settings.JOBS_VISIBILITY_TIMEOUT_SECONDS,
+            )).rowcount
+            db.commit()
+        if not updated:
+            raise JobCancelled(f"Job {self.id} cancelado ou assumido por outro worker")
+
+
+def enqueue(db, name: str, payload: Optional[dict] = None, *, law_firm_id=None, created_by=None,
+            delay: float = 0, priority: Optional[int] = None):
+    """
+    Adiciona o job à sessão (é gravado no commit do chamador: se a
+    requisição falhar, o job não existe). Retorna o models.Job com id.
+    """
+    from .. import models
+    try:
+        spec = TASKS[name]
+    except KeyError:
+        raise ValueError(f"Tarefa desconhecida: {name}")
+    job = models.Job(
+        queue=spec.queue,
+        name=name,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        max_attempts=spec.max_attempts,
+        law_firm_id=law_firm_id,
+        created_by=created_by,
+    )
+    if delay:
+        job.run_after = func.now() + timedelta(seconds=delay)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def claim(db, queues: List[str], limit: int, worker_id: str) -> List[JobContext]:
+    rows = db.execute(CLAIM, {
+        "queues": queues, "limit": limit, "worker_id": worker_id,
+        "visibility": settings.JOBS_VISIBILITY_TIMEOUT_SECONDS,
+    }).all()
+    db.commit()
+    return [JobContext(*row, worker_id=worker_id) for row in rows]
+
+
+def heartbeat(db, worker_id: str, ids: List[int]) -> None:
+    if ids:
+        db.execute(HEARTBEAT, {"ids": ids, "worker_id": worker_id,
+                               "visibility": settings.JOBS_VISIBILITY_TIMEOUT_SECONDS})
+        db.commit()
+
+
+def succeed(db, ctx: JobContext, result: Optional[dict]) -> bool:
+    updated = db.execute(SUCCEED, ctx.params(result=result)).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def backoff(attempts: int) -> float:
+    """Atraso antes da próxima tentativa: exponencial, com jitter."""
+    delay = min(settings.JOBS_BACKOFF_MAX_SECONDS, settings.JOBS_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def fail(db, ctx: JobContext, error: str, retry: bool = True) -> str:
+    """Reagenda o job com backoff ou o marca como falho. Retorna o novo status."""
+    if retry and ctx.attempts < ctx.max_attempts:
+        updated = db.execute(RETRY, ctx.params(error=error, delay=backoff(ctx.attempts))).rowcount
+        status = "retry"
+    else:
+        updated = db.execute(FAIL, ctx.params(error=error)).rowcount
+        status = "failed"
+    db.commit()
+    return status if updated else "lost"
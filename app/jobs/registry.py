@@ -0,0 +1,32 @@
+"""Registro das tarefas executáveis pela fila."""
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable
+    queue: str = "default"
+    executor: str = "thread"  # thread (I/O, banco) ou process (CPU)
+    max_attempts: int = 3
+    priority: int = 0
+
+
+TASKS: Dict[str, Task] = {}
+
+
+def task(name: str, *, queue: str = "default", executor: str = "thread",
+         max_attempts: int = 3, priority: int = 0):
+    """
+    Registra `func(ctx: JobContext) -> dict | None` como a tarefa `name`.
+    Tarefas com executor="process" rodam no pool de processos: devem ser
+    funções de módulo e receber/retornar apenas dados serializáveis.
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"executor inválido: {executor}")
+
+    def register(func: Callable) -> Callable:
+        TASKS[name] = Task(name, func, queue, executor, max_attempts, priority)
+        return func
+    return register
@@ -0,0 +1,27 @@
+"""Tarefas executadas pela fila de jobs."""
+from ..config import settings
+from .registry import task
+
+
+@task("search.reindex")
+def reindex_search(ctx):
+    """Indexa na busca os registros pendentes (ver app.database.search)."""
+    from ..database import engine, search
+    indexed = search.reindex(engine, settings.SEARCH_REINDEX_BATCH_SIZE, progress=ctx.progress)
+    return {"indexed": indexed}
+
+
+@task("documents.collect_blobs")
+def collect_blobs(ctx):
+    """Apaga os blobs sem referências (ver app.database.blobs)."""
+    from ..core.storage import get_store
+    from ..database import SessionLocal, blobs
+    deleted, batch = 0, 1000
+    with SessionLocal() as db:
+        while True:
+            keys = blobs.collect_garbage(db, get_store(), settings.BLOB_GC_GRACE_SECONDS, limit=batch)
+            deleted += len(keys)
+            if len(keys) < batch:
+                break
+            ctx.progress(0, f"{deleted} blobs apagados")
+    return {"deleted": deleted}
@@ -0,0 +1,174 @@
+"""
+Worker da fila de jobs.
+
+Uso:
+    python -m app.jobs.worker [--queues default,outra] [--threads 4] [--processes 2]
+
+Retira jobs das filas com FOR UPDATE SKIP LOCKED (vários workers, em
+várias máquinas, não disputam o mesmo job) e os executa em um pool de
+threads ou, para tarefas com executor="process", em um pool de processos.
+Uma thread renova a visibilidade dos jobs em execução; SIGTERM termina os
+jobs em andamento antes de sair.
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from ..config import settings
+from ..core import log, metrics
+from . import queue
+from .registry import TASKS
+from . import tasks  # noqa: F401 - registra as tarefas (também nos processos do pool)
+
+logger = logging.getLogger(__name__)
+
+JOBS_COMPLETED = metrics.registry.counter(
+    "jobs_completed_total", "Jobs finalizados por tarefa e resultado", ("name", "result")
+)
+JOB_DURATION = metrics.registry.histogram(
+    "job_duration_seconds", "Duração da execução dos jobs por tarefa", ("name",),
+    buckets=(0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+JOBS_IN_FLIGHT = metrics.registry.gauge("jobs_in_flight", "Jobs em execução neste worker")
+QUEUE_DEPTH = text("SELECT queue, status, count(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY queue, status")
+
+
+class Worker:
+    def __init__(self, session_factory, queues: List[str], threads: int = 4, processes: int = 0):
+        self.session_factory = session_factory
+        self.queues = queues
+        self.threads = threads
+        self.processes = processes
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._in_flight: Dict = {}  # future -> (JobContext, início)
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def capacity(self) -> int:
+        return self.threads + self.processes
+
+    def _heartbeat(self) -> None:
+        interval = settings.JOBS_VISIBILITY_TIMEOUT_SECONDS / 3
+        while not self._stop.wait(interval):
+            with self._lock:
+                ids = [ctx.id for ctx, _ in self._in_flight.values()]
+            try:
+                with self.session_factory() as db:
+                    queue.heartbeat(db, self.worker_id, ids)
+            except Exception as e:
+                logger.error(f"Falha ao renovar a visibilidade dos jobs: {e}")
+
+    def _submit(self, thread_pool, process_pool, ctx: queue.JobContext):
+        spec = TASKS.get(ctx.name)
+        if spec is None:
+            with self.session_factory() as db:
+                queue.fail(db, ctx, f"Tarefa desconhecida: {ctx.name}", retry=False)
+            JOBS_COMPLETED.inc((ctx.name, "failed"))
+            return None
+        pool = process_pool if spec.executor == "process" and process_pool is not None else thread_pool
+        return pool.submit(spec.func, ctx)
+
+    def _complete(self, ctx: queue.JobContext, future, started: float) -> None:
+        JOB_DURATION.observe((ctx.name,), time.perf_counter() - started)
+        with self.session_factory() as db:
+            try:
+                result = future.result()
+            except queue.JobCancelled:
+                status = "cancelled"
+            except Exception as e:
+                logger.exception(f"Job {ctx.id} ({ctx.name}) falhou")
+                status = queue.fail(db, ctx, f"{type(e).__name__}: {e}")
+            else:
+                status = "succeeded" if queue.succeed(db, ctx, result) else "lost"
+        JOBS_COMPLETED.inc((ctx.name, status))
+
+    def run(self) -> None:
+        thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="job")
+        process_pool = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+        logger.info(f"Worker {self.worker_id} nas filas {self.queues} "
+                    f"({self.threads} threads, {self.processes} processos)")
+        try:
+            while not self._stop.is_set():
+                free = self.capacity - len(self._in_flight)
+                if free > 0:
+                    with self.session_factory() as db:
+                        claimed = queue.claim(db, self.queues, free, self.worker_id)
+                    for ctx in claimed:
+                        future = self._submit(thread_pool, process_pool, ctx)
+                        if future is not None:
+                            with self._lock:
+                                self._in_flight[future] = (ctx, time.perf_counter())
+                            JOBS_IN_FLIGHT.inc()
+
+                if not self._in_flight:
+                    self._stop.wait(settings.JOBS_POLL_SECONDS)
+                    continue
+
+                done, _ = wait(list(self._in_flight), timeout=settings.JOBS_POLL_SECONDS,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    with self._lock:
+                        ctx, started = self._in_flight.pop(future)
+                    JOBS_IN_FLIGHT.dec()
+                    self._complete(ctx, future, started)
+        finally:
+            # Termina o que já começou; jobs não iniciados voltam pela visibilidade
+            for future in list(self._in_flight):
+                ctx, started = self._in_flight[future]
+                if future.cancel():
+                    continue
+                wait([future])
+                self._complete(ctx, future, started)
+            thread_pool.shutdown(wait=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True)
+            self._stop.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker da fila de jobs")
+    parser.add_argument("--queues", default="default", help="Filas separadas por vírgula")
+    parser.add_argument("--threads", type=int, default=settings.JOBS_THREADS)
+    parser.add_argument("--processes", type=int, default=settings.JOBS_PROCESSES,
+                        help="Processos para tarefas de CPU (0 = um por núcleo)")
+    args = parser.parse_args()
+
+    log.configure()
+    from ..database import SessionLocal, install
+
+    install(background=False)
+
+    def queue_depth():
+        with SessionLocal() as db:
+            return {(name, status): count for name, status, count in db.execute(QUEUE_DEPTH)}
+
+    metrics.registry.gauge_func("jobs_queue_depth", "Jobs na fila por fila e status", queue_depth, ("queue", "status"))
+    if settings.JOBS_METRICS_PORT:
+        metrics.start_http_server(settings.JOBS_METRICS_PORT)
+
+    processes = args.processes or os.cpu_count() or 1
+    worker = Worker(SessionLocal, [q.strip() for q in args.queues.split(",") if q.strip()],
+                    threads=args.threads, processes=processes)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Migrações versionadas do schema (Alembic).
+
+Uso:
+    python -m app.migrate upgrade [revisao]     # padrão: head
+    python -m app.migrate downgrade <revisao>
+    python -m app.migrate current
+    python -m app.migrate history
+    python -m app.migrate stamp <revisao>
+    python -m app.migrate revision -m "mensagem" [--autogenerate]
+
+A aplicação não executa DDL no startup: rode `upgrade` no deploy,
+antes de subir os workers.
+"""
+import argparse
+import os
+
+from alembic import command
+from alembic.config import Config
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+
+def get_config() -> Config:
+    """Configuração do Alembic sem depender de alembic.ini."""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+
+def upgrade(revision: str = "head") -> None:
+    """Aplica as migrações pendentes até a revisão informada."""
+    command.upgrade(get_config(), revision)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("upgrade", help="Aplica migrações")
+    p.add_argument("revision", nargs="?", default="head")
+
+    p = sub.add_parser("downgrade", help="Reverte migrações")
+    p.add_argument("revision")
+
+    sub.add_parser("current", help="Mostra a revisão aplicada")
+    sub.add_parser("history", help="Lista as revisões")
+
+    p = sub.add_parser("stamp", help="Marca a revisão sem executar DDL")
+    p.add_argument("revision")
+
+    p = sub.add_parser("revision", help="Cria nova revisão")
+    p.add_argument("-m", "--message", required=True)
+    p.add_argument("--autogenerate", action="store_true")
+
+    args = parser.parse_args()
+    config = get_config()
+
+    if args.command == "upgrade":
+        command.upgrade(config, args.revision)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "history":
+        command.history(config, verbose=True)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "revision":
+        command.revision(config, message=args.message, autogenerate=args.autogenerate)
+
+
+if __name__ == "__main__":
+    main()
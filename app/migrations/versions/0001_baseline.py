@@ -0,0 +1,177 @@
+"""Schema inicial
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+
+
+def upgrade() -> None:
+    # Bancos criados pelo antigo create_all() já possuem o schema:
+    # apenas adotamos a revisão.
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("law_firms"):
+        return
+
+    op.create_table(
+        "law_firms",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("cnpj", sa.String(18), unique=True, nullable=True),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.Text, nullable=False),
+        sa.Column("role", sa.String(50), nullable=False),
+        sa.Column("is_active", sa.Boolean),
+        *_timestamps(),
+        sa.CheckConstraint("role IN ('admin', 'lawyer', 'assistant')", name="role_check"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "clients",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id"), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("document", sa.String(20)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("address", sa.Text),
+        sa.Column("estado", sa.String(10), nullable=True),
+        *_timestamps(),
+        sa.CheckConstraint("type IN ('pf', 'pj')", name="client_type_check"),
+    )
+    op.create_index("idx_client_document", "clients", ["document"])
+
+    op.create_table(
+        "cases",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id"), nullable=False),
+        sa.Column("client_id", UUID(as_uuid=True), sa.ForeignKey("clients.id"), nullable=False),
+        sa.Column("case_number", sa.String(50)),
+        sa.Column("court", sa.String(255)),
+        sa.Column("area", sa.String(100)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("distribution_date", sa.Date),
+        sa.Column("value", sa.Numeric(15, 2)),
+        sa.Column("description", sa.Text),
+        sa.Column("responsible_lawyer_id", UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        *_timestamps(),
+    )
+    op.create_index("idx_cases_client_id", "cases", ["client_id"])
+    op.create_index("idx_cases_law_firm_id", "cases", ["law_firm_id"])
+
+    op.create_table(
+        "case_parties",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(50)),
+        sa.Column("document", sa.String(20)),
+    )
+
+    op.create_table(
+        "case_movements",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("movement_date", sa.Date, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id"), nullable=False),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id")),
+        sa.Column("assigned_to", UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("due_date", sa.Date),
+        sa.Column("status", sa.String(30)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("status IN ('pending', 'done', 'late')", name="task_status_check"),
+    )
+    op.create_index("idx_tasks_due_date", "tasks", ["due_date"])
+
+    op.create_table(
+        "hearings",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("hearing_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("type", sa.String(100)),
+        sa.Column("location", sa.String(255)),
+        sa.Column("notes", sa.Text),
+    )
+
+    op.create_table(
+        "documents",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("uploaded_by", UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("file_name", sa.String(255), nullable=False),
+        sa.Column("file_url", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "financial_records",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("type", sa.String(30), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("amount", sa.Numeric(15, 2), nullable=False),
+        sa.Column("due_date", sa.Date),
+        sa.Column("paid_at", sa.Date),
+        sa.CheckConstraint("type IN ('fee', 'payment')", name="financial_type_check"),
+    )
+
+    op.create_table(
+        "notes",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id"), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "notes",
+        "financial_records",
+        "documents",
+        "hearings",
+        "tasks",
+        "case_movements",
+        "case_parties",
+        "cases",
+        "clients",
+        "users",
+        "law_firms",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,42 @@
+"""Índices para as consultas mais frequentes
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19
+
+Os índices são criados com CREATE INDEX CONCURRENTLY para não bloquear
+escritas nas tabelas em produção. CONCURRENTLY não roda dentro de
+transação, por isso cada comando usa autocommit_block().
+"""
+from alembic import op
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+# (nome, tabela, colunas)
+INDEXES = [
+    ("idx_clients_law_firm_name", "clients", "law_firm_id, name"),
+    ("idx_clients_law_firm_document", "clients", "law_firm_id, document"),
+    ("idx_users_law_firm_id", "users", "law_firm_id"),
+    ("idx_tasks_law_firm_id", "tasks", "law_firm_id"),
+    ("idx_case_parties_case_id", "case_parties", "case_id"),
+    ("idx_case_movements_case_id", "case_movements", "case_id, movement_date"),
+    ("idx_hearings_case_id", "hearings", "case_id"),
+    ("idx_documents_case_id", "documents", "case_id"),
+    ("idx_financial_records_case_id", "financial_records", "case_id"),
+    ("idx_notes_case_id", "notes", "case_id"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,27 @@
+"""Contadores de versão por escritório e entidade (ETags)
+
+Revision ID: 0003_entity_versions
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0003_entity_versions"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "entity_versions",
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id"), primary_key=True),
+        sa.Column("entity", sa.String(50), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("entity_versions")
@@ -0,0 +1,36 @@
+"""Log de auditoria e feed de alterações
+
+Revision ID: 0004_audit_log
+Revises: 0003_entity_versions
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "0004_audit_log"
+down_revision = "0003_entity_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("entity", sa.String(50), nullable=False),
+        sa.Column("entity_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("action", sa.String(10), nullable=False),
+        sa.Column("changes", JSONB, nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True)),
+        sa.Column("request_id", sa.String(128)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.clock_timestamp(), nullable=False),
+        sa.CheckConstraint("action IN ('create', 'update', 'delete')", name="audit_action_check"),
+    )
+    op.create_index("idx_audit_log_law_firm_id", "audit_log", ["law_firm_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_audit_log_law_firm_id", table_name="audit_log")
+    op.drop_table("audit_log")
@@ -0,0 +1,55 @@
+"""Sincronização incremental: tasks.updated_at, tombstones e índices
+
+Revision ID: 0005_sync
+Revises: 0004_audit_log
+Create Date: 2026-10-19
+
+Os índices (law_firm_id, updated_at, id) atendem o keyset do /sync e são
+criados com CONCURRENTLY, fora de transação.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0005_sync"
+down_revision = "0004_audit_log"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("idx_clients_law_firm_updated", "clients", "law_firm_id, updated_at, id"),
+    ("idx_cases_law_firm_updated", "cases", "law_firm_id, updated_at, id"),
+    ("idx_tasks_law_firm_updated", "tasks", "law_firm_id, updated_at, id"),
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tasks",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    # Tarefas existentes: a última alteração conhecida é a criação
+    op.execute("UPDATE tasks SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("entity", sa.String(50), nullable=False),
+        sa.Column("entity_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_sync_tombstones_law_firm_deleted", "sync_tombstones", ["law_firm_id", "deleted_at", "id"])
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_index("idx_sync_tombstones_law_firm_deleted", table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+    op.drop_column("tasks", "updated_at")
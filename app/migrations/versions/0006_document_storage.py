@@ -0,0 +1,25 @@
+"""Metadados do conteúdo dos documentos (hash, tamanho, tipo)
+
+Revision ID: 0006_document_storage
+Revises: 0005_sync
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_document_storage"
+down_revision = "0005_sync"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("content_hash", sa.String(64)))
+    op.add_column("documents", sa.Column("size", sa.BigInteger))
+    op.add_column("documents", sa.Column("content_type", sa.String(255)))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "content_type")
+    op.drop_column("documents", "size")
+    op.drop_column("documents", "content_hash")
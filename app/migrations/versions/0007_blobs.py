@@ -0,0 +1,48 @@
+"""Blobs endereçados por conteúdo com contagem de referências
+
+Revision ID: 0007_blobs
+Revises: 0006_document_storage
+Create Date: 2026-10-19
+
+A tabela é preenchida a partir dos documentos que já têm content_hash.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_blobs"
+down_revision = "0006_document_storage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("size", sa.BigInteger, nullable=False),
+        sa.Column("content_type", sa.String(255)),
+        sa.Column("ref_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        "idx_blobs_unreferenced", "blobs", ["updated_at"],
+        postgresql_where=sa.text("ref_count <= 0"),
+    )
+    op.execute(
+        "INSERT INTO blobs (hash, size, content_type, ref_count) "
+        "SELECT content_hash, max(size), max(content_type), count(*) FROM documents "
+        "WHERE content_hash IS NOT NULL GROUP BY content_hash"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_content_hash ON documents (content_hash)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_content_hash")
+    op.drop_index("idx_blobs_unreferenced", table_name="blobs")
+    op.drop_table("blobs")
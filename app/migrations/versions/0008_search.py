@@ -0,0 +1,44 @@
+"""Busca textual: search_documents com índice GIN (btree_gin)
+
+Revision ID: 0008_search
+Revises: 0007_blobs
+Create Date: 2026-10-19
+
+A tabela nasce vazia: o SearchReindexer indexa os registros existentes em
+lotes, sem travar as tabelas de origem.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+
+revision = "0008_search"
+down_revision = "0007_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Permite law_firm_id (uuid) no mesmo índice GIN do tsvector
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_table(
+        "search_documents",
+        sa.Column("entity", sa.String(50), primary_key=True),
+        sa.Column("entity_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("case_id", UUID(as_uuid=True), sa.ForeignKey("cases.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("search_vector", TSVECTOR, nullable=False),
+        sa.Column("source_updated_at", sa.DateTime(timezone=True)),
+        sa.Column("indexed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "idx_search_documents_firm_vector", "search_documents", ["law_firm_id", "search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index("idx_search_documents_case_id", "search_documents", ["case_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_search_documents_case_id", table_name="search_documents")
+    op.drop_index("idx_search_documents_firm_vector", table_name="search_documents")
+    op.drop_table("search_documents")
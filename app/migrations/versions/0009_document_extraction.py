@@ -0,0 +1,49 @@
+"""Extração de texto dos documentos: documents.extracted_text e fila
+
+Revision ID: 0009_document_extraction
+Revises: 0008_search
+Create Date: 2026-10-19
+
+Documentos já armazenados entram na fila como pendentes.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0009_document_extraction"
+down_revision = "0008_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("extracted_text", sa.Text))
+    op.create_table(
+        "document_extractions",
+        sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("documents.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True)),
+        sa.Column("error", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'skipped', 'failed')", name="extraction_status_check"
+        ),
+    )
+    op.create_index(
+        "idx_document_extractions_queue", "document_extractions", ["run_after"],
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+    op.execute(
+        "INSERT INTO document_extractions (document_id) "
+        "SELECT id FROM documents WHERE content_hash IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_document_extractions_queue", table_name="document_extractions")
+    op.drop_table("document_extractions")
+    op.drop_column("documents", "extracted_text")
@@ -0,0 +1,54 @@
+"""Fila de jobs genérica
+
+Revision ID: 0010_jobs
+Revises: 0009_document_extraction
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "0010_jobs"
+down_revision = "0009_document_extraction"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("queue", sa.String(50), nullable=False, server_default="default"),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("payload", JSONB, nullable=False, server_default="{}"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("priority", sa.SmallInteger, nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer, nullable=False, server_default="3"),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True)),
+        sa.Column("locked_by", sa.String(100)),
+        sa.Column("progress", sa.Float, nullable=False, server_default="0"),
+        sa.Column("message", sa.Text),
+        sa.Column("result", JSONB),
+        sa.Column("error", sa.Text),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id", ondelete="CASCADE")),
+        sa.Column("created_by", UUID(as_uuid=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')", name="job_status_check"
+        ),
+    )
+    op.create_index(
+        "idx_jobs_dequeue", "jobs", ["queue", sa.text("priority DESC"), "run_after"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+    op.create_index("idx_jobs_law_firm_id", "jobs", ["law_firm_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_jobs_law_firm_id", table_name="jobs")
+    op.drop_index("idx_jobs_dequeue", table_name="jobs")
+    op.drop_table("jobs")
@@ -0,0 +1,65 @@
+"""Lembretes de audiências e prazos, e caixa de entrada
+
+Revision ID: 0011_reminders
+Revises: 0010_jobs
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "0011_reminders"
+down_revision = "0010_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reminders",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("idempotency_key", sa.String(200), nullable=False, unique=True),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("entity_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("locked_until", sa.DateTime(timezone=True)),
+        sa.Column("sent_at", sa.DateTime(timezone=True)),
+        sa.Column("error", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("status IN ('pending', 'sending', 'sent', 'failed')", name="reminder_status_check"),
+    )
+    op.create_index(
+        "idx_reminders_dispatch", "reminders", ["scheduled_at"],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("law_firm_id", UUID(as_uuid=True), sa.ForeignKey("law_firms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("reminder_id", sa.BigInteger, sa.ForeignKey("reminders.id", ondelete="SET NULL"), unique=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("body", sa.Text),
+        sa.Column("data", JSONB, nullable=False, server_default="{}"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("read_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("idx_notifications_user_id", "notifications", ["user_id", "id"])
+
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_hearings_hearing_date ON hearings (hearing_date)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_hearings_hearing_date")
+    op.drop_index("idx_notifications_user_id", table_name="notifications")
+    op.drop_table("notifications")
+    op.drop_index("idx_reminders_dispatch", table_name="reminders")
+    op.drop_table("reminders")
@@ -0,0 +1,45 @@
+"""Refresh tokens com rotação e denylist de tokens revogados
+
+Revision ID: 0012_token_revocation
+Revises: 0011_reminders
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0012_token_revocation"
+down_revision = "0011_reminders"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.String(64), primary_key=True),
+        sa.Column("family_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True)),
+        sa.Column("revoked_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("idx_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+    op.create_index("idx_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(64), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("idx_revoked_tokens_created_at", "revoked_tokens", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_revoked_tokens_created_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
+    op.drop_index("idx_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("idx_refresh_tokens_family_id", table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
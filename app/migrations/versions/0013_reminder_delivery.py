@@ -0,0 +1,36 @@
+"""Entrega de lembretes por canal e lembretes cancelados
+
+Revision ID: 0013_reminder_delivery
+Revises: 0012_token_revocation
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+revision = "0013_reminder_delivery"
+down_revision = "0012_token_revocation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reminders",
+        sa.Column("delivered_channels", ARRAY(sa.String(20)), nullable=False, server_default="{}"),
+    )
+    op.drop_constraint("reminder_status_check", "reminders", type_="check")
+    op.create_check_constraint(
+        "reminder_status_check", "reminders",
+        "status IN ('pending', 'sending', 'sent', 'failed', 'cancelled')",
+    )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE reminders SET status = 'sent' WHERE status = 'cancelled'")
+    op.drop_constraint("reminder_status_check", "reminders", type_="check")
+    op.create_check_constraint(
+        "reminder_status_check", "reminders",
+        "status IN ('pending', 'sending', 'sent', 'failed')",
+    )
+    op.drop_column("reminders", "delivered_channels")
@@ -1,12 +1,13 @@
-from sqlalchemy import Column, String, Text, Boolean, Numeric, Date, DateTime, ForeignKey, CheckConstraint, Index
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Float, Identity, Integer, SmallInteger, String, Text, Boolean, Numeric, Date, DateTime, ForeignKey, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import uuid
 from .database import Base
 
 class LawFirm(Base):
     __tablename__ = "law_firms"
+    __audited__ = True  # criações, alterações e remoções vão para audit_log
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
@@ -24,6 +25,8 @@ class LawFirm(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __audited__ = True  # criações, alterações e remoções vão para audit_log
+    __audit_exclude__ = ("password_hash",)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id"), nullable=False)
@@ -38,6 +41,7 @@ class User(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("role IN ('admin', 'lawyer', 'assistant')", name="role_check"),
+        Index("idx_users_law_firm_id", "law_firm_id"),
     )
 
     # Relationships
@@ -49,6 +53,8 @@ class User(Base):
 
 class Client(Base):
     __tablename__ = "clients"
+    __versioned__ = "clients"  # escritas incrementam entity_versions (ETags)
+    __audited__ = True
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id"), nullable=False)
@@ -66,6 +72,9 @@ class Client(Base):
     __table_args__ = (
         CheckConstraint("type IN ('pf', 'pj')", name="client_type_check"),
         Index("idx_client_document", "document"),
+        Index("idx_clients_law_firm_name", "law_firm_id", "name"),
+        Index("idx_clients_law_firm_document", "law_firm_id", "document"),
+        Index("idx_clients_law_firm_updated", "law_firm_id", "updated_at", "id"),
     )
 
     # Relationships
@@ -74,6 +83,9 @@ class Client(Base):
 
 class Case(Base):
     __tablename__ = "cases"
+    __versioned__ = "cases"  # escritas incrementam entity_versions (ETags)
+    __audited__ = True
+    __searchable__ = ("case_number", "description")  # indexadas em search_documents
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id"), nullable=False)
@@ -105,6 +117,7 @@ class Case(Base):
     __table_args__ = (
         Index("idx_cases_client_id", "client_id"),
         Index("idx_cases_law_firm_id", "law_firm_id"),
+        Index("idx_cases_law_firm_updated", "law_firm_id", "updated_at", "id"),
     )
 
 class CaseParty(Base):
@@ -116,11 +129,16 @@ class CaseParty(Base):
     role = Column(String(50))  # autor, réu, terceiro
     document = Column(String(20))
 
+    __table_args__ = (
+        Index("idx_case_parties_case_id", "case_id"),
+    )
+
     # Relationships
     case = relationship("Case", back_populates="case_parties")
 
 class CaseMovement(Base):
     __tablename__ = "case_movements"
+    __searchable__ = ("description",)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id"), nullable=False)
@@ -128,11 +146,17 @@ class CaseMovement(Base):
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_case_movements_case_id", "case_id", "movement_date"),
+    )
+
     # Relationships
     case = relationship("Case", back_populates="case_movements")
 
 class Task(Base):
     __tablename__ = "tasks"
+    __versioned__ = "tasks"  # escritas incrementam entity_versions (ETags)
+    __audited__ = True
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id"), nullable=False)
@@ -143,11 +167,14 @@ class Task(Base):
     due_date = Column(Date)
     status = Column(String(30), default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'done', 'late')", name="task_status_check"),
         Index("idx_tasks_due_date", "due_date"),
+        Index("idx_tasks_law_firm_id", "law_firm_id"),
+        Index("idx_tasks_law_firm_updated", "law_firm_id", "updated_at", "id"),
     )
 
     # Relationships
@@ -165,19 +192,34 @@ class Hearing(Base):
     location = Column(String(255))
     notes = Column(Text)
 
+    __table_args__ = (
+        Index("idx_hearings_case_id", "case_id"),
+        Index("idx_hearings_hearing_date", "hearing_date"),
+    )
+
     # Relationships
     case = relationship("Case", back_populates="hearings")
 
 class Document(Base):
     __tablename__ = "documents"
+    __searchable__ = ("file_name", "extracted_text")
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id"), nullable=False)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     file_name = Column(String(255), nullable=False)
     file_url = Column(Text, nullable=False)
+    content_hash = Column(String(64))  # sha256 do conteúdo = chave no BlobStore
+    size = Column(BigInteger)
+    content_type = Column(String(255))
+    extracted_text = deferred(Column(Text))  # preenchido pelo pipeline de extração (app.extraction)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_documents_case_id", "case_id"),
+        Index("idx_documents_content_hash", "content_hash"),
+    )
+
     # Relationships
     case = relationship("Case", back_populates="documents")
     uploaded_by_user = relationship("User", back_populates="documents_uploaded")
@@ -196,6 +238,7 @@ class FinancialRecord(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("type IN ('fee', 'payment')", name="financial_type_check"),
+        Index("idx_financial_records_case_id", "case_id"),
     )
 
     # Relationships
@@ -203,6 +246,7 @@ class FinancialRecord(Base):
 
 class Note(Base):
     __tablename__ = "notes"
+    __searchable__ = ("content",)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id"), nullable=False)
@@ -210,6 +254,214 @@ class Note(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("idx_notes_case_id", "case_id"),
+    )
+
     # Relationships
     case = relationship("Case", back_populates="notes")
-    user = relationship("User", back_populates="notes")
\ No newline at end of file
+    user = relationship("User", back_populates="notes")
+
+class EntityVersion(Base):
+    """Contador de versão por escritório e entidade, usado nos ETags das listas."""
+    __tablename__ = "entity_versions"
+
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id"), primary_key=True)
+    entity = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+
+class SyncTombstone(Base):
+    """Registro de remoção de clients/cases/tasks, para o /sync incremental."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    law_firm_id = Column(UUID(as_uuid=True), nullable=False)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_sync_tombstones_law_firm_deleted", "law_firm_id", "deleted_at", "id"),
+    )
+
+class AuditLog(Base):
+    """Registro append-only das alterações; o id serve de cursor para /changes."""
+    __tablename__ = "audit_log"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    law_firm_id = Column(UUID(as_uuid=True), nullable=False)  # sem FK: o log sobrevive a remoções
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    action = Column(String(10), nullable=False)
+    changes = Column(JSONB, nullable=False)
+    user_id = Column(UUID(as_uuid=True))
+    request_id = Column(String(128))
+    created_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("action IN ('create', 'update', 'delete')", name="audit_action_check"),
+        Index("idx_audit_log_law_firm_id", "law_firm_id", "id"),
+    )
+
+class Blob(Base):
+    """Conteúdo armazenado no BlobStore, compartilhado pelos documentos com o mesmo hash."""
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True)  # sha256 = chave no BlobStore
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(255))
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("idx_blobs_unreferenced", "updated_at", postgresql_where=ref_count <= 0),
+    )
+
+class SearchDocument(Base):
+    """Texto indexado para a busca textual, uma linha por entidade com `__searchable__`."""
+    __tablename__ = "search_documents"
+
+    entity = Column(String(50), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), primary_key=True)
+    law_firm_id = Column(UUID(as_uuid=True), nullable=False)
+    case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    content = Column(Text, nullable=False)  # cópia do texto, usada nos trechos (ts_headline)
+    search_vector = Column(TSVECTOR, nullable=False)
+    source_updated_at = Column(DateTime(timezone=True))  # updated_at da origem quando indexada
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # btree_gin: o filtro por escritório e a busca usam o mesmo índice
+        Index("idx_search_documents_firm_vector", "law_firm_id", "search_vector", postgresql_using="gin"),
+        Index("idx_search_documents_case_id", "case_id"),
+    )
+
+class DocumentExtraction(Base):
+    """Fila de extração de texto dos documentos enviados (app.extraction)."""
+    __tablename__ = "document_extractions"
+
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True))
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'skipped', 'failed')", name="extraction_status_check"
+        ),
+        Index("idx_document_extractions_queue", "run_after",
+              postgresql_where=status.in_(["pending", "running"])),
+    )
+
+class Job(Base):
+    """Job da fila genérica em Postgres (app.jobs)."""
+    __tablename__ = "jobs"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    queue = Column(String(50), nullable=False, default="default")
+    name = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued")
+    priority = Column(SmallInteger, nullable=False, default=0)  # maior sai primeiro
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(DateTime(timezone=True))  # visibilidade: passado este prazo o job volta à fila
+    locked_by = Column(String(100))
+    progress = Column(Float, nullable=False, default=0)
+    message = Column(Text)
+    result = Column(JSONB)
+    error = Column(Text)
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id", ondelete="CASCADE"))
+    created_by = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')", name="job_status_check"
+        ),
+        Index("idx_jobs_dequeue", "queue", priority.desc(), "run_after",
+              postgresql_where=status.in_(["queued", "running"])),
+        Index("idx_jobs_law_firm_id", "law_firm_id", "id"),
+    )
+
+class Reminder(Base):
+    """Lembrete de audiência ou prazo; idempotency_key impede envios duplicados (app.reminders)."""
+    __tablename__ = "reminders"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    idempotency_key = Column(String(200), nullable=False, unique=True)
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(20), nullable=False)  # hearing, task
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    title = Column(String(255), nullable=False)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)  # quando o lembrete passou a valer
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Canais que já entregaram o lembrete: uma nova tentativa só usa os demais
+    delivered_channels = Column(ARRAY(String(20)), nullable=False, server_default="{}")
+    locked_until = Column(DateTime(timezone=True))
+    sent_at = Column(DateTime(timezone=True))
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'sending', 'sent', 'failed', 'cancelled')", name="reminder_status_check"),
+        Index("idx_reminders_dispatch", "scheduled_at", postgresql_where=status.in_(["pending", "sending"])),
+    )
+
+class Notification(Base):
+    """Caixa de entrada do usuário no app."""
+    __tablename__ = "notifications"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey("law_firms.id", ondelete="CASCADE"), nullable=False)
+    reminder_id = Column(BigInteger, ForeignKey("reminders.id", ondelete="SET NULL"), unique=True)
+    title = Column(String(255), nullable=False)
+    body = Column(Text)
+    data = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    read_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("idx_notifications_user_id", "user_id", "id"),
+    )
+
+class RefreshToken(Base):
+    """Refresh token opaco (só o hash é guardado); cada uso gera outro na mesma família."""
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(String(64), primary_key=True)  # sha256 do token
+    family_id = Column(UUID(as_uuid=True), nullable=False)  # login que originou a cadeia de rotações
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))  # rotacionado; um novo uso indica roubo
+    revoked_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_refresh_tokens_family_id", "family_id"),
+        Index("idx_refresh_tokens_expires_at", "expires_at"),
+    )
+
+class RevokedToken(Base):
+    """Denylist de tokens de acesso (jti) e famílias revogadas, replicada na memória dos workers."""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # depois disso o token expirou de qualquer forma
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_revoked_tokens_created_at", "created_at"),
+    )
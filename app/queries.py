@@ -0,0 +1,87 @@
+"""
+Consultas das rotas mais frequentes, como lambda statements.
+
+Um lambda_stmt é analisado uma única vez: nas chamadas seguintes o
+SQLAlchemy reaproveita a construção, a cache key e o SQL compilado, e só
+extrai os novos valores dos parâmetros. Isso evita reconstruir a cadeia
+db.query(...).filter(...) e recalcular a cache key a cada requisição.
+"""
+from typing import List, Optional
+import uuid
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def get_active_user(db: Session, user_id) -> Optional[models.User]:
+    """Usuário ativo pelo id (get_current_user)."""
+    stmt = lambda_stmt(
+        lambda: select(models.User)
+        .where(models.User.id == user_id, models.User.is_active == True)
+        .limit(1)
+    )
+    return db.execute(stmt).scalars().first()
+
+
+def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    """Usuário pelo email (login)."""
+    stmt = lambda_stmt(
+        lambda: select(models.User).where(models.User.email == email).limit(1)
+    )
+    return db.execute(stmt).scalars().first()
+
+
+def get_client_in_firm(db: Session, client_id: uuid.UUID, law_firm_id: uuid.UUID) -> Optional[models.Client]:
+    """Cliente do escritório (create_case, update/delete de cliente)."""
+    stmt = lambda_stmt(
+        lambda: select(models.Client)
+        .where(models.Client.id == client_id, models.Client.law_firm_id == law_firm_id)
+        .limit(1)
+    )
+    return db.execute(stmt).scalars().first()
+
+
+def list_clients(
+    db: Session,
+    law_firm_id: uuid.UUID,
+    skip: int,
+    limit: int,
+    search: Optional[str] = None,
+) -> List[models.Client]:
+    """Clientes do escritório, com busca opcional por nome, documento ou email."""
+    stmt = lambda_stmt(
+        lambda: select(models.Client).where(models.Client.law_firm_id == law_firm_id)
+    )
+    if search:
+        pattern = f"%{search}%"
+        stmt += lambda s: s.where(
+            models.Client.name.ilike(pattern) |
+            models.Client.document.ilike(pattern) |
+            models.Client.email.ilike(pattern)
+        )
+    stmt += lambda s: s.order_by(models.Client.name).offset(skip).limit(limit)
+    return db.execute(stmt).scalars().all()
+
+
+def list_cases(db: Session, law_firm_id: uuid.UUID, skip: int, limit: int) -> List[models.Case]:
+    """Processos do escritório."""
+    stmt = lambda_stmt(
+        lambda: select(models.Case)
+        .where(models.Case.law_firm_id == law_firm_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def list_tasks(db: Session, law_firm_id: uuid.UUID, skip: int, limit: int) -> List[models.Task]:
+    """Tarefas do escritório."""
+    stmt = lambda_stmt(
+        lambda: select(models.Task)
+        .where(models.Task.law_firm_id == law_firm_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
@@ -0,0 +1,474 @@
+"""
+Lembretes de audiências e prazos de tarefas.
+
+Uso:
+    python -m app.reminders [--once]
+
+A cada REMINDER_INTERVAL_SECONDS:
+
+1. scan(): consultas por intervalo (índices em hearings.hearing_date e
+   tasks.due_date) encontram audiências e tarefas cujo lembrete já vale e
+   gravam um registro em reminders. A idempotency_key (entidade, data do
+   evento e antecedência) é única: vários processos podem varrer ao mesmo
+   tempo sem duplicar lembretes, e uma audiência remarcada gera outro.
+2. dispatch(): retira lembretes pendentes com FOR UPDATE SKIP LOCKED,
+   cancela os que ficaram obsoletos (audiência remarcada ou removida,
+   tarefa concluída, removida ou com outro vencimento), agrupa por usuário
+   e envia os resumos pelos canais de REMINDER_CHANNELS (inbox, smtp,
+   webhook). Cada canal registra em delivered_channels os lembretes que
+   entregou, na mesma transação da caixa de entrada: uma falha só faz
+   reenviar os resumos que falharam, e só pelos canais que falharam. SMTP
+   e webhook continuam "pelo menos uma vez" - o webhook recebe as
+   idempotency_keys para descartar repetições.
+
+O atraso entre o lembrete passar a valer e ser enviado é medido em
+reminder_dispatch_lag_seconds (p99 via histogram_quantile).
+"""
+import argparse
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from email.message import EmailMessage
+import hashlib
+import hmac
+import json
+import logging
+import signal
+import smtplib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import urllib.request
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import BigInteger, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from .config import settings
+from .core import log, metrics
+from . import models
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_SCHEDULED = metrics.registry.counter(
+    "reminders_scheduled_total", "Lembretes criados pela varredura", ("kind",)
+)
+REMINDERS_SENT = metrics.registry.counter(
+    "reminders_sent_total", "Resumos de lembretes enviados por canal e resultado", ("channel", "result")
+)
+REMINDERS_CANCELLED = metrics.registry.counter(
+    "reminders_cancelled_total", "Lembretes cancelados porque o evento mudou antes do envio", ("kind",)
+)
+REMINDER_LAG = metrics.registry.histogram(
+    "reminder_dispatch_lag_seconds", "Atraso entre o lembrete passar a valer e ser enviado",
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 90.0, 120.0, 300.0, 600.0, 1800.0, 3600.0),
+)
+
+LEASE_SECONDS = 300  # lembrete "sending" cujo processo morreu volta a ser enviado
+
+CLAIM = text("""
+    UPDATE reminders SET status = 'sending', attempts = attempts + 1,
+        locked_until = now() + make_interval(secs => :lease)
+    WHERE id IN (
+        SELECT id FROM reminders
+        WHERE scheduled_at <= now()
+          AND (status = 'pending' OR (status = 'sending' AND locked_until < now()))
+        ORDER BY scheduled_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, idempotency_key, law_firm_id, user_id, kind, entity_id, title, due_at, scheduled_at,
+        attempts, delivered_channels
+""")
+DELIVERED = text("""
+    UPDATE reminders SET delivered_channels = array_append(delivered_channels, :channel)
+    WHERE id = ANY(:ids) AND NOT (:channel = ANY(delivered_channels))
+""").bindparams(bindparam("ids", type_=ARRAY(BigInteger)))
+SENT = text("""
+    UPDATE reminders SET status = 'sent', sent_at = now(), locked_until = NULL, error = NULL
+    WHERE id = ANY(:ids) AND status = 'sending'
+""").bindparams(bindparam("ids", type_=ARRAY(BigInteger)))
+CANCEL = text("""
+    UPDATE reminders SET status = 'cancelled', locked_until = NULL, error = :reason
+    WHERE id = ANY(:ids) AND status = 'sending'
+""").bindparams(bindparam("ids", type_=ARRAY(BigInteger)))
+RETRY = text("""
+    UPDATE reminders
+    SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'sending' END,
+        locked_until = now() + make_interval(secs => :delay), error = :error
+    WHERE id = ANY(:ids) AND status = 'sending'
+""").bindparams(bindparam("ids", type_=ARRAY(BigInteger)))
+
+
+def _tz() -> ZoneInfo:
+    return ZoneInfo(settings.REMINDER_TIMEZONE)
+
+
+def _format(moment: datetime) -> str:
+    return moment.astimezone(_tz()).strftime("%d/%m/%Y %H:%M")
+
+
+# --- Varredura ---
+
+def _hearing_reminders(db, now: datetime) -> List[dict]:
+    leads = settings.REMINDER_HEARING_LEADS
+    if not leads:
+        return []
+    rows = db.execute(
+        select(models.Hearing.id, models.Hearing.hearing_date, models.Hearing.type,
+               models.Case.law_firm_id, models.Case.responsible_lawyer_id, models.Case.case_number)
+        .join(models.Case, models.Case.id == models.Hearing.case_id)
+        .where(
+            models.Hearing.hearing_date > now,
+            models.Hearing.hearing_date <= now + timedelta(seconds=leads[0]),
+            models.Case.responsible_lawyer_id.isnot(None),
+        )
+    ).all()
+    reminders = []
+    for row in rows:
+        # Só a menor antecedência que já vale: uma audiência marcada para
+        # daqui a 1h recebe o lembrete de 2h, não o de 24h também
+        lead = next(lead for lead in reversed(leads) if row.hearing_date - timedelta(seconds=lead) <= now)
+        title = "Audiência" + (f" ({row.type})" if row.type else "")
+        if row.case_number:
+            title += f" - processo {row.case_number}"
+        reminders.append({
+            "idempotency_key": f"hearing:{row.id}:{int(row.hearing_date.timestamp())}:{lead / 3600:g}h",
+            "law_firm_id": row.law_firm_id,
+            "user_id": row.responsible_lawyer_id,
+            "kind": "hearing",
+            "entity_id": row.id,
+            "title": title[:255],
+            "due_at": row.hearing_date,
+            "scheduled_at": row.hearing_date - timedelta(seconds=lead),
+        })
+    return reminders
+
+
+def _task_reminders(db, now: datetime) -> List[dict]:
+    leads = settings.REMINDER_TASK_LEADS
+    if not leads:
+        return []
+    tz = _tz()
+    today = now.astimezone(tz).date()
+
+    def scheduled(due: date, days: int) -> datetime:
+        return datetime.combine(due - timedelta(days=days), dtime(settings.REMINDER_TASK_HOUR), tz)
+
+    rows = db.execute(
+        select(models.Task.id, models.Task.title, models.Task.due_date,
+               models.Task.law_firm_id, models.Task.assigned_to)
+        .where(
+            models.Task.due_date >= today,
+            models.Task.due_date <= today + timedelta(days=leads[0]),
+            models.Task.status != "done",
+            models.Task.assigned_to.isnot(None),
+        )
+    ).all()
+    reminders = []
+    for row in rows:
+        days = next((days for days in reversed(leads) if scheduled(row.due_date, days) <= now), None)
+        if days is None:
+            continue
+        reminders.append({
+            "idempotency_key": f"task:{row.id}:{row.due_date.isoformat()}:{days}d",
+            "law_firm_id": row.law_firm_id,
+            "user_id": row.assigned_to,
+            "kind": "task",
+            "entity_id": row.id,
+            "title": f"Prazo: {row.title}"[:255],
+            "due_at": datetime.combine(row.due_date, dtime(0), tz),
+            "scheduled_at": scheduled(row.due_date, days),
+        })
+    return reminders
+
+
+def scan(db, now: Optional[datetime] = None) -> int:
+    """Cria os lembretes que passaram a valer. Retorna quantos são novos."""
+    now = now or db.execute(select(func.now())).scalar()
+    created = 0
+    for kind, reminders in (("hearing", _hearing_reminders(db, now)), ("task", _task_reminders(db, now))):
+        if not reminders:
+            continue
+        result = db.execute(
+            insert(models.Reminder).values(reminders)
+            .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        )
+        REMINDERS_SCHEDULED.inc((kind,), amount=result.rowcount)
+        created += result.rowcount
+    db.commit()
+    return created
+
+
+# --- Canais ---
+
+@dataclass
+class Digest:
+    """Lembretes de um usuário enviados juntos."""
+    user: models.User
+    reminders: List = field(default_factory=list)
+
+    def lines(self) -> List[str]:
+        return [f"- {r.title}: {_format(r.due_at)}" for r in sorted(self.reminders, key=lambda r: r.due_at)]
+
+
+Failures = List[Tuple[Digest, Exception]]
+
+
+class Channel:
+    name = ""
+
+    def send(self, db, digests: List[Digest]) -> Failures:
+        """
+        Envia um lote e retorna os resumos que falharam. Uma exceção vale
+        para o lote inteiro.
+        """
+        raise NotImplementedError
+
+
+class InboxChannel(Channel):
+    """Tabela notifications, gravada na transação que marca o envio."""
+    name = "inbox"
+
+    def send(self, db, digests: List[Digest]) -> Failures:
+        rows = [
+            {
+                "user_id": r.user_id,
+                "law_firm_id": r.law_firm_id,
+                "reminder_id": r.id,
+                "title": r.title,
+                "body": f"{'Audiência' if r.kind == 'hearing' else 'Vencimento'} em {_format(r.due_at)}",
+                "data": {"kind": r.kind, "entity_id": str(r.entity_id), "due_at": r.due_at.isoformat()},
+            }
+            for digest in digests for r in digest.reminders
+        ]
+        if rows:
+            db.execute(
+                insert(models.Notification).values(rows)
+                .on_conflict_do_nothing(index_elements=["reminder_id"])
+            )
+        return []
+
+
+class SmtpChannel(Channel):
+    """Um e-mail por usuário, todos na mesma conexão SMTP."""
+    name = "smtp"
+
+    def send(self, db, digests: List[Digest]) -> Failures:
+        failures = []
+        with smtplib.SMTP(settings.REMINDER_SMTP_HOST, settings.REMINDER_SMTP_PORT, timeout=10) as smtp:
+            for i, digest in enumerate(digests):
+                if not digest.user.email:
+                    continue
+                message = EmailMessage()
+                message["From"] = settings.REMINDER_SMTP_FROM
+                message["To"] = digest.user.email
+                count = len(digest.reminders)
+                message["Subject"] = f"{count} lembrete{'s' if count > 1 else ''} de prazos e audiências"
+                message.set_content(f"Olá, {digest.user.name}.\n\n" + "\n".join(digest.lines()) + "\n")
+                try:
+                    smtp.send_message(message)
+                except smtplib.SMTPServerDisconnected as e:
+                    # Conexão perdida: este e os seguintes não foram enviados
+                    return failures + [(pending, e) for pending in digests[i:]]
+                except smtplib.SMTPException as e:
+                    failures.append((digest, e))
+        return failures
+
+
+class WebhookChannel(Channel):
+    """Um POST JSON por lote, assinado com HMAC-SHA256 se houver segredo."""
+    name = "webhook"
+
+    def send(self, db, digests: List[Digest]) -> Failures:
+        if not settings.REMINDER_WEBHOOK_URL:
+            raise RuntimeError("REMINDER_WEBHOOK_URL não configurada")
+        body = json.dumps({"digests": [
+            {
+                "user_id": str(digest.user.id),
+                "email": digest.user.email,
+                "reminders": [
+                    {
+                        "idempotency_key": r.idempotency_key,
+                        "kind": r.kind,
+                        "entity_id": str(r.entity_id),
+                        "title": r.title,
+                        "due_at": r.due_at.isoformat(),
+                    }
+                    for r in digest.reminders
+                ],
+            }
+            for digest in digests
+        ]}).encode()
+        request = urllib.request.Request(settings.REMINDER_WEBHOOK_URL, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        if settings.REMINDER_WEBHOOK_SECRET:
+            signature = hmac.new(settings.REMINDER_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+            request.add_header("X-Signature", f"sha256={signature}")
+        with urllib.request.urlopen(request, timeout=10):
+            pass  # status >= 400 levanta HTTPError
+        return []
+
+
+CHANNELS = {"inbox": InboxChannel, "smtp": SmtpChannel, "webhook": WebhookChannel}
+
+
+def create_channels() -> List[Channel]:
+    try:
+        return [CHANNELS[name]() for name in settings.REMINDER_CHANNEL_NAMES]
+    except KeyError as e:
+        raise RuntimeError(f"Canal de lembretes desconhecido: {e.args[0]}")
+
+
+# --- Envio ---
+
+def _stale(db, reminders) -> Dict[int, str]:
+    """Lembretes cujo evento mudou depois da varredura: id -> motivo."""
+    tz = _tz()
+    hearing_ids = {r.entity_id for r in reminders if r.kind == "hearing"}
+    task_ids = {r.entity_id for r in reminders if r.kind == "task"}
+    hearings = {}
+    if hearing_ids:
+        hearings = dict(db.execute(
+            select(models.Hearing.id, models.Hearing.hearing_date).where(models.Hearing.id.in_(hearing_ids))
+        ).all())
+    tasks = {}
+    if task_ids:
+        tasks = {
+            row.id: row
+            for row in db.execute(
+                select(models.Task.id, models.Task.due_date, models.Task.status).where(models.Task.id.in_(task_ids))
+            )
+        }
+
+    stale = {}
+    for r in reminders:
+        if r.kind == "hearing":
+            hearing_date = hearings.get(r.entity_id)
+            if hearing_date is None:
+                stale[r.id] = "audiência removida"
+            elif hearing_date != r.due_at:
+                # A varredura já criou (ou vai criar) o lembrete da nova data
+                stale[r.id] = "audiência remarcada"
+        elif r.kind == "task":
+            task = tasks.get(r.entity_id)
+            if task is None:
+                stale[r.id] = "tarefa removida"
+            elif task.status == "done":
+                stale[r.id] = "tarefa concluída"
+            elif datetime.combine(task.due_date, dtime(0), tz) != r.due_at:
+                stale[r.id] = "vencimento alterado"
+    return stale
+
+
+def dispatch(session_factory, channels: List[Channel], limit: int = 500) -> int:
+    """Envia um lote de lembretes pendentes. Retorna quantos foram retirados."""
+    with session_factory() as db:
+        reminders = db.execute(CLAIM, {"lease": LEASE_SECONDS, "limit": limit}).all()
+        db.commit()
+    if not reminders:
+        return 0
+
+    with session_factory() as db:
+        stale = _stale(db, reminders)
+        for reason in set(stale.values()):
+            db.execute(CANCEL, {"ids": [reminder_id for reminder_id, r in stale.items() if r == reason], "reason": reason})
+        for r in reminders:
+            if r.id in stale:
+                REMINDERS_CANCELLED.inc((r.kind,))
+        db.commit()
+
+        users = {
+            user.id: user
+            for user in db.query(models.User).filter(models.User.id.in_({r.user_id for r in reminders}))
+        }
+        digests: Dict = {}
+        for r in reminders:
+            user = users.get(r.user_id)
+            if r.id in stale or user is None or not user.is_active:
+                continue
+            digests.setdefault(user.id, Digest(user)).reminders.append(r)
+
+        errors: Dict[int, str] = {}  # id -> erro do último canal que falhou
+        for channel in channels:
+            # Só o que este canal ainda não entregou (tentativas anteriores)
+            targets = []
+            for digest in digests.values():
+                pending = [r for r in digest.reminders if channel.name not in (r.delivered_channels or ())]
+                if pending:
+                    targets.append(Digest(digest.user, pending))
+            if not targets:
+                continue
+            try:
+                failures = channel.send(db, targets)
+            except Exception as e:
+                db.rollback()
+                failures = [(digest, e) for digest in targets]
+            failed = set()
+            for digest, e in failures:
+                for r in digest.reminders:
+                    failed.add(r.id)
+                    errors[r.id] = f"{channel.name}: {type(e).__name__}: {e}"
+            delivered = [r.id for digest in targets for r in digest.reminders if r.id not in failed]
+            if delivered:
+                db.execute(DELIVERED, {"ids": delivered, "channel": channel.name})
+            db.commit()
+            REMINDERS_SENT.inc((channel.name, "ok"), amount=len(targets) - len(failures))
+            if failures:
+                REMINDERS_SENT.inc((channel.name, "error"), amount=len(failures))
+
+        done = [r for r in reminders if r.id not in stale and r.id not in errors]
+        if done:
+            db.execute(SENT, {"ids": [r.id for r in done]})
+        if errors:
+            attempts = max(r.attempts for r in reminders if r.id in errors)
+            delay = min(3600, 30 * 2 ** (attempts - 1))
+            logger.error(f"Falha ao enviar {len(errors)} de {len(reminders)} lembretes (tentativa {attempts})")
+            for error in set(errors.values()):
+                db.execute(RETRY, {"ids": [reminder_id for reminder_id, e in errors.items() if e == error], "error": error,
+                                   "delay": delay, "max_attempts": settings.REMINDER_MAX_ATTEMPTS})
+        db.commit()
+
+    now = datetime.now(timezone.utc)
+    for r in done:
+        REMINDER_LAG.observe((), (now - r.scheduled_at).total_seconds())
+    return len(reminders)
+
+
+def run(session_factory, stop: threading.Event, once: bool = False) -> None:
+    channels = create_channels()
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            with session_factory() as db:
+                scan(db)
+            while dispatch(session_factory, channels, settings.REMINDER_BATCH_SIZE) == settings.REMINDER_BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.error(f"Falha no ciclo de lembretes: {e}")
+        if once:
+            return
+        stop.wait(max(0.0, settings.REMINDER_INTERVAL_SECONDS - (time.monotonic() - started)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Varredura e envio de lembretes de audiências e prazos")
+    parser.add_argument("--once", action="store_true", help="Executa um ciclo e sai")
+    args = parser.parse_args()
+
+    log.configure()
+    from .database import SessionLocal, install
+
+    install(background=False)
+
+    if settings.REMINDER_METRICS_PORT:
+        metrics.start_http_server(settings.REMINDER_METRICS_PORT)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        run(SessionLocal, stop, once=args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -169,6 +169,7 @@ class TaskInDB(TaskBase):
     id: uuid.UUID
     law_firm_id: uuid.UUID
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
 # Hearing
 class HearingBase(BaseSchema):
@@ -193,9 +194,18 @@ class DocumentBase(BaseSchema):
 class DocumentCreate(DocumentBase):
     pass
 
+class DocumentLink(BaseModel):
+    """Anexa um conteúdo já armazenado pelo escritório, sem reenviar o arquivo."""
+    case_id: uuid.UUID
+    content_hash: str = Field(..., pattern=r"^[0-9a-f]{64}$", description="SHA-256 do conteúdo (hex)")
+    file_name: str = Field(..., max_length=255)
+
 class DocumentInDB(DocumentBase):
     id: uuid.UUID
     uploaded_by: Optional[uuid.UUID]
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
+    content_type: Optional[str] = None
     created_at: datetime
 
 # Financial Record
@@ -248,4 +258,73 @@ class CaseWithRelations(CaseInDB):
     notes: List[NoteInDB] = []
 
 class UserWithRelations(UserInDB):
-    law_firm: Optional[LawFirmInDB] = None
\ No newline at end of file
+    law_firm: Optional[LawFirmInDB] = None
+
+# Feed de alterações
+class ChangeInDB(BaseSchema):
+    id: int
+    entity: str
+    entity_id: uuid.UUID
+    action: str
+    changes: dict
+    user_id: Optional[uuid.UUID] = None
+    request_id: Optional[str] = None
+    created_at: datetime
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeInDB]
+    next: str  # cursor para o próximo ?since=
+    has_more: bool
+
+# Sincronização incremental
+class SyncDeleted(BaseSchema):
+    entity: str
+    entity_id: uuid.UUID
+    deleted_at: datetime
+
+class SyncResponse(BaseModel):
+    clients: List[ClientInDB] = []
+    cases: List[CaseInDB] = []
+    tasks: List[TaskInDB] = []
+    deleted: List[SyncDeleted] = []
+    next: str  # watermark para o próximo ?since=
+    has_more: bool
+
+# Busca textual
+class SearchHit(BaseSchema):
+    entity: str  # cases, notes, case_movements, documents
+    entity_id: uuid.UUID
+    case_id: uuid.UUID
+    rank: float
+    snippet: str  # trecho com os termos entre <b></b>
+
+# Fila de jobs
+class JobInDB(BaseSchema):
+    id: int
+    queue: str
+    name: str
+    status: str  # queued, running, succeeded, failed, cancelled
+    progress: float
+    message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# Notifications
+class NotificationInDB(BaseSchema):
+    id: int
+    title: str
+    body: Optional[str] = None
+    data: dict
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+# Profiling
+class ProfilingStart(BaseModel):
+    sample_rate: float = Field(1.0, gt=0, le=1)
+    route: Optional[str] = None  # template da rota, ex. /api/v1/clients/{client_id}
+    duration_seconds: Optional[float] = Field(None, gt=0)
@@ -0,0 +1,75 @@
+"""
+Perfil de startup: mede o tempo de import de cada módulo e o tempo
+até a aplicação estar construída.
+
+Uso:
+    python -m app.startup_profile [--top 25] [--module app.main]
+
+Executa o import em um processo limpo com `python -X importtime`,
+para que módulos já carregados neste processo não escondam o custo.
+"""
+import argparse
+import subprocess
+import sys
+
+SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(f'__ready_ms__ {{(time.perf_counter() - t) * 1000:.1f}}')"
+)
+
+
+def parse_importtime(stderr: str) -> list:
+    """Converte a saída de -X importtime em (self_us, cumulative_us, módulo)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        rows.append((self_us, cumulative_us, fields[2].strip()))
+    return rows
+
+
+def profile(module: str) -> tuple:
+    """Importa `module` em um subprocesso e retorna (linhas, tempo total em ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(module=module)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    ready_ms = None
+    for line in result.stdout.splitlines():
+        if line.startswith("__ready_ms__"):
+            ready_ms = float(line.split()[1])
+    return parse_importtime(result.stderr), ready_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.startup_profile")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows, ready_ms = profile(args.module)
+
+    print(f"Import de {args.module}: {ready_ms:.1f} ms ({len(rows)} módulos)\n")
+
+    print(f"{'cumulativo ms':>14} {'próprio ms':>11}  módulo")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>11.1f}  {name}")
+
+    print("\nMaiores custos próprios:")
+    for self_us, _, name in sorted(rows, key=lambda r: r[0], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>14.1f}  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark de emissão e validação de tokens JWT por algoritmo:
+chave passada como texto ao python-jose (parse a cada chamada, como
+antes) vs. objeto de chave construído uma vez (app.core.keys).
+
+As chaves são geradas em memória; os claims são os de um token de acesso
+real.
+
+Uso:
+    python -m benchmarks.bench_jwt [--iterations 2000]
+"""
+import argparse
+from datetime import datetime, timedelta
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk, jwt
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def _public_pem(private_key) -> str:
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+
+
+def key_material() -> dict:
+    """(chave de assinatura, chave de verificação) em texto, por algoritmo."""
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    secret = uuid.uuid4().hex * 2
+    return {
+        "HS256": (secret, secret),
+        "ES256": (_pem(ec_key), _public_pem(ec_key)),
+        "RS256": (_pem(rsa_key), _public_pem(rsa_key)),
+    }
+
+
+def claims() -> dict:
+    return {
+        "sub": str(uuid.uuid4()),
+        "law_firm_id": str(uuid.uuid4()),
+        "email": "bench@escritorio.com",
+        "name": "Benchmark",
+        "role": "lawyer",
+        "fam": str(uuid.uuid4()),
+        "jti": uuid.uuid4().hex,
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+
+
+def measure(fn, iterations: int) -> float:
+    """Operações por segundo."""
+    for _ in range(min(50, iterations)):  # aquece caches
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_jwt")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = claims()
+    print(f"{'algoritmo':<10} {'operação':<9} {'texto ops/s':>12} {'objeto ops/s':>13} {'ganho':>7}")
+    for algorithm, (signing_text, verifying_text) in key_material().items():
+        signing_key = jwk.construct(signing_text, algorithm)
+        verifying_key = jwk.construct(verifying_text, algorithm)
+        token = jwt.encode(payload, signing_key, algorithm=algorithm)
+
+        cases = {
+            "encode": (
+                lambda: jwt.encode(payload, signing_text, algorithm=algorithm),
+                lambda: jwt.encode(payload, signing_key, algorithm=algorithm),
+            ),
+            "decode": (
+                lambda: jwt.decode(token, verifying_text, algorithms=[algorithm]),
+                lambda: jwt.decode(token, verifying_key, algorithms=[algorithm]),
+            ),
+        }
+        for operation, (from_text, from_object) in cases.items():
+            before = measure(from_text, args.iterations)
+            after = measure(from_object, args.iterations)
+            print(f"{algorithm:<10} {operation:<9} {before:>12.0f} {after:>13.0f} {after / before:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
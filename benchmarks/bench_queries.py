@@ -0,0 +1,140 @@
+"""
+Micro-benchmark do overhead Python por requisição nas consultas quentes:
+cadeia db.query(...) reconstruída a cada chamada vs. lambda statements
+de app.queries.
+
+Usa SQLite em memória para que o tempo medido seja quase todo de
+construção, cache key, compilação e carregamento dos objetos ORM, e não
+de rede.
+
+Uso:
+    python -m benchmarks.bench_queries [--iterations 5000] [--clients 50]
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, queries
+
+
+@compiles(UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def setup(n_clients: int):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    # Só as tabelas usadas: as demais têm tipos exclusivos do Postgres (JSONB, ARRAY, TSVECTOR)
+    models.Base.metadata.create_all(engine, tables=[
+        models.LawFirm.__table__,
+        models.User.__table__,
+        models.Client.__table__,
+        models.Case.__table__,
+        models.Task.__table__,
+    ])
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    db = Session()
+    firm = models.LawFirm(id=uuid.uuid4(), name="Escritório Benchmark")
+    user = models.User(
+        id=uuid.uuid4(),
+        law_firm_id=firm.id,
+        name="Benchmark",
+        email="bench@escritorio.com",
+        password_hash="x",
+        role="admin",
+        is_active=True,
+    )
+    clients = [
+        models.Client(
+            id=uuid.uuid4(),
+            law_firm_id=firm.id,
+            type="pf",
+            name=f"Cliente {i:05d}",
+            document=f"{i:011d}",
+        )
+        for i in range(n_clients)
+    ]
+    db.add_all([firm, user, *clients])
+    db.commit()
+    db.close()
+    return Session, firm, user, clients[0]
+
+
+def legacy_paths(firm, user, client):
+    M = models
+    return {
+        "get_current_user": lambda db: db.query(M.User).filter(
+            M.User.id == user.id, M.User.is_active == True
+        ).first(),
+        "login (user by email)": lambda db: db.query(M.User).filter(
+            M.User.email == user.email
+        ).first(),
+        "create_case (client check)": lambda db: db.query(M.Client).filter(
+            M.Client.id == client.id, M.Client.law_firm_id == firm.id
+        ).first(),
+        "read_clients": lambda db: db.query(M.Client).filter(
+            M.Client.law_firm_id == firm.id
+        ).order_by(M.Client.name).offset(0).limit(20).all(),
+        "read_clients (search)": lambda db: db.query(M.Client).filter(
+            M.Client.law_firm_id == firm.id
+        ).filter(
+            M.Client.name.ilike("%01%") | M.Client.document.ilike("%01%") | M.Client.email.ilike("%01%")
+        ).order_by(M.Client.name).offset(0).limit(20).all(),
+    }
+
+
+def cached_paths(firm, user, client):
+    return {
+        "get_current_user": lambda db: queries.get_active_user(db, user.id),
+        "login (user by email)": lambda db: queries.get_user_by_email(db, user.email),
+        "create_case (client check)": lambda db: queries.get_client_in_firm(db, client.id, firm.id),
+        "read_clients": lambda db: queries.list_clients(db, firm.id, 0, 20),
+        "read_clients (search)": lambda db: queries.list_clients(db, firm.id, 0, 20, "01"),
+    }
+
+
+def measure(Session, fn, iterations: int) -> float:
+    """Tempo médio por chamada em microssegundos, sessão nova por chamada."""
+    for _ in range(50):  # aquece caches
+        db = Session()
+        fn(db)
+        db.close()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        db = Session()
+        fn(db)
+        db.close()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_queries")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+
+    Session, firm, user, client = setup(args.clients)
+    legacy = legacy_paths(firm, user, client)
+    cached = cached_paths(firm, user, client)
+
+    print(f"{'consulta':<28} {'db.query µs':>12} {'lambda µs':>10} {'ganho':>7}")
+    for name in legacy:
+        before = measure(Session, legacy[name], args.iterations)
+        after = measure(Session, cached[name], args.iterations)
+        print(f"{name:<28} {before:>12.1f} {after:>10.1f} {before / after:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Teste de carga dos caminhos quentes da API com concorrência fixa.
+
+Pré-requisitos: banco local populado por benchmarks.seed e a API rodando
+apontando para ele, por exemplo:
+    uvicorn app.main:app --workers 4
+
+Os limites de login contam só falhas, então o cenário login (sempre com
+senha correta) não recebe 429. Para medir sem o limite, suba a API com
+LOGIN_IP_LIMIT=0 LOGIN_EMAIL_LIMIT=0; atrás de um proxy reverso, configure
+TRUSTED_PROXIES para o limite por IP não juntar todos os clientes.
+
+Uso:
+    python -m benchmarks.loadtest --base-url http://localhost:8000 \
+        [--dataset benchmarks/dataset.json] [--concurrency 16] [--requests 500] \
+        [--scenarios login,list_clients,...] [--output results.json] \
+        [--baseline benchmarks/baseline.json] [--tolerance 0.2]
+
+Grava p50/p95/p99 e throughput de cada cenário em JSON. Com --baseline,
+compara com a execução de referência e termina com código 1 se algum
+cenário piorar além da tolerância.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+API = "/api/v1"
+
+
+class Client:
+    """Cliente HTTP mínimo (stdlib) com o token de um usuário."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.token = None
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple:
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, email: str, password: str) -> int:
+        status, payload = self.request("POST", f"{API}/auth/login", {"email": email, "password": password})
+        if status == 200:
+            self.token = json.loads(payload)["access_token"]
+        return status
+
+
+def _scenarios(dataset: dict) -> dict:
+    password = dataset["password"]
+    counter = itertools.count()
+
+    def login(client, firm, rng):
+        return client.login(rng.choice(firm["emails"]), password)
+
+    def list_clients(client, firm, rng):
+        return client.request("GET", f"{API}/clients/?limit=50")[0]
+
+    def search_clients(client, firm, rng):
+        return client.request("GET", f"{API}/clients/?search={rng.randint(0, 99):02d}&limit=50")[0]
+
+    def list_cases(client, firm, rng):
+        return client.request("GET", f"{API}/cases/?limit=50")[0]
+
+    def list_tasks(client, firm, rng):
+        return client.request("GET", f"{API}/tasks/?limit=50")[0]
+
+    def client_detail(client, firm, rng):
+        client_id = rng.choice(firm["client_ids"])
+        return client.request("GET", f"{API}/clients/{client_id}?include_cases=true")[0]
+
+    def create_client(client, firm, rng):
+        n = next(counter)
+        return client.request("POST", f"{API}/clients/", {
+            "type": "pf",
+            "name": f"Cliente Carga {n}",
+            "document": f"9{time.time_ns() % 10**10:010d}",
+        })[0]
+
+    def create_case(client, firm, rng):
+        return client.request("POST", f"{API}/cases/", {
+            "client_id": rng.choice(firm["client_ids"]),
+            "area": "cível",
+            "status": "em andamento",
+            "description": "Processo criado pelo teste de carga",
+        })[0]
+
+    return {
+        "login": login,
+        "list_clients": list_clients,
+        "search_clients": search_clients,
+        "list_cases": list_cases,
+        "list_tasks": list_tasks,
+        "client_detail": client_detail,
+        "create_client": create_client,
+        "create_case": create_case,
+    }
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Percentil por nearest-rank."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def run_scenario(name: str, fn, dataset: dict, base_url: str, concurrency: int,
+                 total: int, warmup: int) -> dict:
+    """Executa `total` requisições do cenário com `concurrency` threads."""
+    local = threading.local()
+    firms = dataset["firms"]
+
+    def worker_client():
+        if not hasattr(local, "client"):
+            local.rng = random.Random(threading.get_ident())
+            local.firm = local.rng.choice(firms)
+            local.client = Client(base_url)
+            local.client.login(local.rng.choice(local.firm["emails"]), dataset["password"])
+        return local.client, local.firm, local.rng
+
+    def one(_):
+        client, firm, rng = worker_client()
+        start = time.perf_counter()
+        status = fn(client, firm, rng)
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(warmup)))
+        start = time.perf_counter()
+        results = list(executor.map(one, range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for r in results if r[1] >= 400)
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Lista de regressões em relação à execução de referência."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {reference[metric]:.1f} -> {current[metric]:.1f}")
+        if current["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {reference['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} rps"
+            )
+        if current["errors"] > reference["errors"]:
+            regressions.append(f"{name}: erros {reference['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--dataset", default="benchmarks/dataset.json")
+    parser.add_argument("--scenarios", default="login,list_clients,search_clients,list_cases,list_tasks,client_detail,create_client,create_case")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requisições por cenário")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="JSON de referência para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(args.dataset) as f:
+        dataset = json.load(f)
+
+    available = _scenarios(dataset)
+    results = {"base_url": args.base_url, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "scenarios": {}}
+
+    print(f"{'cenário':<16} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for name in args.scenarios.split(","):
+        name = name.strip()
+        if name not in available:
+            parser.error(f"Cenário desconhecido: {name}")
+        stats = run_scenario(name, available[name], dataset, args.base_url,
+                             args.concurrency, args.requests, args.warmup)
+        results["scenarios"][name] = stats
+        print(f"{name:<16} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>6}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Sem regressões em relação ao baseline.")
+
+
+if __name__ == "__main__":
+    main()
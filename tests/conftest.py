@@ -0,0 +1,123 @@
+"""
+Fixtures dos testes: a API sobre SQLite em memória.
+
+Os tipos e funções do Postgres usados pelos modelos e pelo SQL das rotas
+testadas ganham equivalentes no SQLite. Rotas com SQL específico do
+Postgres (busca, listagens com ANY, filas com SKIP LOCKED) ficam fora
+destes testes. O lifespan não é executado: nada conecta ao DATABASE_URL.
+"""
+import datetime
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+
+# Antes de criar a aplicação: sem writer de auditoria nem NOTIFY
+settings.AUDIT_MODE = "off"
+settings.EVENTS_ENABLED = False
+
+from app import database, models  # noqa: E402
+from app.core import ratelimit  # noqa: E402
+from app.core.denylist import denylist  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.database.routing import RoutingSession  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "senha-de-teste"
+
+
+@compiles(UUID, "sqlite")
+def _uuid(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+@compiles(ARRAY, "sqlite")
+def _json(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector(type_, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint(type_, compiler, **kw):
+    # Só INTEGER PRIMARY KEY é autoincremento no SQLite
+    return "INTEGER"
+
+
+def _now() -> str:
+    return datetime.datetime.utcnow().isoformat(" ")
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("now", 0, _now)
+        dbapi_connection.create_function("clock_timestamp", 0, _now)
+        dbapi_connection.create_function("greatest", 2, max)
+        dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: None)
+
+    models.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(class_=RoutingSession, bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state(monkeypatch):
+    """Denylist e limites de login zerados a cada teste."""
+    monkeypatch.setattr(denylist, "_entries", {})
+    monkeypatch.setattr(denylist, "_expirations", [])
+    store = ratelimit.MemoryWindowStore()
+    for limiter in (ratelimit.login_ip_limiter, ratelimit.login_email_limiter):
+        monkeypatch.setattr(limiter, "store", store)
+        monkeypatch.setattr(limiter, "fallback", store)
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(session_factory) -> models.User:
+    with session_factory() as db:
+        firm = models.LawFirm(id=uuid.uuid4(), name="Escritório Teste")
+        user = models.User(
+            id=uuid.uuid4(),
+            law_firm_id=firm.id,
+            name="Ana",
+            email="ana@teste.com.br",
+            password_hash=get_password_hash(PASSWORD),
+            role="lawyer",
+            is_active=True,
+        )
+        db.add_all([firm, user])
+        db.commit()
+    return user
+
+
+def login(client, email: str = "ana@teste.com.br", password: str = PASSWORD):
+    return client.post(f"{settings.API_V1_STR}/auth/login", json={"email": email, "password": password})
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,110 @@
+"""Rotação de refresh tokens, detecção de reuso e propagação da denylist."""
+from datetime import timedelta
+import threading
+import time
+
+from app.config import settings
+from app.core import security
+from app.core.denylist import denylist
+from app.database.revocation import DenylistSync
+from app import models
+
+from .conftest import bearer, login
+
+AUTH = f"{settings.API_V1_STR}/auth"
+
+
+def verify(client, access_token: str) -> int:
+    return client.post(f"{AUTH}/verify-token", headers=bearer(access_token)).status_code
+
+
+def refresh(client, refresh_token: str):
+    return client.post(f"{AUTH}/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_both_tokens(client, user):
+    first = login(client).json()
+    response = refresh(client, first["refresh_token"])
+    assert response.status_code == 200
+    second = response.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert second["access_token"] != first["access_token"]
+    assert verify(client, second["access_token"]) == 200
+    # O refresh token seguinte da mesma família continua valendo
+    assert refresh(client, second["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_family(client, user):
+    first = login(client).json()
+    second = refresh(client, first["refresh_token"]).json()
+
+    assert refresh(client, first["refresh_token"]).status_code == 401
+    # Reuso indica roubo: a família inteira cai, inclusive o token mais novo
+    assert refresh(client, second["refresh_token"]).status_code == 401
+    assert verify(client, first["access_token"]) == 401
+    assert verify(client, second["access_token"]) == 401
+    # Outras sessões do usuário não são afetadas
+    other = login(client).json()
+    assert verify(client, other["access_token"]) == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, user):
+    tokens = login(client).json()
+    assert client.post(f"{AUTH}/logout", headers=bearer(tokens["access_token"])).status_code in (200, 204)
+    assert verify(client, tokens["access_token"]) == 401
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_revocation_reaches_other_workers_through_the_table(client, user, engine, monkeypatch):
+    tokens = login(client).json()
+    client.post(f"{AUTH}/logout", headers=bearer(tokens["access_token"]))
+
+    # Outro worker: denylist local vazia, o token ainda passaria
+    monkeypatch.setattr(denylist, "_entries", {})
+    monkeypatch.setattr(denylist, "_expirations", [])
+    assert verify(client, tokens["access_token"]) == 200
+
+    assert DenylistSync(engine).load() >= 2  # jti e família
+    assert verify(client, tokens["access_token"]) == 401
+
+
+def _stream(client, access_token: str, action=None, delay: float = 0.2) -> str:
+    if action is not None:
+        threading.Timer(delay, action).start()
+    response = client.get(f"{settings.API_V1_STR}/events/", headers=bearer(access_token))
+    assert response.status_code == 200
+    return response.text
+
+
+def test_event_stream_closes_on_logout(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_HEARTBEAT_SECONDS", 0.05)
+    tokens = login(client).json()
+    body = _stream(client, tokens["access_token"],
+                   lambda: client.post(f"{AUTH}/logout", headers=bearer(tokens["access_token"])))
+    assert body.endswith("event: revoked\ndata: {}\n\n")
+
+
+def test_event_stream_closes_when_the_token_expires(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_HEARTBEAT_SECONDS", 0.05)
+    access_token = security.create_access_token(
+        {"sub": str(user.id), "law_firm_id": str(user.law_firm_id), "email": user.email, "role": user.role},
+        expires_delta=timedelta(seconds=1),
+    )
+    started = time.monotonic()
+    body = _stream(client, access_token)
+    assert body.endswith("event: expired\ndata: {}\n\n")
+    assert time.monotonic() - started < 3
+
+
+def test_event_stream_closes_when_the_user_is_deactivated(client, user, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "EVENTS_USER_CHECK_SECONDS", 0.1)
+    tokens = login(client).json()
+
+    def deactivate():
+        with session_factory() as db:
+            db.get(models.User, user.id).is_active = False
+            db.commit()
+
+    body = _stream(client, tokens["access_token"], deactivate)
+    assert body.endswith("event: revoked\ndata: {}\n\n")
@@ -0,0 +1,40 @@
+"""Jobs do sistema: fora do escritório, só operadores consultam e cancelam."""
+import pytest
+
+from app.config import settings
+from app.jobs import queue as jobs
+
+from .conftest import bearer, login
+
+JOBS = f"{settings.API_V1_STR}/jobs"
+OPERATOR_TOKEN = "token-de-operador"
+
+
+@pytest.fixture
+def system_job(session_factory, user):
+    with session_factory() as db:
+        job = jobs.enqueue(db, "search.reindex", law_firm_id=None, created_by=user.id)
+        db.commit()
+        return job.id
+
+
+@pytest.fixture
+def token(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "OPERATOR_TOKEN", OPERATOR_TOKEN)
+    return login(client).json()["access_token"]
+
+
+def test_system_job_hidden_from_firm_routes(client, token, system_job):
+    assert client.get(f"{JOBS}/{system_job}", headers=bearer(token)).status_code == 404
+    assert client.post(f"{JOBS}/{system_job}/cancel", headers=bearer(token)).status_code == 404
+
+
+def test_system_job_requires_operator_token(client, token, system_job):
+    response = client.post(f"{JOBS}/system/{system_job}/cancel", headers=bearer(token))
+    assert response.status_code == 403
+
+    headers = {**bearer(token), "X-Operator-Token": OPERATOR_TOKEN}
+    response = client.post(f"{JOBS}/system/{system_job}/cancel", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"{JOBS}/system/{system_job}", headers=headers).json()["status"] == "cancelled"
@@ -0,0 +1,71 @@
+"""Limite de falhas de login por email e por IP, e o IP do cliente atrás de proxy."""
+from starlette.requests import Request
+
+from app.config import settings
+from app.core import ratelimit
+
+from .conftest import login
+
+
+def request_from(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+
+def test_email_limit_rejects_with_retry_after(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_email_limiter, "limit", 3)
+    for _ in range(3):
+        assert login(client, password="errada").status_code == 401
+
+    response = login(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    # Outro email do mesmo IP segue liberado
+    assert login(client, email="outro@teste.com.br", password="errada").status_code == 401
+
+
+def test_ip_limit_counts_every_email(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_ip_limiter, "limit", 2)
+    assert login(client, email="a@teste.com.br", password="errada").status_code == 401
+    assert login(client, email="b@teste.com.br", password="errada").status_code == 401
+    assert login(client).status_code == 429
+
+
+def test_successful_logins_are_not_counted(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_ip_limiter, "limit", 2)
+    monkeypatch.setattr(ratelimit.login_email_limiter, "limit", 2)
+    for _ in range(5):
+        assert login(client).status_code == 200
+
+
+def test_success_resets_email_failures(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_email_limiter, "limit", 2)
+    assert login(client, password="errada").status_code == 401
+    assert login(client).status_code == 200
+    # Sem o reset, esta seria a terceira tentativa contada
+    assert login(client, password="errada").status_code == 401
+    assert login(client).status_code == 200
+
+
+def test_zero_disables_limit(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_ip_limiter, "limit", 0)
+    monkeypatch.setattr(ratelimit.login_email_limiter, "limit", 0)
+    for _ in range(5):
+        assert login(client, password="errada").status_code == 401
+    assert login(client).status_code == 200
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "")
+    assert ratelimit.client_ip(request_from("10.0.0.5", "203.0.113.7")) == "10.0.0.5"
+
+
+def test_client_ip_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8, 192.168.1.1")
+    # Endereços à esquerda do primeiro não confiável podem ter sido forjados
+    request = request_from("10.0.0.5", "1.2.3.4, 203.0.113.7, 192.168.1.1")
+    assert ratelimit.client_ip(request) == "203.0.113.7"
+    # Conexão direta de fora dos proxies: o header é do próprio cliente
+    assert ratelimit.client_ip(request_from("198.51.100.9", "1.2.3.4")) == "198.51.100.9"
+    # Só proxies na cadeia
+    assert ratelimit.client_ip(request_from("10.0.0.5", "10.0.0.9")) == "10.0.0.9"